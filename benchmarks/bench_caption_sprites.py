@@ -0,0 +1,85 @@
+"""
+Caption overlay creation: one TextClip per segment vs. the RGBA sprite cache
+(cold, then warm for a second video with the same recurring phrases).
+
+Run from the repo root:  python benchmarks/bench_caption_sprites.py [segments] [font_path]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from caption_sprites import CaptionSpriteCache, DEFAULT_STYLE
+
+try:
+    from moviepy.editor import TextClip, ImageClip
+except ImportError:
+    from moviepy import TextClip, ImageClip
+
+WIDTH = int(1920 * 0.9)
+PHRASES = [
+    "THE HISTORY OF COFFEE", "BEGINS IN ETHIOPIA,", "WHERE A GOATHERD NOTICED", "HIS GOATS DANCING.",
+    "TODAY, BILLIONS OF CUPS", "ARE BREWED EVERY DAY.", "BUT FEW PEOPLE KNOW", "THE SECRET BEHIND IT.",
+    "SUBSCRIBE FOR MORE", "SHOCKING FACTS ABOUT", "THE FUTURE OF", "LET'S FIND OUT."
+]
+
+
+def segments(count):
+    random.seed(3)
+    return [random.choice(PHRASES) for _ in range(count)]
+
+
+def with_textclip(texts, style):
+    start = time.time()
+    for text in texts:
+        clip = TextClip(text=text, font_size=style['font_size'], color=style['color'], font=style['font'],
+                        stroke_color=style['stroke_color'], stroke_width=style['stroke_width'],
+                        method='caption', size=(WIDTH, None))
+        clip.close()
+    return time.time() - start
+
+
+def with_sprites(cache, texts, style):
+    start = time.time()
+    cache.prerender(texts, style, WIDTH)
+    for text in texts:
+        ImageClip(cache.get(text, style, WIDTH))
+    return time.time() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    font = sys.argv[2] if len(sys.argv) > 2 else None
+    style = dict(DEFAULT_STYLE)
+    if font:
+        style['font'] = font
+    elif not os.path.exists(style['font']):
+        style['font'] = None  # TextClip and the sprite renderer both fall back to Pillow's default font
+    texts = segments(count)
+
+    report = {"segments": count, "distinct_phrases": len(set(texts)), "font": style['font']}
+    try:
+        report["textclip_s"] = round(with_textclip(texts, style), 3)
+    except Exception as e:
+        report["textclip_s"] = f"failed: {e}"
+
+    root = tempfile.mkdtemp(prefix="caption_sprites_")
+    try:
+        cache = CaptionSpriteCache(root)
+        report["sprites_cold_s"] = round(with_sprites(cache, texts, style), 3)
+        report["sprites_cold_stats"] = cache.stats()
+        # A later video in a fresh process: memory is empty, the PNGs on disk remain
+        cache = CaptionSpriteCache(root)
+        report["sprites_warm_s"] = round(with_sprites(cache, texts, style), 3)
+        report["sprites_warm_stats"] = cache.stats()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compares the two caption modes on the same voiceover:
+  - tts:     group the WordBoundary events Edge-TTS streams with the audio
+  - whisper: transcribe the finished voiceover with a (warm) Whisper model
+
+Run from the repo root:  python benchmarks/bench_captions.py
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+import asyncio
+import difflib
+import json
+import re
+import time
+
+SAMPLE_TEXT = (
+    "Every morning, millions of people lace up their shoes and head outside. "
+    "Exercise strengthens the heart, sharpens the mind, and lifts your mood. "
+    "Just thirty minutes a day can add years to your life. "
+    "So what are you waiting for? Start moving today."
+)
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word).lower()
+
+
+def compare_word_timings(tts_words, whisper_words):
+    """Aligns the two word sequences and returns the start-time error in seconds."""
+    a = [_norm(w['text']) for w in tts_words]
+    b = [_norm(w['word']) for w in whisper_words]
+    errors = []
+    for block in difflib.SequenceMatcher(None, a, b).get_matching_blocks():
+        for k in range(block.size):
+            errors.append(abs(tts_words[block.a + k]['start'] - whisper_words[block.b + k]['start']))
+    if not errors:
+        return {"matched_words": 0}
+    errors.sort()
+    return {
+        "matched_words": len(errors),
+        "mean_abs_start_error_s": round(sum(errors) / len(errors), 3),
+        "p95_abs_start_error_s": round(errors[min(len(errors) - 1, int(len(errors) * 0.95))], 3)
+    }
+
+
+def main():
+    from video_engine import VideoEngine
+    ve = VideoEngine()
+    audio_path = "Data/temp/bench_captions.mp3"
+    report = {}
+
+    # TTS mode: synthesis + grouping, no extra pass over the audio
+    start = time.time()
+    boundaries = []
+    asyncio.run(ve.generate_voiceover(SAMPLE_TEXT, audio_path, boundaries))
+    tts_synth = time.time() - start
+    start = time.time()
+    tts_segments = ve.captions_from_boundaries(boundaries, SAMPLE_TEXT)
+    report['tts'] = {
+        "synthesis_s": round(tts_synth, 3),
+        "caption_s": round(time.time() - start, 4),
+        "segments": len(tts_segments)
+    }
+
+    # Whisper mode: same synthesis cost plus a transcription (cold, then warm model)
+    for label in ("whisper_cold", "whisper_warm"):
+        start = time.time()
+        segments = ve.generate_subtitles(audio_path)
+        report[label] = {
+            "synthesis_s": round(tts_synth, 3),
+            "caption_s": round(time.time() - start, 3),
+            "segments": len(segments)
+        }
+
+    # Word-level agreement between the two modes
+    model = ve.model_cache.get(ve.whisper_config.get('model_name', 'base'),
+                               ve.whisper_config.get('device', 'cpu'),
+                               ve.whisper_config.get('fp16', False))
+    result = model.transcribe(audio_path, word_timestamps=True, fp16=ve.whisper_config.get('fp16', False))
+    whisper_words = [w for seg in result.get('segments', []) for w in seg.get('words', [])]
+    report['timing_agreement'] = compare_word_timings(boundaries, whisper_words)
+
+    for mode in ('tts', 'whisper_cold', 'whisper_warm'):
+        report[mode]['total_s'] = round(report[mode]['synthesis_s'] + report[mode]['caption_s'], 3)
+
+    print(json.dumps(report, indent=4))
+    try: os.remove(audio_path)
+    except: pass
+
+
+if __name__ == "__main__":
+    main()
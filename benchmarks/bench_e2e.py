@@ -0,0 +1,246 @@
+"""
+Offline end-to-end benchmark: runs VideoEngine's full job pipeline
+(script -> voiceover -> visuals -> captions -> render) with every external
+service replaced by a local stand-in:
+
+  - OpenRouter: StubOpenRouter (streamed canned scripts)
+  - Pexels:     MockPexelsServer serving synthetic lavfi clips (search + ranged downloads)
+  - Edge-TTS:   FixtureTTS cutting the repo's final_*.mp3 samples to length
+
+Each stage of each job is measured for wall time, CPU time of this process
+(all threads), CPU time of finished child processes (ffmpeg), and peak RSS of
+this process while the stage ran. Footage fetches that start while the script
+streams (ai_config.early_fetch) run in the background, so their cost lands in
+whichever stages they overlap. Caches and the clip library live in a scratch
+directory, so every run starts cold and runs are comparable; the JSON report
+also records the revision, machine and configuration it was taken with.
+
+Run from the repo root:
+  python benchmarks/bench_e2e.py [--jobs N] [--scenes N] [--profile draft|final]
+                                 [--backend moviepy|ffmpeg] [--latency S] [--report PATH]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import argparse
+import copy
+import json
+import platform
+import shutil
+import subprocess
+import threading
+import time
+
+import yaml
+
+from fixture_tts import FixtureTTS
+from fixtures import make_test_clip
+from mock_pexels import MockPexelsServer
+from stub_openrouter import StubOpenRouter
+from video_engine import VideoEngine
+
+WORK_DIR = os.path.join("Data", "temp", "bench_e2e")
+SOURCES = ["testsrc2", "mandelbrot", "smptehdbars", "rgbtestsrc", "cellauto"]
+
+try:
+    import resource
+except ImportError:    # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if it can't be read here."""
+    if psutil:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class RSSSampler:
+    """Polls this process's RSS on a background thread and keeps the peak since the last reset."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def reset(self):
+        self.peak = current_rss()
+
+
+def child_peak_rss():
+    """Largest RSS of any finished child process so far (bytes), where the platform reports it."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+
+
+def mb(value):
+    return round(value / 2**20, 1) if value is not None else None
+
+
+def measure(sampler, fn, *args):
+    """Runs fn(*args); returns (result, metrics)."""
+    sampler.reset()
+    times = os.times()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    result = fn(*args)
+    after = os.times()
+    return result, {
+        "seconds": round(time.perf_counter() - wall, 3),
+        "cpu_seconds": round(time.process_time() - cpu, 3),
+        "child_cpu_seconds": round((after.children_user + after.children_system)
+                                   - (times.children_user + times.children_system), 3),
+        "peak_rss_mb": mb(sampler.peak)
+    }
+
+
+def make_fixture_clips(count, seconds=12):
+    return [make_test_clip(os.path.join(WORK_DIR, "fixtures", f"clip_{i}.mp4"), 1920, 1080, 30,
+                           seconds, SOURCES[i % len(SOURCES)]) for i in range(count)]
+
+
+def harness_settings(base, openrouter_url, pexels_url, args):
+    """The repo settings pointed at the stand-ins, with every cache inside WORK_DIR."""
+    settings = copy.deepcopy(base)
+    settings['ai_config']['api_base'] = openrouter_url
+    settings['ai_config']['max_retries'] = 0
+    settings['visuals_config']['pexels_api_base'] = pexels_url
+    settings['visuals_config']['rate_limits'] = {}
+    settings.setdefault('library_settings', {})['path'] = os.path.join(WORK_DIR, "library")
+    settings.setdefault('script_cache_settings', {}).update(
+        {"path": os.path.join(WORK_DIR, "cache", "scripts"), "prefetch_count": 0})
+    settings.setdefault('tts_settings', {})['cache_path'] = os.path.join(WORK_DIR, "cache", "tts")
+    settings.setdefault('checkpoint_settings', {})['path'] = os.path.join(WORK_DIR, "checkpoints")
+    settings.setdefault('caption_settings', {}).update(
+        {"mode": "tts", "sprite_cache_path": os.path.join(WORK_DIR, "cache", "captions")})
+    # Renders run in this process so their CPU and memory are attributed to the render stage
+    settings.setdefault('render_settings', {})['use_process_pool'] = False
+    if args.backend:
+        settings['render_settings']['backend'] = args.backend
+    if args.profile:
+        settings.setdefault('video_settings', {})['profile'] = args.profile
+    return settings
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_jobs(ve, jobs, sampler):
+    runs = []
+    for n in range(jobs):
+        topic_data = {"id": 9000 + n, "content": f"benchmark topic {n}"}
+        job = ve.new_job(topic_data)
+        stages = {}
+        ok = True
+        for stage in ve.STAGES:
+            ok, metrics = measure(sampler, getattr(ve, stage), job)
+            stages[stage] = metrics
+            if not ok:
+                ve.cleanup_job(job)
+                break
+        run = {"topic": topic_data['content'], "ok": bool(ok), "stages": stages,
+               "seconds": round(sum(m['seconds'] for m in stages.values()), 3)}
+        if ok:
+            run['scenes'] = len(job['scenes'])
+            # Scene durations include the 0.5s crossfade overlap on all but the last
+            run['video_seconds'] = round(sum(job['durations']) - 0.5 * (len(job['durations']) - 1), 2)
+            run['output_mb'] = mb(os.path.getsize(job['video_path']))
+            os.remove(job['video_path'])
+        runs.append(run)
+    return runs
+
+
+def summarize(runs):
+    """Mean of every metric per stage over the successful jobs."""
+    done = [r for r in runs if r['ok']]
+    summary = {}
+    for stage in VideoEngine.STAGES:
+        samples = [r['stages'][stage] for r in done]
+        if samples:
+            summary[stage] = {key: round(sum(s[key] or 0 for s in samples) / len(samples), 3)
+                              for key in samples[0]}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--jobs", type=int, default=2)
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--profile", default="draft", help="encoding profile (default: draft)")
+    parser.add_argument("--backend", default=None, help="render backend (default: render_settings.backend)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stand-in call")
+    parser.add_argument("--report", default=os.path.join("Data", "benchmarks", f"e2e_{int(time.time())}.json"))
+    args = parser.parse_args()
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    clips = make_fixture_clips(max(2, args.scenes))
+    with open("config/settings.yaml", "r") as f:
+        base_settings = yaml.safe_load(f)
+
+    sampler = RSSSampler().start()
+    tts = FixtureTTS(latency=args.latency)
+    with StubOpenRouter(latency=args.latency, scene_count=args.scenes) as openrouter, \
+            MockPexelsServer(clips=clips, latency=args.latency) as pexels:
+        settings = harness_settings(base_settings, openrouter.url, pexels.url, args)
+        ve, startup = measure(sampler, VideoEngine, False, settings, tts)
+        runs = run_jobs(ve, args.jobs, sampler)
+        requests_served = {"openrouter": len(openrouter.requests), "pexels": len(pexels.requests), "tts": tts.calls}
+    sampler.stop()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count()},
+        "config": {"jobs": args.jobs, "scenes": args.scenes, "latency": args.latency,
+                   "profile": ve.profile, "backend": ve.render_backend,
+                   "stream_scripts": ve.stream_scripts, "per_scene_tts": bool(ve.scene_voiceover)},
+        "startup": startup,
+        "runs": runs,
+        "summary": summarize(runs),
+        "child_peak_rss_mb": mb(child_peak_rss()),
+        "requests_served": requests_served
+    }
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(json.dumps({"summary": report['summary'], "runs": [{k: r[k] for k in r if k != 'stages'} for r in runs]},
+                     indent=4))
+    print(f"Report written to {args.report}")
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Encoding profile matrix: encode time vs. output size for every profile in
+video_settings (draft, final, and any custom ones), rendered by the ffmpeg
+backend and optionally by MoviePy.
+
+Inputs are synthetic lavfi scenes (the repo's final_*.mp4 files are audio-only)
+plus a repo final_*.mp3 sample as the voiceover, trimmed to length.
+
+Run from the repo root:  python benchmarks/bench_encoding_profiles.py [scenes] [seconds_per_scene] [--moviepy]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import random
+import shutil
+import time
+
+from bench_render_backends import SOURCES, make_audio
+from encoding_profiles import profile_names
+from fixtures import make_test_clip
+from media_tools import media_duration
+from video_engine import VideoEngine
+
+WORK_DIR = os.path.join("Data", "temp", "bench_profiles")
+
+
+def make_inputs(scenes, scene_seconds):
+    clips = [make_test_clip(os.path.join(WORK_DIR, "src", f"clip_{i}.mp4"), 1920, 1080, 30,
+                            scene_seconds + 4, SOURCES[i % len(SOURCES)]) for i in range(scenes)]
+    durations = [scene_seconds + 0.5 if i < scenes - 1 else scene_seconds for i in range(scenes)]
+    total = sum(durations) - 0.5 * (scenes - 1)
+    audio = make_audio(os.path.join(WORK_DIR, "voiceover.mp3"), total)
+    captions = [{"text": f"caption number {i} for this scene", "start": i * scene_seconds + 0.2,
+                 "end": (i + 1) * scene_seconds - 0.2} for i in range(scenes)]
+    return clips, durations, audio, captions
+
+
+def render(ve, backend, profile, clips, durations, audio, captions):
+    # render_video deletes its scene clips afterwards, so give each run its own copies
+    run_dir = os.path.join(WORK_DIR, f"{backend}_{profile}")
+    os.makedirs(run_dir, exist_ok=True)
+    scene_clips = []
+    for path, duration in zip(clips, durations):
+        copy = os.path.join(run_dir, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        scene_clips.append((copy, duration))
+    output_path = os.path.join(WORK_DIR, f"out_{backend}_{profile}.mp4")
+    random.seed(42)
+    start = time.time()
+    if backend == "ffmpeg":
+        ve.render_video_ffmpeg(audio, scene_clips, captions, output_path, profile)
+    else:
+        ve.render_backend = "moviepy"
+        ve.render_video("benchmark", "", audio, scene_clips, captions, output_path, profile)
+    return output_path, time.time() - start
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    scenes = int(args[0]) if len(args) > 0 else 4
+    scene_seconds = float(args[1]) if len(args) > 1 else 3.0
+    backends = ["ffmpeg", "moviepy"] if "--moviepy" in sys.argv else ["ffmpeg"]
+    os.makedirs(WORK_DIR, exist_ok=True)
+    clips, durations, audio, captions = make_inputs(scenes, scene_seconds)
+    video_seconds = media_duration(audio)
+
+    ve = VideoEngine(render_only=True)
+    matrix = []
+    for backend in backends:
+        for name in profile_names(ve.video_settings):
+            profile = ve.get_profile(name)
+            path, seconds = render(ve, backend, name, clips, durations, audio, captions)
+            size = os.path.getsize(path)
+            matrix.append({
+                "backend": backend,
+                "profile": name,
+                "canvas": f"{profile['width']}x{profile['height']}@{profile['fps']}",
+                "preset": profile['preset'],
+                "crf": profile['crf'],
+                "threads": profile['threads'],
+                "seconds": round(seconds, 2),
+                "realtime_factor": round(video_seconds / seconds, 2),
+                "size_mb": round(size / 2**20, 2),
+                "kbps": round(size * 8 / 1000 / video_seconds)
+            })
+
+    print(json.dumps({"scenes": scenes, "video_seconds": round(video_seconds, 2), "matrix": matrix}, indent=4))
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
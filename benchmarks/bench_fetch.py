@@ -0,0 +1,53 @@
+"""
+Sequential vs. parallel scene fetching against the local mock Pexels server.
+
+Run from the repo root:  python benchmarks/bench_fetch.py [latency_seconds]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import time
+
+from asset_fetcher import AssetFetcher
+from mock_pexels import MockPexelsServer
+
+SCENES = 12
+
+
+def run(server, concurrency):
+    fetcher = AssetFetcher("mock-key", {
+        "pexels_api_base": server.url,
+        "max_concurrent_fetches": concurrency,
+        "rate_limits": {}
+    })
+    # Every third scene's first keyword finds nothing, forcing the fallback path
+    scene_keywords = [
+        ([f"nothing here {i}"] if i % 3 == 0 else []) + [f"scene {i} footage"]
+        for i in range(SCENES)
+    ]
+    start = time.time()
+    paths = fetcher.fetch_all(scene_keywords, main_topic="exercise")
+    elapsed = time.time() - start
+
+    in_order = all(p == f"Data/temp/clip_scene_{i}.mp4" for i, p in enumerate(paths))
+    for p in paths:
+        try: os.remove(p)
+        except: pass
+    return {"concurrency": concurrency, "seconds": round(elapsed, 3), "results_in_scene_order": in_order}
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    os.makedirs("Data/temp", exist_ok=True)
+    empty = [f"nothing here {i}" for i in range(SCENES)]
+    report = []
+    with MockPexelsServer(latency=latency, empty_queries=empty) as server:
+        for concurrency in (1, 4, 8):
+            report.append(run(server, concurrency))
+    print(json.dumps({"latency_s": latency, "scenes": SCENES, "runs": report}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Overhead of the instrumentation layer: cost per span, counter increment and
+gauge update with metrics disabled (NullMetrics, the default) and enabled
+(in memory, and with the JSON-lines trace on), next to an uninstrumented loop.
+
+Run from the repo root:  python benchmarks/bench_metrics.py [iterations]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+import json
+import shutil
+import time
+
+from metrics import Metrics, NullMetrics
+
+WORK_DIR = os.path.join("Data", "temp", "bench_metrics")
+
+
+def per_call_ns(fn, iterations):
+    start = time.perf_counter()
+    fn(iterations)
+    return round((time.perf_counter() - start) / iterations * 1e9, 1)
+
+
+def bare(n):
+    for i in range(n):
+        pass
+
+
+def spans(metrics):
+    def run(n):
+        for i in range(n):
+            with metrics.span("stage", stage="render"):
+                pass
+    return run
+
+
+def counters(metrics):
+    def run(n):
+        for i in range(n):
+            metrics.inc("api_calls_total", service="pexels")
+    return run
+
+
+def gauges(metrics):
+    def run(n):
+        for i in range(n):
+            metrics.set_gauge("queue_depth", i)
+    return run
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    os.makedirs(WORK_DIR, exist_ok=True)
+    variants = {
+        "disabled": NullMetrics(),
+        "enabled": Metrics(),
+        "enabled_with_trace": Metrics(os.path.join(WORK_DIR, "trace.jsonl"))
+    }
+    report = {"iterations": iterations, "bare_loop_ns": per_call_ns(bare, iterations), "per_call_ns": {}}
+    for name, metrics in variants.items():
+        report['per_call_ns'][name] = {
+            "span": per_call_ns(spans(metrics), iterations),
+            "counter": per_call_ns(counters(metrics), iterations),
+            "gauge": per_call_ns(gauges(metrics), iterations)
+        }
+        metrics.close()
+    print(json.dumps(report, indent=4))
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Cost of feeding raw vs. normalized stock clips to the MoviePy compositor.
+
+For each synthetic source clip this reports the one-off normalization cost and,
+for the raw and the normalized file: open time, decode + resize time for one
+scene's worth of frames at the render fps, and the average time to seek to a
+random start point (what render_video does for every long clip).
+
+Run from the repo root:  python benchmarks/bench_normalize.py [scene_seconds]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import random
+import time
+
+from fixtures import make_test_clip
+from media_tools import normalize_clip
+
+try:
+    from moviepy.editor import VideoFileClip
+except ImportError:
+    from moviepy import VideoFileClip
+
+WORK_DIR = os.path.join("Data", "temp", "bench_normalize")
+CANVAS_HEIGHT = 1080
+FPS = 24
+# (label, width, height, fps): typical Pexels renditions
+SOURCES = [("2160p30", 3840, 2160, 30), ("1440p60", 2560, 1440, 60), ("720p30", 1280, 720, 30)]
+
+
+def measure(path, scene_seconds):
+    random.seed(7)
+    start = time.time()
+    clip = VideoFileClip(path).without_audio()
+    resized = clip.h != CANVAS_HEIGHT
+    if resized:
+        clip = clip.resized(height=CANVAS_HEIGHT)
+    open_seconds = time.time() - start
+
+    offset = random.uniform(0, max(0, clip.duration - scene_seconds - 1))
+    start = time.time()
+    frames = int(scene_seconds * FPS)
+    for n in range(frames):
+        clip.get_frame(offset + n / FPS)
+    decode_seconds = time.time() - start
+
+    seeks = 5
+    start = time.time()
+    for _ in range(seeks):
+        clip.get_frame(random.uniform(0, clip.duration - 1))
+    seek_seconds = (time.time() - start) / seeks
+    clip.close()
+    return {"open_s": round(open_seconds, 3), "decode_resize_s": round(decode_seconds, 2),
+            "ms_per_frame": round(decode_seconds / frames * 1000, 1),
+            "seek_s": round(seek_seconds, 3), "resized": resized}
+
+
+def main():
+    scene_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    report = []
+    for label, width, height, fps in SOURCES:
+        raw = make_test_clip(os.path.join(WORK_DIR, f"raw_{label}.mp4"), width, height, fps, 12)
+        norm = os.path.join(WORK_DIR, f"norm_{label}.mp4")
+        start = time.time()
+        normalize_clip(raw, norm, CANVAS_HEIGHT, FPS)
+        normalize_seconds = time.time() - start
+        report.append({
+            "source": label,
+            "normalize_once_s": round(normalize_seconds, 2),
+            "raw": measure(raw, scene_seconds),
+            "normalized": measure(norm, scene_seconds)
+        })
+    print(json.dumps({"canvas_height": CANVAS_HEIGHT, "fps": FPS, "scene_seconds": scene_seconds,
+                      "clips": report}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Time from new work arriving to the bot loop waking up: the old fixed
+check_interval poll vs. QueueWatcher woken by a queue.json edit or by a
+POST to the local enqueue endpoint.
+
+Uses a scratch queue (Data/temp/bench_wakeup), not the real one.
+
+Run from the repo root:  python benchmarks/bench_queue_wakeup.py [rounds]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+import json
+import random
+import shutil
+import statistics
+import threading
+import time
+
+import requests
+import yaml
+
+from queue_store import QueueStore
+from queue_watcher import QueueWatcher
+
+WORK_DIR = os.path.join("Data", "temp", "bench_wakeup")
+
+
+def measure(watcher, trigger, rounds):
+    latencies = []
+    for i in range(rounds):
+        # Work shows up at a random moment while the loop is idle
+        delay = random.uniform(0.05, 0.3)
+        sent = {}
+
+        def fire():
+            time.sleep(delay)
+            sent['at'] = time.perf_counter()
+            trigger(i)
+
+        threading.Thread(target=fire, daemon=True).start()
+        reason = watcher.wait(10)
+        if reason is None:
+            raise RuntimeError("watcher did not wake up")
+        latencies.append(time.perf_counter() - sent['at'])
+    return {"mean_ms": round(statistics.mean(latencies) * 1000, 1),
+            "max_ms": round(max(latencies) * 1000, 1)}
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR)
+    with open("config/settings.yaml", "r") as f:
+        automation = yaml.safe_load(f).get('automation_settings', {})
+    queue_file = os.path.join(WORK_DIR, "queue.json")
+    with open(queue_file, 'w') as f:
+        json.dump([], f)
+    store = QueueStore(os.path.join(WORK_DIR, "queue.db"))
+
+    watcher = QueueWatcher(queue_file, store.add_topic, automation.get('file_poll_seconds', 1.0))
+    watcher.start()
+    # Endpoint on a free port rather than the configured one, which a running bot may hold
+    watcher._start_server()
+    url = f"http://127.0.0.1:{watcher.port}/enqueue"
+
+    def edit_queue_file(i):
+        with open(queue_file, 'w') as f:
+            json.dump([{"id": 100 + i, "content": f"file topic {i}"}], f)
+
+    def post_topic(i):
+        requests.post(url, json={"content": f"http topic {i}"}, timeout=5).raise_for_status()
+
+    check_interval = automation.get('check_interval_seconds', 30)
+    report = {
+        "rounds": rounds,
+        # A fixed poll picks work up on the next tick: on average half the interval later
+        "fixed_poll": {"mean_ms": check_interval * 1000 / 2, "max_ms": check_interval * 1000},
+        "queue_file_edit": measure(watcher, edit_queue_file, rounds),
+        "http_enqueue": measure(watcher, post_topic, rounds),
+        "enqueued_topics": store.pending_count()
+    }
+    watcher.stop()
+    store.close()
+    print(json.dumps(report, indent=4))
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
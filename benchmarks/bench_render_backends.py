@@ -0,0 +1,102 @@
+"""
+MoviePy vs. ffmpeg filter-graph render backend: encode time and output similarity.
+
+Both backends render the same synthetic scenes (lavfi test clips), captions and
+voiceover (a repo final_*.mp3 sample trimmed to length, or a tone if none) with
+the same random seed, so they make the same clip offset / zoom choices. Similarity
+is ffmpeg's SSIM of the two outputs (1.0 = identical; captions and resampling
+differences keep it below 1).
+
+Run from the repo root:  python benchmarks/bench_render_backends.py [scenes] [seconds_per_scene]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import glob
+import json
+import random
+import re
+import shutil
+import time
+
+from fixtures import make_test_clip
+from media_tools import media_duration, run_ffmpeg
+from video_engine import VideoEngine
+
+WORK_DIR = os.path.join("Data", "temp", "bench_render")
+SOURCES = ["testsrc2", "mandelbrot", "smptehdbars", "rgbtestsrc"]
+
+
+def make_audio(path, seconds):
+    samples = sorted(glob.glob("final_*.mp3"))
+    if samples:
+        run_ffmpeg(["-y", "-i", samples[0], "-t", f"{seconds:.2f}", "-c:a", "libmp3lame", "-b:a", "96k", path])
+    else:
+        run_ffmpeg(["-y", "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds:.2f}", "-c:a", "libmp3lame", path])
+    return path
+
+
+def make_inputs(scenes, scene_seconds):
+    clips = [make_test_clip(os.path.join(WORK_DIR, "src", f"clip_{i}.mp4"), 1280, 720, 30,
+                            scene_seconds + 4, SOURCES[i % len(SOURCES)]) for i in range(scenes)]
+    durations = [scene_seconds + 0.5 if i < scenes - 1 else scene_seconds for i in range(scenes)]
+    total = sum(durations) - 0.5 * (scenes - 1)
+    audio = make_audio(os.path.join(WORK_DIR, "voiceover.mp3"), total)
+    captions = [{"text": f"caption number {i} for this scene", "start": i * scene_seconds + 0.2,
+                 "end": (i + 1) * scene_seconds - 0.2} for i in range(scenes)]
+    return clips, durations, audio, captions
+
+
+def render(ve, backend, clips, durations, audio, captions):
+    # render_video deletes its scene clips afterwards, so give each run its own copies
+    run_dir = os.path.join(WORK_DIR, backend)
+    os.makedirs(run_dir, exist_ok=True)
+    scene_clips = []
+    for path, duration in zip(clips, durations):
+        copy = os.path.join(run_dir, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        scene_clips.append((copy, duration))
+    output_path = os.path.join(WORK_DIR, f"out_{backend}.mp4")
+    random.seed(42)
+    start = time.time()
+    if backend == "ffmpeg":
+        # Called directly so a failure raises instead of silently falling back to MoviePy
+        ve.render_video_ffmpeg(audio, scene_clips, captions, output_path)
+    else:
+        ve.render_backend = "moviepy"
+        ve.render_video("benchmark", "", audio, scene_clips, captions, output_path)
+    return output_path, time.time() - start
+
+
+def ssim(a, b):
+    result = run_ffmpeg(["-i", a, "-i", b, "-lavfi", "[0:v][1:v]ssim", "-f", "null", "-"])
+    match = re.search(r"All:([\d.]+)", result.stderr)
+    return float(match.group(1)) if match else None
+
+
+def main():
+    scenes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    scene_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    os.makedirs(WORK_DIR, exist_ok=True)
+    clips, durations, audio, captions = make_inputs(scenes, scene_seconds)
+
+    ve = VideoEngine(render_only=True)
+    runs = {}
+    for backend in ("ffmpeg", "moviepy"):
+        path, seconds = render(ve, backend, clips, durations, audio, captions)
+        runs[backend] = {"seconds": round(seconds, 2), "output_duration_s": round(media_duration(path), 2),
+                         "size_mb": round(os.path.getsize(path) / 2**20, 2)}
+
+    report = {
+        "scenes": scenes,
+        "video_seconds": round(media_duration(audio), 2),
+        "runs": runs,
+        "speedup": round(runs['moviepy']['seconds'] / runs['ffmpeg']['seconds'], 1),
+        "ssim": ssim(os.path.join(WORK_DIR, "out_moviepy.mp4"), os.path.join(WORK_DIR, "out_ffmpeg.mp4"))
+    }
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
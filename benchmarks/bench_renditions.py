@@ -0,0 +1,122 @@
+"""
+How much download size and decode time rendition selection saves per clip.
+
+Offline (default): generates 2160p60, 1080p30 and 720p30 renditions of the same
+synthetic clip, then compares the file Pexels usually lists first
+(4K) with what select_rendition picks for video_settings, in bytes and in the
+time ffmpeg needs to decode + scale it to the render height.
+
+Live:  python benchmarks/bench_renditions.py --live "ocean waves" "city night"
+uses the real Pexels API (PEXELS_API_KEY) and downloads both candidates.
+
+Run from the repo root.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import subprocess
+import tempfile
+import time
+
+import yaml
+from media_tools import parse_resolution
+from renditions import select_rendition
+from fixtures import ffmpeg_exe, make_test_clip
+
+SCENES_PER_JOB = 13
+
+
+def decode_seconds(path, height):
+    """Time to decode the clip and scale it to the render height (what render_video does)."""
+    start = time.time()
+    subprocess.run([ffmpeg_exe(), "-v", "error", "-i", path, "-vf", f"scale=-2:{height}",
+                    "-f", "null", "-"], check=True)
+    return time.time() - start
+
+
+def make_renditions(workdir):
+    files = []
+    for w, h, fps in [(3840, 2160, 60), (1920, 1080, 30), (1280, 720, 30)]:
+        out = make_test_clip(os.path.join(workdir, f"rendition_{h}p{fps}.mp4"), w, h, fps)
+        files.append({"width": w, "height": h, "fps": fps, "link": out, "file_type": "video/mp4"})
+    return files
+
+
+def compare(first, chosen, first_path, chosen_path, height):
+    first_bytes, chosen_bytes = os.path.getsize(first_path), os.path.getsize(chosen_path)
+    first_decode, chosen_decode = decode_seconds(first_path, height), decode_seconds(chosen_path, height)
+    return {
+        "first_listed": f"{first['width']}x{first['height']}@{first['fps']}",
+        "selected": f"{chosen['width']}x{chosen['height']}@{chosen['fps']}",
+        "bytes_first": first_bytes,
+        "bytes_selected": chosen_bytes,
+        "decode_s_first": round(first_decode, 3),
+        "decode_s_selected": round(chosen_decode, 3)
+    }
+
+
+def summarize(rows):
+    bytes_saved = sum(r['bytes_first'] - r['bytes_selected'] for r in rows) / len(rows)
+    decode_saved = sum(r['decode_s_first'] - r['decode_s_selected'] for r in rows) / len(rows)
+    return {
+        "per_clip_mb_saved": round(bytes_saved / 2**20, 2),
+        "per_clip_decode_s_saved": round(decode_saved, 3),
+        f"per_job_mb_saved_{SCENES_PER_JOB}_scenes": round(bytes_saved * SCENES_PER_JOB / 2**20, 1),
+        f"per_job_decode_s_saved_{SCENES_PER_JOB}_scenes": round(decode_saved * SCENES_PER_JOB, 2)
+    }
+
+
+def offline(target_height, target_fps):
+    with tempfile.TemporaryDirectory() as workdir:
+        files = make_renditions(workdir)
+        chosen = select_rendition(files, target_height, target_fps)
+        rows = [compare(files[0], chosen, files[0]['link'], chosen['link'], target_height)]
+    return rows
+
+
+def live(queries, target_height, target_fps):
+    import requests
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join("API.env", "exact.env"))
+    headers = {"Authorization": os.getenv("PEXELS_API_KEY")}
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for query in queries:
+            r = requests.get("https://api.pexels.com/videos/search", headers=headers,
+                             params={"query": query, "per_page": 1, "orientation": "landscape"})
+            r.raise_for_status()
+            videos = r.json().get('videos', [])
+            if not videos:
+                continue
+            files = videos[0]['video_files']
+            chosen = select_rendition(files, target_height, target_fps)
+            paths = []
+            for label, f in (("first", files[0]), ("selected", chosen)):
+                path = os.path.join(workdir, f"{label}.mp4")
+                with requests.get(f['link'], stream=True) as resp, open(path, 'wb') as out:
+                    for chunk in resp.iter_content(1024 * 1024):
+                        out.write(chunk)
+                paths.append(path)
+            rows.append(dict(query=query, **compare(files[0], chosen, paths[0], paths[1], target_height)))
+    return rows
+
+
+def main():
+    with open("config/settings.yaml", "r") as f:
+        video_settings = yaml.safe_load(f).get('video_settings', {})
+    _, target_height = parse_resolution(video_settings.get('resolution', '720p'))
+    target_fps = video_settings.get('frame_rate', 30)
+
+    if "--live" in sys.argv:
+        rows = live([a for a in sys.argv[1:] if a != "--live"] or ["ocean waves"], target_height, target_fps)
+    else:
+        rows = offline(target_height, target_fps)
+
+    print(json.dumps({"target": f"{target_height}p@{target_fps}", "clips": rows,
+                      "summary": summarize(rows) if rows else {}}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
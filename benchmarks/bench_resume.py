@@ -0,0 +1,128 @@
+"""
+What a job checkpoint saves on retry. A job runs offline (the bench_e2e stand-ins)
+until its render worker raises RenderError (the path generate_content takes when
+an encode crashes), then:
+
+  - resumed:   the retry picks up its checkpoint and only re-renders
+  - corrupted: one checkpointed clip is damaged first, so the retry keeps the
+               script and voiceover but fetches footage again
+  - cold:      the retry has no checkpoint and starts over (the old behaviour)
+
+Also checks that garbage collection removes abandoned checkpoints only.
+
+Run from the repo root:  python benchmarks/bench_resume.py [--scenes N] [--backend moviepy|ffmpeg]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import argparse
+import json
+import shutil
+import time
+
+import yaml
+
+from bench_e2e import WORK_DIR, harness_settings, make_fixture_clips
+from fixture_tts import FixtureTTS
+from mock_pexels import MockPexelsServer
+from render_pool import RenderError
+from stub_openrouter import StubOpenRouter
+from video_engine import VideoEngine
+
+
+def run(ve, topic_data, fail_render=False):
+    """Runs a job through generate_content like the bot does; returns (ok, seconds, job)."""
+    jobs = []
+    new_job = ve.new_job
+    ve.new_job = lambda data: jobs.append(new_job(data)) or jobs[-1]  # keep the job to inspect its checkpoint
+    if fail_render:
+        def crash(job):
+            raise RenderError("render worker exited with code -11")  # the encode crashes
+        ve.render_job = crash
+    start = time.perf_counter()
+    result = ve.generate_content(topic_data)
+    seconds = round(time.perf_counter() - start, 3)
+    ve.__dict__.pop('render_job', None)
+    ve.__dict__.pop('new_job', None)
+    if result:
+        os.remove(result['video_path'])
+    return result is not None, seconds, jobs[0]
+
+
+def scenario(ve, topic_data, damage=False, checkpoint=True):
+    ok, failed_seconds, job = run(ve, topic_data, fail_render=True)
+    assert not ok
+    if damage:
+        clip = next(p for p, _ in job['scene_clips'] if p)
+        with open(clip, 'r+b') as f:
+            f.seek(1024)
+            f.write(b"\0" * 64)
+    if not checkpoint:
+        shutil.rmtree(job['checkpoint'].path, ignore_errors=True)
+    ok, retry_seconds, job = run(ve, topic_data)
+    return {
+        "first_attempt_seconds": failed_seconds,
+        "retry_seconds": retry_seconds,
+        "retry_ok": ok,
+        "stages_resumed": job.get('resumed_stages', []),
+        "checkpoint_left": os.path.exists(job['checkpoint'].path)
+    }
+
+
+def gc_check(ve):
+    store = ve.checkpoints
+    old = os.path.join(store.root, "424242")
+    fresh = os.path.join(store.root, "434343")
+    unrelated = os.path.join(store.root, "bench_not_a_job")  # some other tool's folder, no manifest
+    for path in (old, fresh, unrelated):
+        os.makedirs(path, exist_ok=True)
+        name = "notes.txt" if path == unrelated else "manifest.json"
+        with open(os.path.join(path, name), 'w') as f:
+            json.dump({"stages": {}}, f)
+    stale = time.time() - store.max_age_seconds - 60
+    os.utime(os.path.join(old, "manifest.json"), (stale, stale))
+    os.utime(unrelated, (stale, stale))
+    removed = store.collect_garbage(force=True)
+    result = {"removed": removed, "old_removed": not os.path.exists(old), "fresh_kept": os.path.exists(fresh),
+              "unrelated_kept": os.path.exists(unrelated)}
+    for path in (fresh, unrelated):
+        shutil.rmtree(path, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint resume benchmark")
+    parser.add_argument("--scenes", type=int, default=4)
+    parser.add_argument("--profile", default="draft")
+    parser.add_argument("--backend", default="ffmpeg")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every stand-in call")
+    args = parser.parse_args()
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    clips = make_fixture_clips(max(2, args.scenes))
+    with open("config/settings.yaml", "r") as f:
+        base_settings = yaml.safe_load(f)
+
+    with StubOpenRouter(latency=args.latency, scene_count=args.scenes) as openrouter, \
+            MockPexelsServer(clips=clips, latency=args.latency) as pexels:
+        settings = harness_settings(base_settings, openrouter.url, pexels.url, args)
+        # Caches would hide what the checkpoint saves, so every retry that starts over pays full price
+        settings['script_cache_settings']['enabled'] = False
+        settings['library_settings']['enabled'] = False
+        settings['tts_settings']['cache_enabled'] = False
+        ve = VideoEngine(False, settings, FixtureTTS(latency=args.latency))
+        results = {
+            "resumed": scenario(ve, {"id": 9101, "content": "resume benchmark one"}),
+            "corrupted": scenario(ve, {"id": 9102, "content": "resume benchmark two"}, damage=True),
+            "cold": scenario(ve, {"id": 9103, "content": "resume benchmark three"}, checkpoint=False),
+            "gc": gc_check(ve)
+        }
+
+    print(json.dumps({"config": {"scenes": args.scenes, "profile": args.profile, "backend": args.backend,
+                                 "latency": args.latency}, "results": results}, indent=4))
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
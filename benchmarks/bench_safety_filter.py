@@ -0,0 +1,116 @@
+"""
+Cost of the safety pre-filter per topic and per script, against keyword lists
+from the shipped filter_rules.json up to 50k entries: a naive loop testing every
+keyword, one flat alternation regex, and the trie-shaped regex SafetyFilter uses.
+Also reports how long each matcher takes to build.
+
+Run from the repo root:  python benchmarks/bench_safety_filter.py [iterations]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+import json
+import random
+import re
+import time
+
+from safety_filter import SafetyFilter
+
+SIZES = [100, 1000, 10000, 50000]
+TOPIC = "How deep sea creatures survive crushing pressure in the midnight zone"
+SCENE = ("Far below the surface, where sunlight never reaches, animals have evolved soft bodies "
+         "and flexible proteins that keep working under a thousand atmospheres of pressure. ")
+
+
+def synthetic_keywords(count, seed=7):
+    """Random lowercase words and two-word phrases that never occur in the sample texts."""
+    rng = random.Random(seed)
+    sample_words = set(re.findall(r"\w+", (TOPIC + " " + SCENE).lower()))
+    words = set()
+    while len(words) < count:
+        word = "".join(rng.choice("bcdfghjklmnpqrstvwxz") + rng.choice("aeiouy") for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.2:
+            word += " " + "".join(rng.choice("aeiouy") + rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(2))
+        if not sample_words & set(word.split()):
+            words.add(word)
+    return ["war", "violence", "politics", "hate speech"] + sorted(words)[:count - 4]
+
+
+class NaiveFilter:
+    def __init__(self, keywords):
+        self.keywords = [k.lower() for k in keywords]
+
+    def check(self, text):
+        lowered = text.lower()
+        for keyword in self.keywords:
+            if re.search(r"(?<!\w)" + re.escape(keyword) + r"(?!\w)", lowered):
+                return keyword
+        return None
+
+
+class AlternationFilter:
+    def __init__(self, keywords):
+        pattern = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+        self.pattern = re.compile(r"(?<!\w)(?:" + pattern + r")(?!\w)", re.IGNORECASE)
+
+    def check(self, text):
+        match = self.pattern.search(text)
+        return match.group(0) if match else None
+
+
+class TrieFilter:
+    def __init__(self, keywords):
+        self.filter = SafetyFilter(keywords)
+
+    def check(self, text):
+        return self.filter.check(text)
+
+
+def time_check(matcher, text, iterations):
+    matcher.check(text)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        matcher.check(text)
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    script = SCENE * 8  # about the length of a generated script (~1.5 KB)
+    matchers = {"naive_loop": NaiveFilter, "alternation_regex": AlternationFilter, "trie_regex": TrieFilter}
+    results = []
+    for size in SIZES:
+        keywords = synthetic_keywords(size)
+        for name, cls in matchers.items():
+            # The naive loop recompiles per keyword and per text; cap its iterations so large lists finish
+            runs = max(3, iterations // max(1, size // 100)) if name == "naive_loop" else iterations
+            start = time.perf_counter()
+            matcher = cls(keywords)
+            build_ms = round((time.perf_counter() - start) * 1000, 2)
+            assert matcher.check("a short clip about war") and not matcher.check(script)
+            results.append({
+                "keywords": size,
+                "matcher": name,
+                "build_ms": build_ms,
+                "topic_us": time_check(matcher, TOPIC, runs),
+                "script_us": time_check(matcher, script, runs)
+            })
+            print(f"{size:>6} keywords  {name:<18} build {build_ms:>9} ms  "
+                  f"topic {results[-1]['topic_us']:>10} us  script {results[-1]['script_us']:>10} us")
+
+    shipped = SafetyFilter.from_rules(json.load(open(os.path.join("config", "filter_rules.json"), encoding="utf-8")))
+    report = {
+        "iterations": iterations,
+        "script_chars": len(script),
+        "shipped_rules": {
+            "keywords": shipped.keyword_count if shipped else 0,
+            "topic_us": time_check(shipped, TOPIC, iterations * 10) if shipped else None,
+            "script_us": time_check(shipped, script, iterations * 10) if shipped else None
+        },
+        "results": results
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
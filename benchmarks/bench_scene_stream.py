@@ -0,0 +1,113 @@
+"""
+Streaming scene parser: replays the recorded SSE streams in benchmarks/streams/
+(complete, truncated, malformed, wrapped, mid-stream error, several scenes per event),
+checks how many scenes survive compared with the old parse-after-completion path and
+that on_scene gets each scene once under its own index, then measures
+time-to-first-scene against a local OpenRouter stub emitting tokens at a fixed rate.
+
+Run from the repo root:  python benchmarks/bench_scene_stream.py [seconds_per_event]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import re
+import time
+
+from scene_stream import iter_sse_content, read_scene_stream
+from stub_openrouter import StubOpenRouter
+from video_engine import VideoEngine
+
+STREAMS_DIR = os.path.join("benchmarks", "streams")
+
+# fixture -> (complete scenes expected, stream finished normally)
+EXPECTED = {
+    "complete.sse": (6, True),
+    "truncated.sse": (4, False),
+    "malformed.sse": (4, True),
+    "wrapped.sse": (6, True),
+    "error.sse": (2, False),
+    "batched.sse": (4, True)  # the second event completes scenes 2-4 at once
+}
+
+
+def read_lines(name):
+    with open(os.path.join(STREAMS_DIR, name), 'r', encoding="utf-8") as f:
+        return f.read().split("\n")
+
+
+def old_parse(lines):
+    """Scenes the previous wait-then-regex path got out of the same content."""
+    try:
+        content = "".join(iter_sse_content(lines))
+    except Exception:
+        return 0  # an error event lost the whole response
+    match = re.search(r'\[.*\]', content, re.DOTALL)
+    try:
+        parsed = json.loads(match.group(0) if match else content)
+    except ValueError:
+        return 0
+    if isinstance(parsed, dict):
+        parsed = parsed.get("scenes", [])
+    return len(parsed)
+
+
+def replay_fixtures():
+    results = []
+    for name, (want_scenes, want_complete) in EXPECTED.items():
+        lines = read_lines(name)
+        reported = []
+        scenes, stats = read_scene_stream(lines, lambda i, scene: reported.append((i, scene)))
+        results.append({
+            "stream": name,
+            "scenes": len(scenes),
+            "complete": stats['complete'],
+            "malformed": stats['malformed'],
+            "error": stats['error'],
+            "old_parser_scenes": old_parse(lines),
+            "on_scene_indexes": [i for i, _ in reported],
+            "ok": (len(scenes) == want_scenes and stats['complete'] == want_complete
+                   and reported == list(enumerate(scenes)))
+        })
+    return results
+
+
+def time_to_first_scene(ve, event_delay):
+    runs = []
+    for stream in (False, True):
+        with StubOpenRouter(event_delay=event_delay) as server:
+            ve.api_base = server.url
+            ve.stream_scripts = stream
+            first = []
+            start = time.time()
+            stats = {}
+            on_scene = (lambda i, s: first.append(time.time() - start) if not first else None)
+            scenes = ve.request_script("coffee", on_scene if stream else None, stats)
+            total = time.time() - start
+            runs.append({
+                "mode": "stream" if stream else "wait for completion",
+                "scenes": len(scenes),
+                "first_scene_s": round(first[0] if first else total, 3),
+                "all_scenes_s": round(total, 3)
+            })
+    return runs
+
+
+def main():
+    event_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    ve = VideoEngine()
+    ve.script_cache = None
+    ve.prefetcher = None
+    report = {
+        "fixtures": replay_fixtures(),
+        "seconds_per_event": event_delay,
+        "time_to_first_scene": time_to_first_scene(ve, event_delay)
+    }
+    print(json.dumps(report, indent=4))
+    if not all(r['ok'] for r in report['fixtures']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Script generation latency against a local stub of OpenRouter:
+cold (every job calls the API), cached (repeat topics) and prefetched
+(scripts for upcoming topics generated while the previous job runs).
+
+Run from the repo root:  python benchmarks/bench_script_cache.py [latency_seconds]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath("src"))
+sys.path.append(os.path.abspath("benchmarks"))
+import json
+import shutil
+import tempfile
+import time
+
+from video_engine import VideoEngine
+from script_cache import ScriptCache, ScriptPrefetcher
+from stub_openrouter import StubOpenRouter
+
+TOPICS = ["the history of tea", "mystery of deep sea creatures", "future secrets of batteries",
+          "shocking facts about sleep", "latest news on exercise"]
+
+
+def make_engine(server, cache_dir, prefetch):
+    ve = VideoEngine()
+    ve.api_base = server.url
+    ve.script_cache = ScriptCache(cache_dir, ttl_hours=72, max_uses=3) if cache_dir else None
+    ve.prefetcher = ScriptPrefetcher(ve, ve.script_cache, 2) if prefetch else None
+    return ve
+
+
+def run(server, label, cache_dir=None, prefetch=False, work_seconds=0.0, rounds=1):
+    ve = make_engine(server, cache_dir, prefetch)
+    before = len(server.requests)
+    waits = []
+    for _ in range(rounds):
+        for i, topic in enumerate(TOPICS):
+            if prefetch:
+                ve.prefetch_scripts(TOPICS[i + 1:i + 3])
+            start = time.time()
+            ve.generate_script(topic)
+            waits.append(time.time() - start)
+            # Stand-in for the rest of the job (voiceover, footage, render)
+            time.sleep(work_seconds)
+    return {
+        "mode": label,
+        "jobs": len(waits),
+        "api_calls": len(server.requests) - before,
+        "avg_script_wait_s": round(sum(waits) / len(waits), 3),
+        "cache": ve.script_cache.stats() if ve.script_cache else None
+    }
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    tmp = tempfile.mkdtemp(prefix="script_cache_")
+    try:
+        with StubOpenRouter(latency=latency) as server:
+            report = [
+                run(server, "no cache", rounds=2),
+                run(server, "cache, repeated topics", os.path.join(tmp, "a"), rounds=2),
+                run(server, "cache + prefetch", os.path.join(tmp, "b"), prefetch=True, work_seconds=latency * 1.5)
+            ]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps({"api_latency_s": latency, "runs": report}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
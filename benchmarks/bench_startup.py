@@ -0,0 +1,89 @@
+"""
+Startup cost of each entry point: every case runs in a fresh interpreter and
+reports the time its imports/setup took, the whole process wall time, the
+resident memory once it is ready, and which heavy libraries (MoviePy,
+Edge-TTS, requests, numpy/Pillow, Whisper/torch) got loaded along the way.
+
+The last case forces the MoviePy import a render does on first use, to show
+what the lazy imports defer.
+
+Run from the repo root:  python benchmarks/bench_startup.py [repeats]
+"""
+import sys
+import os
+import json
+import statistics
+import subprocess
+import time
+
+HEAVY_MODULES = ["moviepy", "edge_tts", "requests", "numpy", "PIL", "whisper", "torch"]
+
+CASES = {
+    "python": "pass",
+    "topic_manager": "from topic_manager import TopicManager",
+    "video_engine": "import video_engine",
+    "main": "import main",
+    "render_worker": "from video_engine import VideoEngine\nVideoEngine(render_only=True)",
+    "bot_engine": "from video_engine import VideoEngine\nVideoEngine()",
+    "first_moviepy_render": "import video_engine\nvideo_engine.load_moviepy()"
+}
+
+PROBE = """
+import os, sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, os.path.abspath("src"))
+{setup}
+seconds = time.perf_counter() - start
+def rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    except ImportError:
+        return None
+print(json.dumps({{"seconds": seconds, "rss": rss(), "modules": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_case(setup):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", PROBE.format(setup=setup, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-500:])
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    probe['wall'] = wall
+    return probe
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = {}
+    for name, setup in CASES.items():
+        try:
+            runs = [run_case(setup) for _ in range(repeats)]
+        except RuntimeError as e:
+            results[name] = {"error": str(e)}
+            print(f"{name:<22} failed: {e}")
+            continue
+        rss = [r['rss'] for r in runs if r['rss']]
+        results[name] = {
+            "import_ms": round(statistics.median(r['seconds'] for r in runs) * 1000, 1),
+            "process_ms": round(statistics.median(r['wall'] for r in runs) * 1000, 1),
+            "rss_mb": round(statistics.median(rss) / 2**20, 1) if rss else None,
+            "heavy_modules": runs[-1]['modules']
+        }
+        r = results[name]
+        print(f"{name:<22} import {r['import_ms']:>8} ms  process {r['process_ms']:>8} ms  "
+              f"rss {r['rss_mb']} MB  loaded: {', '.join(r['heavy_modules']) or '-'}")
+
+    print(json.dumps({"repeats": repeats, "python": sys.version.split()[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
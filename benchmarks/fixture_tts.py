@@ -0,0 +1,54 @@
+"""
+A local stand-in for Edge-TTS: "synthesizes" text by cutting a fixture audio
+file (the final_*.mp3 samples in the repo root, or a tone if there are none)
+to the length the text would take to speak, and reports evenly spaced word
+timings the way Edge-TTS's WordBoundary events do.
+
+Pass an instance as VideoEngine(tts=...).
+"""
+import asyncio
+import glob
+import itertools
+import threading
+
+from media_tools import run_ffmpeg
+
+
+def default_fixture_audio():
+    return sorted(glob.glob("final_*.mp3"))
+
+
+class FixtureTTS:
+    """Async callable (text, output_path, word_boundaries) -> output_path, like VideoEngine.generate_voiceover."""
+
+    def __init__(self, samples=None, words_per_second=2.5, latency=0.0):
+        self.samples = samples if samples is not None else default_fixture_audio()
+        self.words_per_second = words_per_second
+        self.latency = latency       # seconds added to every call (simulated network time)
+        self.calls = 0
+        self._cycle = itertools.cycle(self.samples) if self.samples else None
+        self._lock = threading.Lock()
+
+    def _cut(self, output_path, seconds):
+        with self._lock:
+            sample = next(self._cycle) if self._cycle else None
+        if sample:
+            args = ["-y", "-i", sample, "-t", f"{seconds:.3f}"]
+        else:
+            args = ["-y", "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds:.3f}"]
+        run_ffmpeg(args + ["-ac", "1", "-c:a", "libmp3lame", "-b:a", "48k", output_path])
+
+    async def __call__(self, text, output_path, word_boundaries=None):
+        words = text.split()
+        step = 1 / self.words_per_second
+        seconds = max(1.0, len(words) * step)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        await asyncio.get_running_loop().run_in_executor(None, self._cut, output_path, seconds)
+        with self._lock:
+            self.calls += 1
+        if word_boundaries is not None:
+            for i, word in enumerate(words):
+                word_boundaries.append({"text": word.strip(".,!?;:\"'"), "start": i * step,
+                                        "end": i * step + step * 0.9})
+        return output_path
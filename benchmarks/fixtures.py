@@ -0,0 +1,28 @@
+"""
+Synthetic media for the benchmarks. The final_*.mp3/mp4 files in the repo root
+are MoviePy temp *audio* tracks, so video fixtures are generated with ffmpeg's
+lavfi test sources instead.
+"""
+import os
+import subprocess
+
+
+def ffmpeg_exe():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return "ffmpeg"
+
+
+def make_test_clip(path, width=1280, height=720, fps=30, duration=8, source="testsrc2"):
+    """Writes a silent H.264 clip with a moving test pattern (cached if it already exists)."""
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    subprocess.run([
+        ffmpeg_exe(), "-v", "error", "-y", "-f", "lavfi",
+        "-i", f"{source}=size={width}x{height}:rate={fps}", "-t", str(duration),
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p", path
+    ], check=True)
+    return path
@@ -0,0 +1,128 @@
+"""
+A small local stand-in for the Pexels video API.
+
+  GET /videos/search?query=...   -> Pexels-shaped JSON pointing at /files/<name>
+  GET /files/<name>              -> serves a fixture clip (supports Range requests)
+
+Fixture clips default to the sample final_*.mp4 files in the repo root.
+Use it by pointing visuals_config.pexels_api_base at MockPexelsServer.url.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+def default_fixture_clips():
+    return sorted(glob.glob("final_*.mp4"))
+
+
+class MockPexelsServer:
+    """Runs the mock API on a background thread. Usable as a context manager."""
+
+    def __init__(self, clips=None, latency=0.0, empty_queries=(), host="127.0.0.1", port=0):
+        self.clips = clips if clips is not None else default_fixture_clips()
+        self.latency = latency                # seconds added to every request
+        self.empty_queries = set(empty_queries)  # queries that return no videos
+        self.requests = []                    # (path, query) log for assertions
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def search_results(self, query):
+        if query in self.empty_queries:
+            return []
+        videos = []
+        for i, clip in enumerate(self.clips):
+            name = os.path.basename(clip)
+            video_id = 1000 + i
+            videos.append({
+                "id": video_id,
+                "duration": 10,
+                "url": f"https://www.pexels.com/video/{video_id}/",
+                # Same fixture behind every rendition; the metadata mirrors real Pexels
+                # results, which often list a 4K file first
+                "video_files": [
+                    {"id": video_id * 10 + k, "quality": quality, "file_type": "video/mp4",
+                     "width": w, "height": h, "fps": fps, "link": f"{self.url}/files/{name}"}
+                    for k, (quality, w, h, fps) in enumerate([
+                        ("uhd", 3840, 2160, 60), ("hd", 1920, 1080, 30),
+                        ("hd", 1280, 720, 30), ("sd", 640, 360, 30)
+                    ])
+                ]
+            })
+        return videos
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query).get('query', [''])[0]
+                with server._lock:
+                    server.requests.append((parsed.path, query))
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if parsed.path == "/videos/search":
+                    body = json.dumps({"videos": server.search_results(query)}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif parsed.path.startswith("/files/"):
+                    self._serve_file(os.path.basename(parsed.path))
+                else:
+                    self.send_error(404)
+
+            def _serve_file(self, name):
+                matches = [c for c in server.clips if os.path.basename(c) == name]
+                if not matches:
+                    self.send_error(404)
+                    return
+                with open(matches[0], 'rb') as f:
+                    data = f.read()
+
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes="):
+                    start = int(range_header[6:].split("-")[0] or 0)
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "video/mp4")
+                self.send_header("Content-Length", str(len(data) - start))
+                self.end_headers()
+                self.wfile.write(data[start:])
+
+        return Handler
@@ -0,0 +1,139 @@
+"""
+A small local stand-in for the OpenRouter chat completions API.
+
+  POST /chat/completions   -> OpenAI-shaped JSON whose message content is a scene script
+                              (server-sent events when the request has "stream": true)
+
+Every request gets the same canned script (with the topic from the prompt
+filled in) after an optional delay, or replays a recorded .sse stream.
+Use it by pointing ai_config.api_base at StubOpenRouter.url.
+"""
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def sse_lines(content, chunk_chars=16, model="stub"):
+    """Splits content into OpenRouter-style SSE lines (one delta per chunk), ending with [DONE]."""
+    lines = [": OPENROUTER PROCESSING", ""]
+    for i in range(0, len(content), chunk_chars):
+        event = {"id": "stub", "model": model,
+                 "choices": [{"index": 0, "delta": {"content": content[i:i + chunk_chars]}, "finish_reason": None}]}
+        lines += ["data: " + json.dumps(event), ""]
+    lines += ["data: [DONE]", ""]
+    return lines
+
+
+def canned_scenes(topic, count=12):
+    return [
+        {"text": f"Scene {i + 1} tells another part of the story of {topic}, one short sentence at a time.",
+         "keywords": [f"{topic} footage {i}", "cinematic 4k", "slow motion"]}
+        for i in range(count)
+    ]
+
+
+class StubOpenRouter:
+    """Runs the stub API on a background thread. Usable as a context manager."""
+
+    def __init__(self, latency=0.0, scene_count=12, fail_first=0, stream_fixture=None, event_delay=0.0,
+                 host="127.0.0.1", port=0):
+        self.latency = latency          # seconds added to every request
+        self.scene_count = scene_count
+        self.fail_first = fail_first    # answer this many requests with HTTP 503 first
+        self.stream_fixture = stream_fixture  # recorded .sse file replayed to streaming requests
+        self.event_delay = event_delay  # seconds between streamed events (simulated token rate)
+        self.requests = []              # topics asked for, in arrival order
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def topic_from_prompt(prompt):
+        match = re.search(r"script about (.+?)\.\s", prompt)
+        return match.group(1) if match else "this topic"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/chat/completions":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                topic = server.topic_from_prompt(prompt)
+                with server._lock:
+                    server.requests.append(topic)
+                    failing = len(server.requests) <= server.fail_first
+                if server.latency:
+                    time.sleep(server.latency)
+                if failing:
+                    self.send_error(503)
+                    return
+
+                content = json.dumps(canned_scenes(topic, server.scene_count))
+                if payload.get("stream"):
+                    self._stream(content)
+                    return
+                if server.event_delay:
+                    # A non-streamed reply arrives once the model has produced every token
+                    time.sleep(server.event_delay * (len(sse_lines(content)) // 2 - 2))
+                body = json.dumps({
+                    "id": f"stub-{len(server.requests)}",
+                    "model": payload.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}]
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, content):
+                if server.stream_fixture:
+                    with open(server.stream_fixture, 'r', encoding="utf-8") as f:
+                        lines = f.read().split("\n")
+                else:
+                    lines = sse_lines(content)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                # No Content-Length: the body ends when the connection closes, like a cut-off stream
+                self.close_connection = True
+                for line in lines:
+                    if line.startswith("data:") and server.event_delay:
+                        time.sleep(server.event_delay)
+                    self.wfile.write((line + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+        return Handler
@@ -0,0 +1,269 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from downloader import stream_download
+from media_tools import normalize_clip
+from metrics import get_metrics
+from renditions import select_rendition, decode_cost, filter_by_duration
+
+
+class HostRateLimiter:
+    """Spaces out requests per host so parallel fetches stay under API quotas."""
+
+    def __init__(self, limits=None):
+        # host -> max requests per second
+        self.limits = limits or {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).hostname or ""
+        rate = self.limits.get(host)
+        if not rate:
+            return
+        interval = 1.0 / rate
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class AssetFetcher:
+    """
+    Searches Pexels and downloads stock clips for every scene of a job in parallel,
+    over a shared pooled session. Results always come back in scene order.
+    """
+
+    def __init__(self, api_key, config=None, library=None, target_height=720, target_fps=30, normalize_to=None):
+        config = config or {}
+        # (height, fps) of the render canvas; downloaded clips are transcoded to it once
+        self.normalize_to = normalize_to
+        self.normalize_gop = config.get('normalize_gop_seconds', 1.0)
+        self.normalize_max_seconds = config.get('normalize_max_seconds', 30)
+        self.normalize_crf = config.get('normalize_crf', 20)
+        self.api_key = api_key
+        self.library = library
+        self.target_height = target_height
+        self.target_fps = target_fps
+        self.max_duration_ratio = config.get('max_clip_duration_ratio', 4.0)
+        self.api_base = config.get('pexels_api_base', 'https://api.pexels.com').rstrip('/')
+        self.max_concurrency = max(1, config.get('max_concurrent_fetches', 4))
+        self.timeout = config.get('request_timeout_seconds', 30)
+        self.rate_limiter = HostRateLimiter(config.get('rate_limits', {}))
+        self.max_download_bytes = int(config.get('max_download_mb', 200) * 1024 * 1024)
+        self.chunk_size = int(config.get('download_chunk_kb', 256) * 1024)
+        self.download_retries = config.get('download_retries', 3)
+        self._stats_lock = threading.Lock()
+        self._early_pool = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency * 2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get(self, url, **kwargs):
+        self.rate_limiter.wait(url)
+        return self.session.get(url, timeout=self.timeout, **kwargs)
+
+    def search(self, query, per_page=10):
+        """Returns the Pexels video results for a single query."""
+        url = f"{self.api_base}/videos/search"
+        params = {"query": query, "per_page": per_page, "orientation": "landscape", "size": "medium"}
+        get_metrics().inc("api_calls_total", service="pexels")
+        response = self._get(url, headers={"Authorization": self.api_key}, params=params)
+        response.raise_for_status()
+        return response.json().get('videos', [])
+
+    def download(self, video_url, v_path, stats=None):
+        """Streams a clip to disk (size-capped, resumable, atomic) and records transfer stats."""
+        result = stream_download(
+            self.session, video_url, v_path,
+            max_bytes=self.max_download_bytes,
+            chunk_size=self.chunk_size,
+            max_retries=self.download_retries,
+            timeout=self.timeout,
+            before_request=self.rate_limiter.wait
+        )
+        metrics = get_metrics()
+        metrics.inc("download_bytes_total", result['bytes'])
+        if result['resumes']:
+            metrics.inc("retries_total", result['resumes'], service="download")
+        self._add_stats(stats, result)
+        return v_path
+
+    def _add_stats(self, stats, result=None, chosen=None, first=None):
+        if stats is None:
+            return
+        with self._stats_lock:
+            if chosen is not None:
+                # Decode cost / listed size of what we took vs. what files[0] would have been
+                stats['decode_cost_selected'] = stats.get('decode_cost_selected', 0) + decode_cost(chosen)
+                stats['decode_cost_first'] = stats.get('decode_cost_first', 0) + decode_cost(first)
+                if chosen.get('size') and first.get('size'):
+                    stats['listed_bytes_selected'] = stats.get('listed_bytes_selected', 0) + chosen['size']
+                    stats['listed_bytes_first'] = stats.get('listed_bytes_first', 0) + first['size']
+            if result is not None:
+                stats['bytes'] = stats.get('bytes', 0) + result['bytes']
+                stats['download_seconds'] = stats.get('download_seconds', 0.0) + result['seconds']
+                stats['downloads'] = stats.get('downloads', 0) + 1
+                stats['resumes'] = stats.get('resumes', 0) + result['resumes']
+
+    def normalize(self, v_path, digest=None, stats=None):
+        """
+        Replaces a fetched clip with its normalized version (canvas height and fps,
+        no audio, short GOP). Library clips keep the normalized copy next to the
+        source object, so each clip is transcoded once. On failure the original is kept.
+        """
+        if not self.normalize_to:
+            return v_path
+        height, fps = self.normalize_to
+        variant = f"norm{height}p{fps}"
+        if digest and self.library and self.library.checkout(digest, v_path, variant=variant):
+            self._add_timing(stats, 'normalize_cached', 0.0)
+            return v_path
+
+        start = time.time()
+        tmp_path = v_path + ".norm.mp4"
+        try:
+            normalize_clip(v_path, tmp_path, height, fps, self.normalize_gop, self.normalize_max_seconds,
+                           crf=self.normalize_crf)
+            if digest and self.library:
+                self.library.add_variant(digest, variant, tmp_path)
+            os.replace(tmp_path, v_path)
+        except Exception as e:
+            print(f"Warning: Could not normalize {v_path}, using it as downloaded: {e}")
+            get_metrics().inc("fallbacks_total", kind="unnormalized_clip")
+            try: os.remove(tmp_path)
+            except: pass
+            return v_path
+        self._add_timing(stats, 'normalize', time.time() - start)
+        return v_path
+
+    def _add_timing(self, stats, name, seconds):
+        if stats is None:
+            return
+        with self._stats_lock:
+            stats[name + '_count'] = stats.get(name + '_count', 0) + 1
+            stats[name + '_seconds'] = stats.get(name + '_seconds', 0.0) + seconds
+
+    def fetch_scene(self, keywords, index, main_topic="", stats=None, scene_duration=None, job_tag=None):
+        """Tries each keyword in order and downloads one clip for the scene."""
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        keywords = list(keywords)
+
+        # Add main topic as a final keyword fallback
+        if main_topic and main_topic not in keywords:
+            keywords.append(main_topic)
+
+        v_path = f"Data/temp/clip_{job_tag}_scene_{index}.mp4" if job_tag else f"Data/temp/clip_scene_{index}.mp4"
+        for query in keywords:
+            # Local library first: no search or download needed on a hit
+            if self.library:
+                cached = self.library.lookup_query(query)
+                if cached and self.library.checkout(cached, v_path):
+                    print(f"Library hit for scene {index} using query: {query}")
+                    return self.normalize(v_path, cached, stats)
+
+            print(f"Fetching visual for scene {index} using query: {query}")
+            try:
+                videos = filter_by_duration(self.search(query), scene_duration, self.max_duration_ratio)
+                if videos:
+                    # Pick a random video from the results to ensure variety
+                    selected_video = random.choice(videos)
+                    video_id = selected_video.get('id')
+
+                    if self.library and video_id is not None:
+                        cached = self.library.lookup_video(video_id, query)
+                        if cached and self.library.checkout(cached, v_path):
+                            print(f"Library hit for scene {index}: Pexels video {video_id} already stored")
+                            return self.normalize(v_path, cached, stats)
+
+                    # Smallest rendition that still covers the render resolution
+                    video_files = selected_video['video_files']
+                    rendition = select_rendition(video_files, self.target_height, self.target_fps)
+                    self._add_stats(stats, chosen=rendition, first=video_files[0])
+                    self.download(rendition['link'], v_path, stats)
+                    digest = self.library.add(v_path, video_id, query) if self.library else None
+                    return self.normalize(v_path, digest, stats)
+                else:
+                    print(f"No visuals found for '{query}'. Trying next keyword...")
+            except Exception as e:
+                print(f"Error fetching visual for {query}: {e}")
+                continue
+
+        print(f"FAILED to find any visuals for scene {index}. Using fallback.")
+        get_metrics().inc("fallbacks_total", kind="missing_clip")
+        return None
+
+    def submit_scene(self, keywords, index, main_topic="", stats=None, scene_duration=None, job_tag=None):
+        """Starts fetching one scene in the background (e.g. while the script is still streaming)."""
+        with self._stats_lock:
+            if self._early_pool is None:
+                self._early_pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="early-fetch")
+        return self._early_pool.submit(self.fetch_scene, keywords, index, main_topic, stats, scene_duration, job_tag)
+
+    def fetch_all(self, scene_keywords, main_topic="", stats=None, durations=None, job_tag=None, early=None):
+        """
+        Fetches every scene concurrently; returns clip paths (or None) in scene order.
+        If stats is a dict it is filled with this job's download totals.
+        durations (seconds per scene) lets the fetcher skip clips far longer than needed.
+        early maps scene index -> (keywords, future) from submit_scene; those scenes are
+        reused when the keywords still match, and re-fetched otherwise.
+        """
+        if not scene_keywords:
+            return []
+        stats = {} if stats is None else stats
+        early = early or {}
+        start = time.time()
+        workers = min(self.max_concurrency, len(scene_keywords))
+        reused = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+            futures = []
+            for i, keywords in enumerate(scene_keywords):
+                if i in early:
+                    early_keywords, future = early[i]
+                    if list(early_keywords) == list(keywords):
+                        futures.append(future)
+                        reused += 1
+                        continue
+                    # The script changed (e.g. fell back to the template); let the
+                    # stale download finish before its file is overwritten
+                    try: future.result()
+                    except Exception: pass
+                futures.append(pool.submit(self.fetch_scene, keywords, i, main_topic, stats,
+                                           durations[i] if durations else None, job_tag))
+            paths = [f.result() for f in futures]
+        if reused:
+            print(f"System: {reused} scene clip(s) were fetched while the script was still streaming")
+        if self.library:
+            self.library.flush()
+            lib_stats = self.library.stats()
+            print(f"System: Clip library hits={lib_stats['hits']} misses={lib_stats['misses']} "
+                  f"({lib_stats['clips']} clips, {lib_stats['size_mb']} MB)")
+        found = sum(1 for p in paths if p)
+        elapsed = time.time() - start
+        stats['fetch_seconds'] = elapsed
+        mb = stats.get('bytes', 0) / 2**20
+        print(f"System: Fetched {found}/{len(paths)} scene clips in {elapsed:.1f}s ({workers} parallel), "
+              f"downloaded {mb:.1f} MB at {mb / elapsed if elapsed else 0:.1f} MB/s")
+        if stats.get('normalize_count') or stats.get('normalize_cached_count'):
+            print(f"System: Normalized {stats.get('normalize_count', 0)} clip(s) in "
+                  f"{stats.get('normalize_seconds', 0.0):.1f}s, reused {stats.get('normalize_cached_count', 0)} "
+                  f"normalized copies from the library")
+        if stats.get('decode_cost_first'):
+            saved = 1 - stats['decode_cost_selected'] / stats['decode_cost_first']
+            print(f"System: Rendition selection cut decoded pixels/sec by {saved:.0%} vs. the first listed files")
+        if stats.get('listed_bytes_first'):
+            saved_mb = (stats['listed_bytes_first'] - stats['listed_bytes_selected']) / 2**20
+            print(f"System: Rendition selection avoided ~{saved_mb:.1f} MB of downloads")
+        return paths
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# numpy and Pillow are imported where sprites are drawn or loaded, not when the engine starts
+
+# Tried in order when the configured font can't be opened
+FALLBACK_FONTS = [r"C:\Windows\Fonts\arialbd.ttf", "arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"]
+
+# The look render_video has always used for captions
+DEFAULT_STYLE = {
+    "font": r"C:\Windows\Fonts\arialbd.ttf",
+    "font_size": 55,
+    "color": "yellow",
+    "stroke_color": "black",
+    "stroke_width": 3
+}
+
+
+def sprite_key(text, style, width):
+    raw = "\n".join([text, str(style['font']), str(style['font_size']), str(width),
+                     str(style['color']), str(style['stroke_color']), str(style['stroke_width'])])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def load_font(font, size):
+    from PIL import ImageFont
+    for candidate in [font] + FALLBACK_FONTS:
+        if not candidate:
+            continue
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def wrap_words(draw, text, font, max_width, stroke_width):
+    """Greedy word wrap to max_width pixels (what TextClip's method='caption' does)."""
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and draw.textlength(candidate, font=font) + 2 * stroke_width > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def render_sprite(text, style, width):
+    """Draws centred, wrapped, outlined caption text onto a transparent RGBA image of the given width."""
+    from PIL import Image, ImageDraw
+    font = load_font(style['font'], style['font_size'])
+    stroke = style['stroke_width']
+    measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    lines = wrap_words(measure, text, font, width, stroke) or [""]
+
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent + 2 * stroke
+    spacing = 4
+    height = line_height * len(lines) + spacing * (len(lines) - 1)
+    image = Image.new("RGBA", (width, max(1, height)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    y = stroke
+    for line in lines:
+        x = (width - draw.textlength(line, font=font)) / 2
+        draw.text((x, y), line, font=font, fill=style['color'],
+                  stroke_width=stroke, stroke_fill=style['stroke_color'])
+        y += line_height + spacing
+    return image
+
+
+class CaptionSpriteCache:
+    """
+    Caption text rasterized once to RGBA sprites, keyed by text, font, size, width
+    and colours. Sprites are kept in memory (LRU) and as PNGs on disk, so phrases
+    that recur across videos are never drawn twice. prerender() draws a batch of
+    misses on a thread pool before compositing starts.
+    """
+
+    def __init__(self, root="Data/cache/captions", max_memory_items=512, workers=4):
+        self.root = root
+        self.max_memory_items = max_memory_items
+        self.workers = max(1, workers)
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.render_seconds = 0.0
+        self.saved_seconds = 0.0    # drawing time avoided by hits (each sprite remembers what it cost)
+        self._prerendered = set()   # drawn by prerender(); their first get() counts as the miss
+        self._lock = threading.Lock()
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        if not config.get('sprite_cache', True):
+            return None
+        return cls(
+            root=config.get('sprite_cache_path', "Data/cache/captions"),
+            max_memory_items=config.get('sprite_memory_items', 512),
+            workers=config.get('sprite_workers', 4)
+        )
+
+    def _disk_path(self, key):
+        return os.path.join(self.root, key + ".png") if self.root else None
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_memory_items:
+                self.memory.popitem(last=False)
+
+    def _lookup(self, key):
+        """Returns (array, seconds it took to draw) or None."""
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+                return entry
+        path = self._disk_path(key)
+        if path and os.path.exists(path):
+            try:
+                import numpy as np
+                from PIL import Image
+                image = Image.open(path)
+                entry = (np.array(image.convert("RGBA")), float(image.info.get("render_seconds", 0)))
+            except Exception:
+                return None
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def _render(self, key, text, style, width):
+        import numpy as np
+        from PIL.PngImagePlugin import PngInfo
+        start = time.time()
+        image = render_sprite(text, style, width)
+        array = np.array(image)
+        seconds = time.time() - start
+        path = self._disk_path(key)
+        if path:
+            info = PngInfo()
+            info.add_text("render_seconds", f"{seconds:.6f}")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            image.save(tmp_path, format="PNG", pnginfo=info)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self.render_seconds += seconds
+        entry = (array, seconds)
+        self._remember(key, entry)
+        return entry
+
+    def get(self, text, style, width):
+        """Returns the sprite as an RGBA numpy array, drawing it on a miss."""
+        key = sprite_key(text, style, width)
+        entry = self._lookup(key)
+        with self._lock:
+            if entry is not None and key not in self._prerendered:
+                self.hits += 1
+                self.saved_seconds += entry[1]
+            else:
+                self._prerendered.discard(key)
+                self.misses += 1
+        if entry is None:
+            entry = self._render(key, text, style, width)
+        return entry[0]
+
+    def prerender(self, texts, style, width):
+        """Draws every sprite not cached yet, in parallel, so compositing only blits."""
+        missing = {}
+        for text in texts:
+            key = sprite_key(text, style, width)
+            if key not in missing and self._lookup(key) is None:
+                missing[key] = text
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing)), thread_name_prefix="captions") as pool:
+                list(pool.map(lambda item: self._render(item[0], item[1], style, width), missing.items()))
+            with self._lock:
+                self._prerendered.update(missing)
+        return len(missing)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "render_seconds": round(self.render_seconds, 3),
+                "saved_seconds": round(self.saved_seconds, 3)
+            }
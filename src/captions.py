@@ -0,0 +1,76 @@
+import re
+
+# Edge-TTS reports offsets and durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
+
+SENTENCE_END = ('.', '!', '?')
+CLAUSE_END = (',', ';', ':')
+
+
+def boundary_to_word(event):
+    """Converts an Edge-TTS WordBoundary event into a {text, start, end} word."""
+    start = event['offset'] / TICKS_PER_SECOND
+    return {
+        "text": event['text'],
+        "start": start,
+        "end": start + event['duration'] / TICKS_PER_SECOND
+    }
+
+
+def _normalize(token):
+    return re.sub(r"[^\w']", "", token).lower()
+
+
+def attach_punctuation(words, source_text):
+    """
+    Edge-TTS strips punctuation from boundary words, so walk the original text
+    alongside them and copy each token's trailing punctuation back onto its word.
+    """
+    tokens = source_text.split()
+    pos = 0
+    for word in words:
+        target = _normalize(word['text'])
+        # Look a few tokens ahead; TTS occasionally merges or splits tokens
+        for j in range(pos, min(pos + 4, len(tokens))):
+            if _normalize(tokens[j]) == target:
+                word['punct'] = tokens[j][-1] if tokens[j][-1] in SENTENCE_END + CLAUSE_END else ''
+                pos = j + 1
+                break
+    return words
+
+
+def words_to_segments(words, max_words=6, max_duration=3.0, max_gap=0.6):
+    """
+    Groups timed words into caption segments in the format render_video expects.
+    A segment closes at sentence ends, after a clause break once it has a few words,
+    on a long pause, or when it would exceed max_words / max_duration.
+    """
+    segments = []
+    current = []
+
+    def flush():
+        if current:
+            segments.append({
+                "text": " ".join(w['text'] + w.get('punct', '') for w in current),
+                "start": current[0]['start'],
+                "end": current[-1]['end']
+            })
+            current.clear()
+
+    for word in words:
+        if current:
+            gap = word['start'] - current[-1]['end']
+            too_long = word['end'] - current[0]['start'] > max_duration
+            if gap > max_gap or too_long or len(current) >= max_words:
+                flush()
+
+        current.append(word)
+
+        punct = word.get('punct', '')
+        if punct in SENTENCE_END:
+            flush()
+        elif punct in CLAUSE_END and len(current) >= max_words // 2:
+            flush()
+
+    flush()
+    return segments
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from clip_library import file_sha256
+
+MANIFEST = "manifest.json"
+
+
+def _data_sha256(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class JobCheckpoint:
+    """
+    The finished stages of one job, kept in <root>/<job_id>/ so a retried job resumes
+    after the last valid one instead of starting over.
+
+    manifest.json records, per stage, the job fields it produced (scenes, timings,
+    clip paths, captions...) and the SHA-256 of that data and of every file it owns.
+    Files (voiceover, clips) are moved into the job directory when their stage is
+    saved, so the cleanup of a failed job leaves them alone.
+    """
+
+    def __init__(self, path, job_id, inputs):
+        self.path = path
+        self.job_id = job_id
+        self.inputs = inputs
+        self.manifest_path = os.path.join(path, MANIFEST)
+        self.manifest = {"job_id": job_id, "inputs": inputs, "created": time.time(), "stages": {}}
+
+    def owns(self, path):
+        """True if path is one of this checkpoint's files."""
+        return bool(path) and os.path.abspath(path).startswith(os.path.abspath(self.path) + os.sep)
+
+    def adopt(self, path, name):
+        """Moves a stage's file into the job directory (keeping its extension); returns the new path."""
+        if not path or self.owns(path) or not os.path.exists(path):
+            return path
+        os.makedirs(self.path, exist_ok=True)
+        dest = os.path.join(self.path, name + os.path.splitext(path)[1])
+        os.replace(path, dest)
+        return dest
+
+    def save_stage(self, stage, data, files=()):
+        """Records a finished stage: its job fields and the hashes of the files they point to."""
+        entry = {
+            "finished": time.time(),
+            "data": data,
+            "data_sha256": _data_sha256(data),
+            "files": {path: file_sha256(path) for path in files if path}
+        }
+        self.manifest['stages'][stage] = entry
+        self.manifest['updated'] = time.time()
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _stage_valid(self, entry):
+        if _data_sha256(entry.get('data')) != entry.get('data_sha256'):
+            return False
+        for path, digest in entry.get('files', {}).items():
+            if not os.path.exists(path) or file_sha256(path) != digest:
+                return False
+        return True
+
+    def load(self, stages):
+        """
+        Reads an existing manifest and returns [(stage, data), ...] for the leading run of
+        stages (in the given order) that are recorded and whose data and files still match
+        their hashes. Anything after the first missing or damaged stage is dropped.
+        """
+        if not os.path.exists(self.manifest_path):
+            return []
+        try:
+            with open(self.manifest_path, 'r', encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Unreadable checkpoint for job {self.job_id} ({e}); starting over.")
+            self.discard()
+            return []
+        if manifest.get('inputs') != self.inputs:
+            print(f"System: Checkpoint for job {self.job_id} was made with other inputs; starting over.")
+            self.discard()
+            return []
+        valid = []
+        for stage in stages:
+            entry = manifest.get('stages', {}).get(stage)
+            if entry is None or not self._stage_valid(entry):
+                break
+            valid.append((stage, entry['data']))
+        # Keep only what is reusable, so later saves don't resurrect stages after a gap
+        manifest['stages'] = {stage: manifest['stages'][stage] for stage, _ in valid}
+        self.manifest = manifest
+        return valid
+
+    def discard(self):
+        """Deletes the job directory and everything in it."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.manifest['stages'] = {}
+
+
+class CheckpointStore:
+    """
+    Per-job checkpoints under root (Data/temp/<job_id>/). Directories of jobs that
+    were abandoned (deleted topics, jobs that never came back) are removed by
+    collect_garbage once untouched for max_age_hours.
+    """
+
+    def __init__(self, root="Data/temp", max_age_hours=72, gc_interval_minutes=60):
+        self.root = root
+        self.max_age_seconds = max_age_hours * 3600
+        self.gc_interval_seconds = gc_interval_minutes * 60
+        self._last_gc = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        if not config.get('enabled', True):
+            return None
+        return cls(
+            root=config.get('path', "Data/temp"),
+            max_age_hours=config.get('max_age_hours', 72),
+            gc_interval_minutes=config.get('gc_interval_minutes', 60)
+        )
+
+    def open(self, job_id, inputs):
+        """The checkpoint of a job; inputs (topic, voice...) must match for a saved one to be reused."""
+        return JobCheckpoint(os.path.join(self.root, str(job_id)), job_id, inputs)
+
+    def _is_checkpoint(self, path):
+        # Job directories are named after topic IDs; other Data/temp folders are left alone
+        return os.path.basename(path).isdigit() or os.path.exists(os.path.join(path, MANIFEST))
+
+    def collect_garbage(self, force=False):
+        """Removes checkpoints untouched for max_age_hours (at most once per gc interval unless forced)."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_gc < self.gc_interval_seconds:
+                return 0
+            self._last_gc = now
+        removed = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.root, name)
+            if not os.path.isdir(path) or not self._is_checkpoint(path):
+                continue
+            manifest_path = os.path.join(path, MANIFEST)
+            try:
+                last_used = os.path.getmtime(manifest_path if os.path.exists(manifest_path) else path)
+            except OSError:
+                continue
+            if now - last_used > self.max_age_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"System: Removed {removed} abandoned job checkpoint(s) from {self.root}")
+        return removed
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+import time
+
+from file_lock import FileLock
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+class ClipLibrary:
+    """
+    Persistent, content-addressed stock footage cache.
+    Clips are stored once under objects/ by their SHA-256; index.json maps search
+    queries and Pexels video IDs to those hashes and tracks LRU order for eviction.
+
+    Several worker processes can share one library: flush() re-reads index.json
+    under a file lock and merges this process's additions, removals and accesses
+    into it before writing it back, so no worker overwrites another's entries and
+    max_size_mb is enforced on the combined index.
+    """
+
+    def __init__(self, root="Data/library/stock", max_size_mb=2048, min_variants_per_query=3):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_file = os.path.join(root, "index.json")
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else 0
+        # A query is only served from the library once it has this many distinct
+        # clips, so repeated topics still get some variety from Pexels
+        self.min_variants_per_query = min_variants_per_query
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._added = set()     # digests stored / removed by this process since the last flush
+        self._removed = set()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        if not config.get('enabled', True):
+            return None
+        return cls(
+            root=config.get('path', "Data/library/stock"),
+            max_size_mb=config.get('max_size_mb', 2048),
+            min_variants_per_query=config.get('min_variants_per_query', 3)
+        )
+
+    def _load_index(self):
+        empty = {"clips": {}, "queries": {}, "video_ids": {}}
+        if not os.path.exists(self.index_file):
+            return empty
+        with open(self.index_file, 'r') as f:
+            try:
+                index = json.load(f)
+            except:
+                print("Warning: Clip library index is corrupted. Starting with an empty index.")
+                return empty
+        for key in empty:
+            index.setdefault(key, {})
+        return index
+
+    def _merge_from_disk(self):
+        """Folds the index other workers wrote into this process's view (call under the file lock)."""
+        disk = self._load_index()
+        clips = {}
+        for digest, clip in disk['clips'].items():
+            if digest in self._removed:
+                continue
+            local = self.index['clips'].get(digest)
+            if local is not None:
+                clip = dict(clip, last_access=max(clip.get('last_access', 0), local.get('last_access', 0)),
+                            variants=dict(clip.get('variants', {}), **local.get('variants', {})))
+            clips[digest] = clip
+        # Clips only this process knows about are new ones; the rest were evicted by another worker
+        for digest in self._added:
+            if digest in self.index['clips']:
+                clips.setdefault(digest, self.index['clips'][digest])
+        queries = {}
+        for source in (disk['queries'], self.index['queries']):
+            for q, hashes in source.items():
+                merged = queries.setdefault(q, [])
+                merged.extend(h for h in hashes if h in clips and h not in merged)
+        video_ids = {}
+        for source in (disk['video_ids'], self.index['video_ids']):
+            video_ids.update((vid, h) for vid, h in source.items() if h in clips)
+        self.index = {"clips": clips, "queries": {q: h for q, h in queries.items() if h}, "video_ids": video_ids}
+        self._added.clear()
+        self._removed.clear()
+
+    def flush(self):
+        """Merges this process's changes into index.json (under a file lock) and writes it back atomically."""
+        freed = 0
+        with FileLock(self.index_file + ".lock", self._lock):
+            if not self._dirty:
+                return
+            self._merge_from_disk()
+            if self.max_size_bytes:
+                freed = self._evict(self.max_size_bytes)
+            tmp_path = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_file)
+            self._dirty = False
+        if freed:
+            print(f"System: Clip library evicted {freed / 2**20:.1f} MB of least recently used footage.")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest + ".mp4")
+
+    def _variant_path(self, digest, variant):
+        # Derived files (e.g. normalized transcodes) live next to their source object
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.{variant}.mp4")
+
+    def total_size(self):
+        with self._lock:
+            return sum(c['size'] + sum(c.get('variants', {}).values()) for c in self.index['clips'].values())
+
+    def lookup_query(self, query):
+        """Returns a cached clip hash for the query, or None on a miss."""
+        q = normalize_query(query)
+        with self._lock:
+            hashes = [h for h in self.index['queries'].get(q, []) if h in self.index['clips']]
+            if len(hashes) < max(1, self.min_variants_per_query):
+                return None
+            return random.choice(hashes)
+
+    def lookup_video(self, video_id, query=None):
+        """Returns the hash of an already stored Pexels video and tags it with the query."""
+        with self._lock:
+            digest = self.index['video_ids'].get(str(video_id))
+            if digest not in self.index['clips']:
+                return None
+            if query:
+                self._tag(digest, query)
+            return digest
+
+    def _tag(self, digest, query):
+        q = normalize_query(query)
+        hashes = self.index['queries'].setdefault(q, [])
+        if digest not in hashes:
+            hashes.append(digest)
+            self._dirty = True
+
+    def checkout(self, digest, dest_path, variant=None):
+        """
+        Places a cached clip (or one of its variants) at dest_path, hard linked
+        when possible. Checking out the clip itself records a library hit.
+        """
+        with self._lock:
+            clip = self.index['clips'].get(digest)
+            src = self._variant_path(digest, variant) if variant else self._object_path(digest)
+            if clip is None or not os.path.exists(src) or (variant and variant not in clip.get('variants', {})):
+                return None
+            clip['last_access'] = time.time()
+            if not variant:
+                self.hits += 1
+            self._dirty = True
+
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        try:
+            os.link(src, dest_path)
+        except OSError:
+            shutil.copyfile(src, dest_path)
+        return dest_path
+
+    def add(self, path, video_id=None, query=None):
+        """Stores a freshly downloaded clip (a library miss) and returns its hash."""
+        digest = file_sha256(path)
+        obj_path = self._object_path(digest)
+        with self._lock:
+            self.misses += 1
+            if not os.path.exists(obj_path):
+                os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+                try:
+                    os.link(path, obj_path)
+                except OSError:
+                    shutil.copyfile(path, obj_path)
+
+            clip = self.index['clips'].setdefault(digest, {
+                "size": os.path.getsize(obj_path),
+                "added": time.time(),
+                "video_id": video_id
+            })
+            clip['last_access'] = time.time()
+            self._added.add(digest)
+            self._removed.discard(digest)
+            if video_id is not None:
+                self.index['video_ids'][str(video_id)] = digest
+            if query:
+                self._tag(digest, query)
+            self._dirty = True
+            self.evict(keep=digest)
+        self.flush()
+        return digest
+
+    def add_variant(self, digest, variant, path):
+        """Stores a file derived from a cached clip; it is evicted together with the clip."""
+        with self._lock:
+            clip = self.index['clips'].get(digest)
+            if clip is None:
+                return None
+            dest = self._variant_path(digest, variant)
+            tmp_path = f"{dest}.{threading.get_ident()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, dest)
+            clip.setdefault('variants', {})[variant] = os.path.getsize(dest)
+            self._dirty = True
+            self.evict(keep=digest)
+        self.flush()
+        return dest
+
+    def _remove(self, digest):
+        clip = self.index['clips'].pop(digest, None)
+        self._removed.add(digest)
+        self._added.discard(digest)
+        for variant in (clip or {}).get('variants', {}):
+            try: os.remove(self._variant_path(digest, variant))
+            except: pass
+        for q, hashes in list(self.index['queries'].items()):
+            if digest in hashes:
+                hashes.remove(digest)
+                if not hashes:
+                    del self.index['queries'][q]
+        for vid, h in list(self.index['video_ids'].items()):
+            if h == digest:
+                del self.index['video_ids'][vid]
+        try: os.remove(self._object_path(digest))
+        except: pass
+        self._dirty = True
+
+    def _lru_order(self):
+        return sorted(self.index['clips'], key=lambda h: self.index['clips'][h].get('last_access', 0))
+
+    def evict(self, target_bytes=None, keep=None):
+        """Removes least recently used clips until the library fits target_bytes."""
+        limit = self.max_size_bytes if target_bytes is None else target_bytes
+        if not limit and target_bytes is None:
+            return 0
+        with self._lock:
+            freed = self._evict(limit, keep)
+        if freed:
+            print(f"System: Clip library evicted {freed / 2**20:.1f} MB of least recently used footage.")
+            self.flush()
+        return freed
+
+    def _evict(self, limit, keep=None):
+        freed = 0
+        total = self.total_size()
+        for digest in self._lru_order():
+            if total <= limit:
+                break
+            if digest == keep:
+                continue
+            clip = self.index['clips'][digest]
+            size = clip['size'] + sum(clip.get('variants', {}).values())
+            self._remove(digest)
+            total -= size
+            freed += size
+        return freed
+
+    def free_disk_space(self, min_free_bytes, path="."):
+        """Evicts LRU clips until the disk has min_free_bytes free (or the library is empty)."""
+        freed = 0
+        with self._lock:
+            for digest in self._lru_order():
+                if shutil.disk_usage(path).free >= min_free_bytes:
+                    break
+                clip = self.index['clips'][digest]
+                freed += clip['size'] + sum(clip.get('variants', {}).values())
+                self._remove(digest)
+        if freed:
+            print(f"System: Clip library released {freed / 2**20:.1f} MB to recover disk space.")
+            self.flush()
+        return freed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "clips": len(self.index['clips']),
+                "size_mb": round(self.total_size() / 2**20, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
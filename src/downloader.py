@@ -0,0 +1,71 @@
+import os
+import time
+
+import requests
+
+
+class DownloadError(Exception):
+    """Raised when a file cannot be downloaded within the configured limits."""
+
+
+def stream_download(session, url, dest_path, max_bytes=0, chunk_size=256 * 1024,
+                    max_retries=3, timeout=30, before_request=None):
+    """
+    Streams url to dest_path in chunks without holding the file in memory.
+    Data goes to '<dest_path>.part' first and is renamed into place only once
+    complete, so a half-written clip never ends up at dest_path. Dropped
+    connections are resumed with an HTTP Range request.
+    Returns {"bytes", "seconds", "resumes"}.
+    """
+    part_path = dest_path + ".part"
+    written = 0
+    resumes = 0
+    start = time.time()
+
+    try:
+        with open(part_path, 'wb') as f:
+            attempt = 0
+            while True:
+                headers = {"Range": f"bytes={written}-"} if written else {}
+                if before_request:
+                    before_request(url)
+                try:
+                    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                        response.raise_for_status()
+
+                        if written and response.status_code != 206:
+                            # Server ignored the Range header; start over
+                            f.seek(0)
+                            f.truncate()
+                            written = 0
+
+                        length = response.headers.get("Content-Length")
+                        if max_bytes and length and written + int(length) > max_bytes:
+                            raise DownloadError(f"{url} is {int(length) / 2**20:.1f} MB, over the "
+                                                f"{max_bytes / 2**20:.0f} MB limit")
+
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if not chunk:
+                                continue
+                            written += len(chunk)
+                            if max_bytes and written > max_bytes:
+                                raise DownloadError(f"{url} exceeded the {max_bytes / 2**20:.0f} MB limit")
+                            f.write(chunk)
+                    break
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError,
+                        requests.exceptions.Timeout) as e:
+                    attempt += 1
+                    if attempt > max_retries:
+                        raise DownloadError(f"Giving up on {url} after {max_retries} retries: {e}")
+                    resumes += 1
+                    print(f"Download interrupted at {written / 2**20:.1f} MB, resuming ({attempt}/{max_retries})...")
+                    time.sleep(min(2 ** attempt, 10))
+
+        os.replace(part_path, dest_path)
+    except BaseException:
+        try: os.remove(part_path)
+        except: pass
+        raise
+
+    return {"bytes": written, "seconds": time.time() - start, "resumes": resumes}
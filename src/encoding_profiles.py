@@ -0,0 +1,67 @@
+import os
+
+from media_tools import parse_resolution
+
+# Two tiers: draft renders fast and small for previewing a job, final is what gets published.
+# Keys left out of video_settings.profiles fall back to these.
+DEFAULT_PROFILES = {
+    "draft": {
+        "resolution": "480p",
+        "fps": 24,
+        "preset": "ultrafast",
+        "crf": 30,
+        "threads": 0
+    },
+    "final": {
+        "resolution": None,    # None = video_settings.resolution
+        "fps": None,           # None = video_settings.frame_rate
+        "preset": "medium",
+        "crf": 21,
+        "threads": 0
+    }
+}
+
+
+def encode_threads(threads=0, parallel_renders=1):
+    """
+    x264 threads for one encode. 0 = this machine's cores, shared between the
+    renders that can run at once, so the same settings suit a laptop and a server.
+    """
+    if threads:
+        return int(threads)
+    return max(1, (os.cpu_count() or 1) // max(1, parallel_renders))
+
+
+def resolve_profile(video_settings, name=None, parallel_renders=1):
+    """
+    Returns the named encoding profile (video_settings.profile when name is None)
+    as {name, width, height, fps, preset, crf, threads}.
+    """
+    video_settings = video_settings or {}
+    name = name or video_settings.get('profile', "final")
+    configured = video_settings.get('profiles', {}) or {}
+    if name not in configured and name not in DEFAULT_PROFILES:
+        print(f"Warning: Unknown encoding profile '{name}', using 'final'")
+        name = "final"
+
+    profile = dict(DEFAULT_PROFILES.get(name, DEFAULT_PROFILES['final']))
+    profile.update(configured.get(name) or {})
+    width, height = parse_resolution(profile.get('resolution') or video_settings.get('resolution', "720p"))
+    return {
+        "name": name,
+        "width": width,
+        "height": height,
+        "fps": profile.get('fps') or video_settings.get('frame_rate', 30),
+        "preset": profile.get('preset', "medium"),
+        "crf": profile.get('crf', 23),
+        "threads": encode_threads(profile.get('threads', 0), parallel_renders)
+    }
+
+
+def profile_names(video_settings):
+    """Every profile defined by default or in settings."""
+    names = list(DEFAULT_PROFILES)
+    for name in ((video_settings or {}).get('profiles') or {}):
+        if name not in names:
+            names.append(name)
+    return names
@@ -0,0 +1,188 @@
+import os
+import random
+import time
+
+from caption_sprites import DEFAULT_STYLE, load_font
+from media_tools import media_duration, probe_duration, run_ffmpeg
+
+WINDOWS_FONTS_DIR = r"C:\Windows\Fonts"
+
+
+def _ass_time(seconds):
+    cs = int(round(max(0.0, seconds) * 100))
+    return f"{cs // 360000}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+def _ass_text(text):
+    return text.replace("\\", "\\\\").replace("{", "(").replace("}", ")").replace("\n", " ")
+
+
+def _ass_colour(color, default):
+    # ASS colours are &HAABBGGRR; style colours are anything Pillow understands ("yellow", "#ffcc00"...)
+    try:
+        from PIL import ImageColor
+        r, g, b = ImageColor.getrgb(color)[:3]
+    except (ImportError, ValueError, AttributeError):
+        return default
+    return f"&H00{b:02X}{g:02X}{r:02X}"
+
+
+def _ass_font(font):
+    """Font family libass should look up for a style's font (a file path or a family name)."""
+    try:
+        return load_font(font, 12).getname()[0]
+    except (ImportError, OSError, AttributeError):
+        return "Arial"
+
+
+def _fonts_dir(font):
+    if font and os.path.isfile(font):
+        return os.path.dirname(os.path.abspath(font))
+    return WINDOWS_FONTS_DIR if os.path.isdir(WINDOWS_FONTS_DIR) else None
+
+
+def write_ass(subtitle_segments, path, width, height, style=DEFAULT_STYLE, top=850):
+    """
+    Writes caption segments as an ASS subtitle file for the output canvas. style and top
+    are the caption look already sized for this canvas (VideoEngine.caption_layout), so
+    both backends draw the same captions.
+    """
+    margin = int(width * 0.05)  # wrapped to 90% of the width, like the MoviePy backend
+    colour = _ass_colour(style['color'], "&H0000FFFF")
+    outline = _ass_colour(style['stroke_color'], "&H00000000")
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        # Bold, outline border; alignment 8 = top centre
+        f"Style: Caption,{_ass_font(style['font'])},{style['font_size']},{colour},{colour},{outline},"
+        f"&H00000000,-1,0,0,0,100,100,0,0,1,{style['stroke_width']},0,8,{margin},{margin},{int(top)},1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+    ]
+    for segment in subtitle_segments:
+        if segment['end'] - segment['start'] <= 0:
+            continue
+        lines.append(f"Dialogue: 0,{_ass_time(segment['start'])},{_ass_time(segment['end'])},Caption,,0,0,0,,"
+                     f"{_ass_text(segment['text'].strip().upper())}")
+    with open(path, 'w', encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def _filter_path(path):
+    # Filter arguments treat ':' and '\' specially (Windows drive letters)
+    return os.path.abspath(path).replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+
+def build_render_command(audio_path, scene_clips, output_path, ass_path,
+                         width=1920, height=1080, fps=24, crossfade=0.5, zoom=0.15,
+                         preset="veryfast", crf=23, threads=0, audio_duration=None, fonts_dir=None):
+    """
+    Builds the ffmpeg arguments for one render:
+      - each scene clip is looped or cut to its duration (random start when long enough),
+        scaled to cover the canvas and given a Ken Burns zoom in or out with zoompan
+      - consecutive scenes are joined with crossfade-second xfade transitions
+      - captions are burned in from an ASS file, and the voiceover is muxed as AAC
+    A scene without a usable clip reuses the previous one. Returns None if no scene has a clip.
+    """
+    inputs = []
+    filters = []
+    durations = []
+    last_valid = None
+    for path, duration in scene_clips:
+        if path and os.path.exists(path):
+            last_valid = path
+        elif last_valid:
+            path = last_valid
+        else:
+            continue
+
+        clip_duration = probe_duration(path) or 0
+        start_offset = 0
+        # Same random draws, in the same order, as the MoviePy backend
+        if clip_duration > duration + 2:
+            start_offset = random.uniform(0, clip_duration - duration - 1)
+        is_zoom_in = random.choice([True, False])
+
+        index = len(durations)
+        if clip_duration < duration:
+            inputs += ["-stream_loop", "-1"]
+        inputs += ["-ss", f"{start_offset:.3f}", "-t", f"{duration:.3f}", "-i", path]
+
+        frames = max(1, int(round(duration * fps)))
+        z = f"1+{zoom}*on/{frames}" if is_zoom_in else f"{1 + zoom}-{zoom}*on/{frames}"
+        filters.append(
+            f"[{index}:v]fps={fps},scale={width}:{height}:force_original_aspect_ratio=increase,"
+            f"crop={width}:{height},setsar=1,"
+            f"zoompan=z='{z}':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':d=1:s={width}x{height}:fps={fps},"
+            # xfade needs a constant, declared frame rate on both inputs
+            f"trim=duration={duration:.3f},setpts=PTS-STARTPTS,fps={fps},settb=AVTB,format=yuv420p[v{index}]"
+        )
+        durations.append(duration)
+
+    if not durations:
+        return None
+
+    # Chain the crossfades: each transition starts crossfade seconds before the running end
+    current = "v0"
+    length = durations[0]
+    for i in range(1, len(durations)):
+        fade = min(crossfade, durations[i] / 2, length / 2)
+        filters.append(f"[{current}][v{i}]xfade=transition=fade:duration={fade:.3f}:offset={length - fade:.3f}[x{i}]")
+        current = f"x{i}"
+        length += durations[i] - fade
+
+    total = audio_duration or length
+    tail = f"[{current}]"
+    if total > length:
+        # Hold the last frame if the narration runs past the footage
+        tail += f"tpad=stop_mode=clone:stop_duration={total - length:.3f},"
+    else:
+        tail += "null,"
+    fonts = f":fontsdir='{_filter_path(fonts_dir)}'" if fonts_dir else ""
+    filters.append(f"{tail}subtitles=filename='{_filter_path(ass_path)}'{fonts}[vout]")
+
+    audio_index = len(durations)
+    return ["-y"] + inputs + ["-i", audio_path,
+            "-filter_complex", ";".join(filters),
+            "-map", "[vout]", "-map", f"{audio_index}:a",
+            "-t", f"{total:.3f}", "-r", str(fps),
+            "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p",
+            "-threads", str(threads), "-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart", output_path]
+
+
+def render_with_ffmpeg(audio_path, scene_clips, subtitle_segments, output_path,
+                       width=1920, height=1080, fps=24, preset="veryfast", crf=23, threads=0, timeout=None,
+                       caption_style=DEFAULT_STYLE, caption_top=850):
+    """
+    Renders the video as a single ffmpeg process. caption_style/caption_top are the caption
+    look for this canvas size. Returns output_path, or None if nothing to render.
+    """
+    print("Rendering with the ffmpeg filter-graph backend...")
+    start = time.time()
+    ass_path = os.path.splitext(output_path)[0] + ".ass"
+    write_ass(subtitle_segments, ass_path, width, height, caption_style, caption_top)
+    try:
+        args = build_render_command(audio_path, scene_clips, output_path, ass_path,
+                                    width, height, fps, preset=preset, crf=crf, threads=threads,
+                                    audio_duration=media_duration(audio_path),
+                                    fonts_dir=_fonts_dir(caption_style['font']))
+        if args is None:
+            print("Error: No valid visual clips to render.")
+            return None
+        run_ffmpeg(args, timeout=timeout)
+    finally:
+        try: os.remove(ass_path)
+        except: pass
+    print(f"System: ffmpeg render finished in {time.time() - start:.1f}s")
+    return output_path
@@ -0,0 +1,33 @@
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+
+class FileLock:
+    """
+    Thread lock + (on POSIX) an exclusive flock on a sidecar file, for state that
+    several threads and worker processes read-modify-write (history log, clip index).
+    """
+
+    def __init__(self, lock_path, thread_lock):
+        self.lock_path = lock_path
+        self.thread_lock = thread_lock
+        self.fd = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if fcntl:
+            self.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+        self.thread_lock.release()
+        return False
@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from file_lock import FileLock
+
+
+class HistoryLog:
+    """
+    Append-only completion history (JSON Lines).
+    Each completion is one O_APPEND write, so adding a record costs the same no
+    matter how long the history is, and several workers can append to the same
+    file. Daily/total counts are kept in memory and advanced by tailing only the
+    bytes added since the last read; a small stats snapshot lets restarts skip
+    re-reading the whole log.
+    """
+
+    def __init__(self, path="Data/completed.jsonl", legacy_path="Data/completed.json",
+                 fsync_every=8, fsync_interval=5.0, compact_every=1000):
+        self.path = path
+        self.stats_path = path + ".stats"
+        self.lock_path = path + ".lock"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._fd = None
+        self._ino = None
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self._appended_since_compact = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+        self._load_stats()
+        self.refresh()
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        return cls(
+            path=config.get('path', "Data/completed.jsonl"),
+            legacy_path=config.get('legacy_path', "Data/completed.json"),
+            fsync_every=config.get('fsync_every', 8),
+            fsync_interval=config.get('fsync_interval_seconds', 5.0),
+            compact_every=config.get('compact_every', 1000)
+        )
+
+    # --- file locking (cross-process) ---
+
+    def _file_lock(self):
+        return FileLock(self.lock_path, self._lock)
+
+    def _open(self):
+        """(Re)opens the log for appending; reopens if compaction replaced the file."""
+        try:
+            current_ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current_ino = None
+        if self._fd is not None and self._ino == current_ino:
+            return
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._ino = os.fstat(self._fd).st_ino
+
+    # --- stats ---
+
+    def _reset_stats(self):
+        self._read_ino = None
+        self.offset = 0
+        self.total = 0
+        self.daily = defaultdict(int)
+
+    def _load_stats(self):
+        self._reset_stats()
+        if not os.path.exists(self.stats_path) or not os.path.exists(self.path):
+            return
+        with open(self.stats_path, 'r') as f:
+            try:
+                stats = json.load(f)
+            except:
+                return
+        # A snapshot of a different (compacted/replaced) log file is stale
+        st = os.stat(self.path)
+        if stats.get("ino") == st.st_ino and stats.get("offset", 0) <= st.st_size:
+            self._read_ino = st.st_ino
+            self.offset = stats.get("offset", 0)
+            self.total = stats.get("total", 0)
+            self.daily.update(stats.get("daily", {}))
+
+    def _save_stats(self):
+        tmp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"ino": self._read_ino, "offset": self.offset, "total": self.total,
+                       "daily": dict(self.daily)}, f)
+        os.replace(tmp_path, self.stats_path)
+
+    def _count(self, record):
+        if record.get("status", "success") != "success":
+            return
+        self.total += 1
+        day = str(record.get("completion_timestamp", ""))[:10]
+        if day:
+            self.daily[day] += 1
+
+    def refresh(self):
+        """Counts records appended (by any process) since the last read."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if self._read_ino not in (None, st.st_ino) or st.st_size < self.offset:
+                # Another process compacted the log; recount from the start
+                self._reset_stats()
+            self._read_ino = st.st_ino
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+            # Only consume complete lines; a torn final line is picked up once finished
+            end = data.rfind(b"\n")
+            if end < 0:
+                return
+            for line in data[:end].split(b"\n"):
+                try:
+                    self._count(json.loads(line))
+                except ValueError:
+                    continue
+            self.offset += end + 1
+
+    # --- writing ---
+
+    def append(self, record):
+        """Appends one record; fsyncs in batches (every N records or T seconds)."""
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        with self._file_lock():
+            self._open()
+            # Never glue a record onto a line a crashed writer left unfinished
+            size = os.fstat(self._fd).st_size
+            if size:
+                with open(self.path, 'rb') as f:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+            os.write(self._fd, line)
+            self._unsynced += 1
+            self._appended_since_compact += 1
+            if self._unsynced >= self.fsync_every or time.time() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+        self.refresh()
+        if self.compact_every and self._appended_since_compact >= self.compact_every:
+            self.compact()
+
+    def _sync(self):
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_fsync = time.time()
+        self._save_stats()
+
+    def flush(self):
+        """Forces pending records to disk."""
+        with self._file_lock():
+            self._sync()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    # --- reading ---
+
+    def iter_records(self):
+        """Streams history records one at a time without loading the whole file."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # record still being written
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def daily_count(self, day=None):
+        day = day or time.strftime("%Y-%m-%d")
+        self.refresh()
+        return self.daily.get(day, 0)
+
+    def total_count(self):
+        self.refresh()
+        return self.total
+
+    # --- maintenance ---
+
+    def compact(self):
+        """
+        Rewrites the log without corrupt/torn lines or exact duplicate records and
+        recomputes the counters. Other writers notice the new inode and reopen.
+        """
+        with self._file_lock():
+            tmp_path = f"{self.path}.{os.getpid()}.compact"
+            seen = set()
+            kept = 0
+            with open(tmp_path, 'w', encoding="utf-8") as out:
+                for record in self.iter_records():
+                    key = json.dumps(record, sort_keys=True)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    out.write(json.dumps(record) + "\n")
+                    kept += 1
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, self.path)
+            self._reset_stats()
+            self.refresh()
+            self._open()
+            self._appended_since_compact = 0
+            self._sync()
+        print(f"System: Compacted completion history ({kept} records).")
+
+    def _import_legacy(self, legacy_path):
+        """One-time conversion of the old completed.json array into JSON Lines."""
+        with open(legacy_path, 'r') as f:
+            try:
+                records = json.load(f)
+            except:
+                records = []
+        tmp_path = self.path + ".import"
+        with open(tmp_path, 'w', encoding="utf-8") as out:
+            for record in records:
+                out.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+        print(f"System: Converted {len(records)} history entries from {legacy_path} to {self.path}")
+
@@ -1,8 +1,11 @@
 from topic_manager import TopicManager
 from video_engine import VideoEngine
+from pipeline import PipelineScheduler
+from metrics import get_metrics
+from queue_watcher import QueueWatcher, sleep_until_next_day
+from settings import get_settings
 import time
 import os
-import yaml
 import shutil
 
 def check_disk_space(path=".", min_gb=1):
@@ -11,16 +14,30 @@ def check_disk_space(path=".", min_gb=1):
     free_gb = free / (2**30)
     return free_gb >= min_gb
 
+def update_gauges(tm, path="."):
+    """Refreshes the queue depth, disk free and daily count gauges (skipped while metrics are off)."""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+    metrics.set_gauge("queue_depth", tm.queue_depth())
+    metrics.set_gauge("disk_free_bytes", shutil.disk_usage(path).free)
+    metrics.set_gauge("videos_today", tm.get_daily_count())
+
+def release_job(tm, job):
+    """Returns a job abandoned by an error to the queue, so its lease isn't heartbeated forever."""
+    if not job:
+        return
+    try:
+        tm.rollback_topic(job['id'])
+    except Exception as e:
+        print(f"Warning: Could not roll back Topic ID {job['id']}: {e}")
+
 def start_bot():
     """Main entry point to start the autonomous YT_BOT pipeline"""
     print("--- YT_BOT v2.0: AUTONOMOUS SYSTEM INITIALIZING ---")
     
-    # Load settings
-    with open("config/settings.yaml", "r") as f:
-        settings = yaml.safe_load(f)
-    
-    check_interval = settings['automation_settings']['check_interval_seconds']
-    retry_delay = settings['automation_settings']['retry_delay_seconds']
+    # Loaded once and shared with TopicManager and VideoEngine; edits are picked up while running
+    settings = get_settings()
 
     tm = TopicManager()
     ve = VideoEngine()
@@ -28,37 +45,74 @@ def start_bot():
     # Reset any topics that were interrupted
     tm.reset_stuck_topics()
 
+    # Wake up on queue.json changes or local enqueue requests; check_interval is only the fallback poll
+    watcher = QueueWatcher.from_settings(settings['automation_settings'], tm.queue_file, tm.add_topic)
+    if watcher:
+        watcher.start()
+
+    # Staged mode: overlap network-bound and CPU-bound work of consecutive jobs
+    if settings.get('pipeline_settings', {}).get('enabled', False):
+        PipelineScheduler(tm, ve, settings, disk_check=check_disk_space, gauges=update_gauges,
+                          watcher=watcher).run()
+        return
+
     while True:
+        settings.refresh()
+        check_interval = settings['automation_settings'].get('check_interval_seconds', 30)
+        retry_delay = settings['automation_settings'].get('retry_delay_seconds', 60)
+        prefetch_count = settings.get('script_cache_settings', {}).get('prefetch_count', 0)
+        current_job = None
         try:
+            if not check_disk_space() and ve.library:
+                # Stock footage is re-downloadable, so it is the first thing to go
+                ve.library.free_disk_space(min_free_bytes=2**30)
+            
             if not check_disk_space():
                 print(f"[{time.strftime('%H:%M:%S')}] CRITICAL: Low disk space! Waiting for cleanup...")
                 time.sleep(300)
                 continue
                 
             print(f"[{time.strftime('%H:%M:%S')}] Checking queue...")
+            update_gauges(tm)
             current_job = tm.get_next_topic()
             
             if current_job:
                 print(f"Task Identified: {current_job['content']}")
                 
+                # Scripts for the next topics are generated while this one renders
+                if prefetch_count:
+                    ve.prefetch_scripts(tm.upcoming_topics(prefetch_count))
+                
                 # Content Generation
                 video_info = ve.generate_content(current_job)
                 
                 if video_info:
                     tm.mark_as_done(current_job['id'], video_info['video_path'])
                     print(f"MISSION COMPLETE: {video_info['video_path']}")
+                elif current_job.get('rejected'):
+                    # Retrying would only regenerate an unsafe script
+                    tm.reject_topic(current_job['id'], current_job['rejected'])
                 else:
                     print("Generation failed. Rolling back topic status.")
                     tm.rollback_topic(current_job['id'])
+            elif tm.daily_limit_reached():
+                sleep_until_next_day(settings)
+            elif watcher:
+                print(f"Waiting for new topics (checking again within {check_interval} seconds)...")
+                reason = watcher.wait(check_interval)
+                if reason:
+                    print(f"System: Woken up by {reason}")
             else:
                 print(f"Sleeping for {check_interval} seconds...")
                 time.sleep(check_interval)
                 
         except ConnectionError:
             print(f"Network Error! Re-trying in {retry_delay} seconds...")
+            release_job(tm, current_job)
             time.sleep(retry_delay)
         except Exception as e:
             print(f"Unexpected Error: {e}")
+            release_job(tm, current_job)
             time.sleep(60) # Short sleep on generic error
 
 if __name__ == "__main__":
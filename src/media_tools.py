@@ -0,0 +1,201 @@
+import glob
+import os
+import re
+import shutil
+import subprocess
+import threading
+
+# Named resolutions used in settings.yaml -> (width, height) of a 16:9 landscape frame
+NAMED_RESOLUTIONS = {
+    "360p": (640, 360),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "2160p": (3840, 2160),
+    "4k": (3840, 2160)
+}
+
+
+def parse_resolution(value, default=(1920, 1080)):
+    """Turns '720p', '1280x720' or 720 into a (width, height) tuple."""
+    if value is None:
+        return default
+    if isinstance(value, int):
+        return (int(round(value * 16 / 9 / 2)) * 2, value)
+    text = str(value).strip().lower()
+    if text in NAMED_RESOLUTIONS:
+        return NAMED_RESOLUTIONS[text]
+    match = re.fullmatch(r"(\d+)\s*[x:]\s*(\d+)", text)
+    if match:
+        return (int(match.group(1)), int(match.group(2)))
+    match = re.fullmatch(r"(\d+)p", text)
+    if match:
+        return parse_resolution(int(match.group(1)))
+    print(f"Warning: Unknown resolution '{value}', using {default[0]}x{default[1]}")
+    return default
+
+
+# Where to look for each external binary, after the path set in settings.yaml (media_binaries):
+# environment variables MoviePy/imageio already honour, commands on PATH, then common install locations
+BINARIES = {
+    "ffmpeg": {
+        "env": ("FFMPEG_BINARY", "IMAGEIO_FFMPEG_EXE"),
+        "commands": ("ffmpeg",),
+        "globs": (r"C:\ffmpeg\bin\ffmpeg.exe", r"C:\Program Files\ffmpeg*\bin\ffmpeg.exe",
+                  "/opt/homebrew/bin/ffmpeg", "/usr/local/bin/ffmpeg")
+    },
+    "imagemagick": {
+        "env": ("IMAGEMAGICK_BINARY",),
+        # 'convert' on Windows is the filesystem tool, not ImageMagick
+        "commands": ("magick",) if os.name == "nt" else ("magick", "convert"),
+        "globs": (r"C:\Program Files\ImageMagick-*\magick.exe", "/opt/homebrew/bin/magick", "/usr/local/bin/magick")
+    }
+}
+
+_configured_paths = {}   # name -> path from settings.yaml
+_binary_paths = {}       # name -> resolved path (None if not found), cached for the process
+_binaries_lock = threading.Lock()
+_exported = False
+
+
+def configure_binaries(config):
+    """Applies settings.yaml media_binaries ({ffmpeg: path, imagemagick: path}, empty = auto-detect)."""
+    config = config or {}
+    with _binaries_lock:
+        for name in BINARIES:
+            path = config.get(name) or None
+            if _configured_paths.get(name) != path:
+                _configured_paths[name] = path
+                _binary_paths.pop(name, None)
+
+
+def _resolve_binary(name):
+    lookup = BINARIES[name]
+    configured = _configured_paths.get(name)
+    if configured:
+        if os.path.exists(configured):
+            return configured
+        print(f"Warning: media_binaries.{name} '{configured}' does not exist, searching for {name} instead.")
+    for var in lookup["env"]:
+        path = os.environ.get(var)
+        if path and os.path.exists(path):
+            return path
+    if name == "ffmpeg":
+        # The copy bundled with imageio-ffmpeg, which MoviePy uses by default
+        try:
+            import imageio_ffmpeg
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            pass
+    for command in lookup["commands"]:
+        path = shutil.which(command)
+        if path:
+            return path
+    for pattern in lookup["globs"]:
+        matches = sorted(glob.glob(pattern))
+        if matches:
+            return matches[-1]
+    return None
+
+
+def find_binary(name):
+    """Path of an external binary ('ffmpeg' or 'imagemagick'), looked up once per process; None if missing."""
+    with _binaries_lock:
+        if name not in _binary_paths:
+            _binary_paths[name] = _resolve_binary(name)
+        return _binary_paths[name]
+
+
+def ffmpeg_exe():
+    """Path of the ffmpeg binary MoviePy uses (media_binaries, FFMPEG_BINARY, imageio-ffmpeg's copy, or PATH)."""
+    return find_binary("ffmpeg") or "ffmpeg"
+
+
+def export_binaries():
+    """
+    Points MoviePy (FFMPEG_BINARY, IMAGEMAGICK_BINARY) and anything calling plain
+    'ffmpeg', like Whisper, at the resolved binaries. Call before importing MoviePy;
+    child processes inherit the variables, so they skip the search.
+    """
+    global _exported
+    if _exported:
+        return
+    _exported = True
+    ffmpeg = find_binary("ffmpeg")
+    if ffmpeg:
+        os.environ["FFMPEG_BINARY"] = ffmpeg
+        os.environ["IMAGEIO_FFMPEG_EXE"] = ffmpeg
+        ffmpeg_dir = os.path.dirname(ffmpeg)
+        if ffmpeg_dir and ffmpeg_dir not in os.environ.get("PATH", "").split(os.pathsep):
+            os.environ["PATH"] = os.environ.get("PATH", "") + os.pathsep + ffmpeg_dir
+    else:
+        print("Warning: ffmpeg not found; set media_binaries.ffmpeg in config/settings.yaml.")
+    imagemagick = find_binary("imagemagick")
+    if imagemagick:
+        os.environ["IMAGEMAGICK_BINARY"] = imagemagick
+
+
+def run_ffmpeg(args, timeout=None, check=True):
+    """Runs ffmpeg quietly; raises RuntimeError with the tail of its log on failure."""
+    result = subprocess.run([ffmpeg_exe(), "-hide_banner", "-nostdin"] + list(args),
+                            capture_output=True, text=True, timeout=timeout)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+    return result
+
+
+def probe_duration(path):
+    """Container duration from ffmpeg's header probe (fast, no decoding); None if unknown."""
+    # With no output file ffmpeg exits non-zero, but the probe is already in the log
+    result = run_ffmpeg(["-i", path], check=False)
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    h, m, s = match.groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def media_duration(path):
+    """Exact duration in seconds, measured by decoding the file (header values can be off for MP3)."""
+    result = run_ffmpeg(["-i", path, "-f", "null", "-"])
+    times = re.findall(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not times:
+        raise RuntimeError(f"Could not measure the duration of {path}")
+    h, m, s = times[-1]
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def concat_audio(paths, output_path, bitrate="96k"):
+    """
+    Joins audio files in order into one MP3 (audio only, no video work).
+    Uses the concat filter on decoded audio rather than stream copy: copying
+    MP3 packets keeps every segment's encoder padding, which drifts the joined
+    track ~40 ms per segment away from the measured segment durations.
+    """
+    args = ["-y"]
+    for path in paths:
+        args += ["-i", path]
+    inputs = "".join(f"[{i}:a]" for i in range(len(paths)))
+    args += ["-filter_complex", f"{inputs}concat=n={len(paths)}:v=0:a=1[a]", "-map", "[a]",
+             "-c:a", "libmp3lame", "-b:a", bitrate, output_path]
+    run_ffmpeg(args)
+    return output_path
+
+
+def normalize_clip(src, dest, height=1080, fps=24, gop_seconds=1.0, max_seconds=0, preset="veryfast", crf=20):
+    """
+    Transcodes a stock clip into the render's intermediate format: scaled to the
+    canvas height (width follows the aspect ratio), constant fps, no audio, and a
+    keyframe every gop_seconds so any start offset is a cheap seek.
+    """
+    gop = max(1, int(round(fps * gop_seconds)))
+    args = ["-y", "-i", src, "-an", "-sn", "-dn"]
+    if max_seconds:
+        args += ["-t", str(max_seconds)]
+    args += ["-vf", f"fps={fps},scale=-2:{height},setsar=1",
+             "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p",
+             "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+             "-movflags", "+faststart", dest]
+    run_ffmpeg(args)
+    return dest
@@ -0,0 +1,246 @@
+import itertools
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+PREFIX = "ytbot_"
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    escaped = [(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in key]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class _Span:
+    """Times a block; recorded as <name>_seconds and written to the trace when it closes."""
+
+    __slots__ = ("metrics", "name", "labels", "id", "parent", "start", "wall_start")
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        stack = self.metrics._stack()
+        self.parent = stack[-1].id if stack else None
+        self.id = next(self.metrics._span_ids)
+        stack.append(self)
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        stack = self.metrics._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.metrics._finish_span(self, seconds, exc_type)
+        return False
+
+
+class Metrics:
+    """
+    In-process counters, gauges and timed spans.
+
+      - counters only go up (API calls, bytes downloaded, retries, fallbacks)
+      - gauges hold the latest value (queue depth, disk free)
+      - spans time a block of code; each name keeps a count/sum summary and,
+        if trace_path is set, every span is appended to a JSON-lines trace
+
+    render_prometheus() returns everything in the Prometheus text format, and
+    serve() exposes it on http://host:port/metrics.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_path=None):
+        self.counters = {}   # (name, label key) -> value
+        self.gauges = {}
+        self.summaries = {}  # (name, label key) -> [count, sum]
+        self.trace_path = trace_path
+        self._trace_file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._span_ids = itertools.count(1)
+        self._server = None
+        if trace_path:
+            os.makedirs(os.path.dirname(trace_path) or ".", exist_ok=True)
+            self._trace_file = open(trace_path, 'a', encoding="utf-8")
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self.summaries.setdefault(key, [0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+
+    def span(self, name, **labels):
+        """with metrics.span("stage", stage="render"): ..."""
+        return _Span(self, name, labels)
+
+    def _finish_span(self, span, seconds, exc_type):
+        self.observe(span.name + "_seconds", seconds, **span.labels)
+        if exc_type is not None:
+            self.inc("span_errors_total", span=span.name)
+        self.trace({"type": "span", "name": span.name, "id": span.id, "parent": span.parent,
+                    "start": round(span.wall_start, 6), "seconds": round(seconds, 6),
+                    "labels": span.labels, "error": exc_type.__name__ if exc_type else None})
+
+    def trace(self, record):
+        """Appends one record to the JSON-lines trace (if enabled)."""
+        if self._trace_file is None:
+            return
+        record.setdefault("ts", round(time.time(), 6))
+        record.setdefault("thread", threading.current_thread().name)
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._trace_file.write(line)
+            self._trace_file.flush()
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            summaries = {k: list(v) for k, v in self.summaries.items()}
+        lines = []
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({n for n, _ in values}):
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+                for (n, key), value in sorted(values.items()):
+                    if n == name:
+                        lines.append(f"{PREFIX}{name}{_format_labels(key)} {value}")
+        for name in sorted({n for n, _ in summaries}):
+            lines.append(f"# TYPE {PREFIX}{name} summary")
+            for (n, key), (count, total) in sorted(summaries.items()):
+                if n == name:
+                    lines.append(f"{PREFIX}{name}_count{_format_labels(key)} {count}")
+                    lines.append(f"{PREFIX}{name}_sum{_format_labels(key)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serves /metrics on a background thread; returns the bound port."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            if self._trace_file:
+                self._trace_file.close()
+                self._trace_file = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullMetrics:
+    """Stand-in used while metrics are disabled: every call returns immediately."""
+
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def set_gauge(self, name, value, **labels):
+        pass
+
+    def observe(self, name, value, **labels):
+        pass
+
+    def span(self, name, **labels):
+        return _NULL_SPAN
+
+    def trace(self, record):
+        pass
+
+    def render_prometheus(self):
+        return ""
+
+    def close(self):
+        pass
+
+
+_metrics = NullMetrics()
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """The process-wide metrics instance (a no-op NullMetrics until configure_metrics enables it)."""
+    return _metrics
+
+
+def configure_metrics(config):
+    """Sets up metrics from metrics_settings: {enabled, trace_path, prometheus_port, prometheus_host}."""
+    global _metrics
+    config = config or {}
+    with _metrics_lock:
+        if not config.get('enabled', False):
+            return _metrics
+        if isinstance(_metrics, Metrics):
+            return _metrics
+        _metrics = Metrics(config.get('trace_path'))
+        port = config.get('prometheus_port', 0)
+        if port:
+            try:
+                port = _metrics.serve(port, config.get('prometheus_host', "127.0.0.1"))
+                print(f"System: Metrics at http://{config.get('prometheus_host', '127.0.0.1')}:{port}/metrics")
+            except OSError as e:
+                print(f"Warning: Could not start the metrics endpoint on port {port}: {e}")
+        return _metrics
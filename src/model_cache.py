@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class WhisperModelCache:
+    """
+    Process-wide cache of loaded Whisper models.
+    Models are keyed by (name, device, fp16) and loaded lazily on first use.
+    """
+
+    def __init__(self, max_models=1, idle_evict_seconds=0):
+        self.max_models = max_models
+        self.idle_evict_seconds = idle_evict_seconds
+        self._models = OrderedDict()   # key -> (model, last_used)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+        self.load_times = {}           # key -> seconds of the most recent load
+
+    def configure(self, config):
+        """Applies the 'whisper_config' section of settings.yaml."""
+        config = config or {}
+        self.max_models = config.get('max_loaded_models', self.max_models)
+        self.idle_evict_seconds = config.get('idle_evict_seconds', self.idle_evict_seconds)
+
+        for name in config.get('preload', []) or []:
+            self.get(name, config.get('device', 'cpu'), config.get('fp16', False))
+
+    def _key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get(self, name="base", device="cpu", fp16=False):
+        """Returns a loaded model, loading it only if it is not cached yet."""
+        key = (name, device, bool(fp16))
+        self.evict_idle()
+
+        with self._lock:
+            if key in self._models:
+                model, _ = self._models.pop(key)
+                self._models[key] = (model, time.time())
+                self.hits += 1
+                return model
+
+        # Only one thread loads a given model; the others wait and then hit the cache
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._models:
+                    model, _ = self._models[key]
+                    self.hits += 1
+                    return model
+
+            import whisper
+            print(f"System: Loading Whisper model '{name}' on {device}...")
+            start = time.time()
+            model = whisper.load_model(name, device=device)
+            elapsed = time.time() - start
+
+            with self._lock:
+                self.misses += 1
+                self.load_seconds += elapsed
+                self.load_times[key] = elapsed
+                self._models[key] = (model, time.time())
+                while self.max_models and len(self._models) > self.max_models:
+                    old_key, _ = self._models.popitem(last=False)
+                    print(f"System: Evicted Whisper model {old_key} from cache.")
+
+            print(f"System: Whisper model '{name}' loaded in {elapsed:.1f}s")
+            return model
+
+    def evict(self, name=None, device=None, fp16=None):
+        """Drops cached models matching the given fields (all models if none given)."""
+        with self._lock:
+            for key in list(self._models):
+                if name is not None and key[0] != name:
+                    continue
+                if device is not None and key[1] != device:
+                    continue
+                if fp16 is not None and key[2] != bool(fp16):
+                    continue
+                del self._models[key]
+
+    def evict_idle(self):
+        """Drops models that have not been used for idle_evict_seconds."""
+        if not self.idle_evict_seconds:
+            return
+        cutoff = time.time() - self.idle_evict_seconds
+        with self._lock:
+            for key, (_, last_used) in list(self._models.items()):
+                if last_used < cutoff:
+                    del self._models[key]
+                    print(f"System: Evicted idle Whisper model {key}.")
+
+    def stats(self):
+        """Returns hit/miss counts and how much load time the cache has saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_load = self.load_seconds / self.misses if self.misses else 0.0
+            return {
+                "loaded_models": [list(k) for k in self._models],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "total_load_seconds": round(self.load_seconds, 3),
+                "estimated_seconds_saved": round(self.hits * avg_load, 3)
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_model_cache():
+    """Returns the cache shared by every VideoEngine in this process."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = WhisperModelCache()
+        return _shared_cache
@@ -0,0 +1,242 @@
+import functools
+import queue
+import threading
+import time
+
+from metrics import get_metrics
+from queue_watcher import sleep_until_next_day
+
+# Stage name -> VideoEngine method. Order matters: each job flows through them in turn.
+DEFAULT_STAGES = [
+    ("script", "prepare_script"),
+    ("voiceover", "prepare_voiceover"),
+    ("visuals", "prepare_visuals"),
+    ("captions", "prepare_captions"),
+    ("render", "render_job")
+]
+
+_STOP = object()
+
+
+class Stage:
+    """One step of the pipeline: a pool of worker threads fed by a bounded queue."""
+
+    def __init__(self, name, func, workers=1, queue_size=2):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        # Bounded so a fast stage can't run far ahead of a slow one (backpressure)
+        self.inbox = queue.Queue(maxsize=max(1, queue_size))
+
+
+class PipelineScheduler:
+    """
+    Runs the VideoEngine stages for several jobs at once, e.g. fetching footage for
+    job N+1 while job N encodes. Jobs still go through TopicManager: they are
+    claimed with get_next_topic (counting in-flight jobs against the daily limit),
+    rolled back with rollback_topic on failure and marked done at the end.
+    """
+
+    def __init__(self, topic_manager, video_engine, settings, disk_check=None, gauges=None, watcher=None):
+        self.tm = topic_manager
+        self.ve = video_engine
+        self.disk_check = disk_check
+        self.gauges = gauges    # gauges(topic_manager), called on every poll
+        self.watcher = watcher  # QueueWatcher: wakes the feeder when new topics arrive
+        self.settings = settings
+        config = settings.get('pipeline_settings', {})
+
+        workers = dict(config.get('stage_workers', {}))
+        if video_engine.render_pool and 'render' not in workers:
+            # One render stage worker per pool process keeps every core busy
+            workers['render'] = video_engine.render_pool.max_workers
+        queue_size = config.get('queue_size', 1)
+        self.stages = [
+            Stage(name, functools.partial(video_engine.run_stage, method), workers.get(name, 1), queue_size)
+            for name, method in DEFAULT_STAGES
+        ]
+
+        self.in_flight = {}                 # topic id -> job context
+        self._tm_lock = threading.Lock()    # TopicManager is not thread-safe
+        self._state_lock = threading.Lock()
+        self._slot_freed = threading.Event()
+        self._backoff_until = 0
+        self._threads = []
+        self._running = False
+
+    # Read on every use, so edits to a hot-reloading Settings apply to a running pipeline
+    @property
+    def check_interval(self):
+        return self.settings.get('automation_settings', {}).get('check_interval_seconds', 30)
+
+    @property
+    def retry_delay(self):
+        return self.settings.get('automation_settings', {}).get('retry_delay_seconds', 60)
+
+    @property
+    def max_in_flight(self):
+        return self.settings.get('pipeline_settings', {}).get('max_jobs_in_flight', 3)
+
+    @property
+    def prefetch_count(self):
+        return self.settings.get('script_cache_settings', {}).get('prefetch_count', 0)
+
+    def start(self):
+        self._running = True
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        print("System: Pipeline started with stages: " +
+              ", ".join(f"{s.name} x{s.workers}" for s in self.stages))
+
+    def stop(self):
+        """Stops the workers and returns every unfinished job to the queue."""
+        self._running = False
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                try: stage.inbox.put_nowait(_STOP)
+                except queue.Full: pass
+        with self._state_lock:
+            unfinished = list(self.in_flight.values())
+            self.in_flight.clear()
+        for job in unfinished:
+            print(f"System: Returning unfinished Topic ID {job['topic_data']['id']} to the queue.")
+            with self._tm_lock:
+                self.tm.rollback_topic(job['topic_data']['id'])
+
+    def _release_claim(self, topic_id):
+        """Returns a topic the feeder claimed but couldn't hand to the stages."""
+        with self._state_lock:
+            self.in_flight.pop(topic_id, None)
+        try:
+            with self._tm_lock:
+                self.tm.rollback_topic(topic_id)
+        except Exception as e:
+            print(f"Warning: Could not roll back Topic ID {topic_id}: {e}")
+
+    def _finish(self, job, success):
+        topic_id = job['topic_data']['id']
+        with self._state_lock:
+            if self.in_flight.pop(topic_id, None) is None:
+                return  # already rolled back by stop()
+        rejected = job['topic_data'].get('rejected')
+        with self._tm_lock:
+            if success:
+                self.tm.mark_as_done(topic_id, job['video_path'])
+            elif rejected:
+                self.tm.reject_topic(topic_id, rejected)
+            else:
+                self.tm.rollback_topic(topic_id)
+        get_metrics().inc("jobs_total", result="done" if success else "rejected" if rejected else "failed")
+        if success:
+            print(f"MISSION COMPLETE: {job['video_path']}")
+        elif not rejected:
+            # A rejected script is not a transient failure, so it doesn't pause the pipeline
+            self._backoff_until = time.time() + self.retry_delay
+        self._slot_freed.set()
+        if self.watcher:
+            self.watcher.notify("slot_freed")
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        while self._running:
+            job = stage.inbox.get()
+            if job is _STOP or not self._running:
+                break
+
+            start = time.time()
+            try:
+                ok = stage.func(job)
+            except Exception as e:
+                print(f"Pipeline: Stage '{stage.name}' failed for Topic ID {job['topic_data']['id']}: {e}")
+                ok = False
+            job.setdefault('stage_seconds', {})[stage.name] = round(time.time() - start, 2)
+
+            if not ok:
+                print(f"Generation failed at '{stage.name}'. Rolling back topic status.")
+                self.ve.cleanup_job(job)
+                self._finish(job, False)
+            elif index + 1 < len(self.stages):
+                # Blocks while the next stage is saturated
+                self.stages[index + 1].inbox.put(job)
+            else:
+                print(f"Pipeline: Topic ID {job['topic_data']['id']} stage times: {job['stage_seconds']}")
+                self._finish(job, True)
+
+    def _claim_next(self):
+        with self._state_lock:
+            reserved = len(self.in_flight)
+        if reserved >= self.max_in_flight:
+            return None
+        with self._tm_lock:
+            return self.tm.get_next_topic(reserved=reserved)
+
+    def _update_gauges(self):
+        metrics = get_metrics()
+        if not metrics.enabled:
+            return
+        with self._state_lock:
+            metrics.set_gauge("jobs_in_flight", len(self.in_flight))
+        for stage in self.stages:
+            metrics.set_gauge("stage_queue_depth", stage.inbox.qsize(), stage=stage.name)
+        if self.gauges:
+            with self._tm_lock:
+                self.gauges(self.tm)
+
+    def run(self):
+        """
+        Feeds claimed topics into the first stage until interrupted. A failed feeder
+        iteration (locked database, checkpoint or prefetch error...) is logged, its
+        claimed topic rolled back, and retried after retry_delay_seconds.
+        """
+        self.start()
+        try:
+            while self._running:
+                claimed = None
+                try:
+                    if self.disk_check and not self.disk_check():
+                        if self.ve.library:
+                            self.ve.library.free_disk_space(min_free_bytes=2**30)
+                        if not self.disk_check():
+                            print(f"[{time.strftime('%H:%M:%S')}] CRITICAL: Low disk space! Waiting for cleanup...")
+                            time.sleep(300)
+                            continue
+
+                    if time.time() < self._backoff_until:
+                        time.sleep(max(0, self._backoff_until - time.time()))
+                        continue
+
+                    self._slot_freed.clear()
+                    self._update_gauges()
+                    claimed = self._claim_next()
+                    if claimed:
+                        print(f"Task Identified: {claimed['content']}")
+                        job = self.ve.new_job(claimed)
+                        if self.prefetch_count:
+                            with self._tm_lock:
+                                upcoming = self.tm.upcoming_topics(self.prefetch_count)
+                            self.ve.prefetch_scripts(upcoming)
+                        with self._state_lock:
+                            self.in_flight[claimed['id']] = job
+                        # Blocks while the script stage is saturated
+                        self.stages[0].inbox.put(job)
+                        continue
+
+                    # Nothing to claim right now: wait for a job to finish, new topics or the poll interval
+                    with self._tm_lock:
+                        limit_reached = self.tm.daily_limit_reached()
+                    if limit_reached:
+                        sleep_until_next_day(self.settings)
+                    elif self.watcher:
+                        self.watcher.wait(self.check_interval)
+                    else:
+                        self._slot_freed.wait(self.check_interval)
+                except Exception as e:
+                    print(f"Pipeline: Feeder error: {type(e).__name__}: {e}. Re-trying in {self.retry_delay} seconds...")
+                    if claimed:
+                        self._release_claim(claimed['id'])
+                    time.sleep(self.retry_delay)
+        finally:
+            self.stop()
@@ -0,0 +1,283 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS topics (
+    id INTEGER PRIMARY KEY,
+    content TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    video_path TEXT,
+    created_at REAL,
+    updated_at REAL,
+    worker_id TEXT,
+    lease_expires REAL,
+    source_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_topics_status_id ON topics (status, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class QueueStore:
+    """
+    SQLite-backed topic queue (WAL mode). Claiming the next job is a single
+    transaction, so concurrent claimers never get the same topic and a crash
+    mid-write can't leave a half-written queue behind.
+
+    Claims are leases: a claimed topic records the worker that holds it and
+    when the lease expires. Workers heartbeat to extend it; a topic whose lease
+    runs out (worker crashed or hung) becomes claimable again. Several bot
+    processes can share one queue file. Across hosts this relies on the shared
+    filesystem honouring SQLite's locks (local disks and SMB do; many NFS setups don't).
+    """
+
+    def __init__(self, db_path="Data/queue.db"):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_topics_status_lease ON topics (status, lease_expires)")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_topics_source_id ON topics (source_id)")
+
+    def _migrate(self):
+        """Adds the lease and source_id columns to queues created before they existed."""
+        columns = [r[1] for r in self.conn.execute("PRAGMA table_info(topics)")]
+        if columns:
+            for name, kind in (("worker_id", "TEXT"), ("lease_expires", "REAL"), ("source_id", "INTEGER")):
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE topics ADD COLUMN {name} {kind}")
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        topic = {"id": row['id'], "content": row['content'], "status": row['status']}
+        if row['video_path']:
+            topic['video_path'] = row['video_path']
+        return topic
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def import_json(self, json_path):
+        """
+        Imports topics from the legacy queue.json. The first run copies the whole
+        file (statuses included); afterwards only entries with unseen IDs are added,
+        so topics appended to queue.json by hand still reach the queue.
+        Skips all work when the file hasn't changed since the last import.
+
+        Each imported row remembers its queue.json ID in source_id. The store hands
+        out IDs of its own (permanent topics, /enqueue), so an entry keeps its ID
+        only while that ID is free; otherwise it is queued under a new one.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        mtime = str(os.path.getmtime(json_path))
+        if self.get_meta("json_import_mtime") == mtime:
+            return 0
+
+        with open(json_path, 'r') as f:
+            try:
+                topics = json.load(f)
+            except:
+                print(f"Error: Could not read {json_path}")
+                return 0
+
+        now = time.time()
+        first_import = self.get_meta("json_imported") is None
+        added = 0
+        with self._transaction() as cur:
+            for t in topics:
+                if 'id' not in t or 'content' not in t:
+                    continue
+                source_id = int(t['id'])
+                if cur.execute("SELECT 1 FROM topics WHERE source_id = ?", (source_id,)).fetchone():
+                    continue
+                row = cur.execute("SELECT content, source_id FROM topics WHERE id = ?", (source_id,)).fetchone()
+                if row is not None and row['source_id'] is None and row['content'] == t['content']:
+                    # Imported before source_id existed
+                    cur.execute("UPDATE topics SET source_id = ? WHERE id = ?", (source_id, source_id))
+                    continue
+                status = t.get('status', 'pending') if first_import else 'pending'
+                cur.execute(
+                    "INSERT INTO topics (id, content, status, video_path, created_at, updated_at, source_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (source_id if row is None else None, t['content'], status, t.get('video_path'), now, now,
+                     source_id)
+                )
+                if row is not None:
+                    print(f"Warning: {json_path} entry {source_id} ('{t['content']}') clashes with queued topic "
+                          f"{source_id} ('{row['content']}'); queued as ID {cur.lastrowid} instead.")
+                added += 1
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)", (str(now),))
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_import_mtime', ?)", (mtime,))
+        if added:
+            print(f"System: Imported {added} topic(s) from {json_path} into {self.db_path}")
+        return added
+
+    def claim_next(self, worker_id=None, lease_seconds=300, max_active=None):
+        """
+        Atomically leases the oldest pending topic (or one whose lease expired)
+        to worker_id and returns it. If max_active is given, nothing is claimed
+        while that many topics are already held under live leases (all workers).
+        """
+        now = time.time()
+        with self._transaction() as cur:
+            if max_active is not None and self._active(cur, now) >= max_active:
+                return None
+
+            row = cur.execute(
+                "SELECT * FROM topics WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                row = cur.execute(
+                    "SELECT * FROM topics WHERE status = 'processing' AND lease_expires < ? "
+                    "ORDER BY id LIMIT 1", (now,)
+                ).fetchone()
+                if row is not None:
+                    print(f"System: Reclaiming Topic ID {row['id']} from expired lease of {row['worker_id']}")
+            if row is None:
+                return None
+            cur.execute(
+                "UPDATE topics SET status = 'processing', worker_id = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?", (worker_id, now + lease_seconds if worker_id else None, now, row['id'])
+            )
+        topic = self._to_dict(row)
+        topic['status'] = 'processing'
+        return topic
+
+    def peek_pending(self, limit=3):
+        """The next pending topics in claim order, without claiming them."""
+        rows = self.conn.execute(
+            "SELECT * FROM topics WHERE status = 'pending' ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def pending_count(self):
+        """Topics waiting to be claimed."""
+        return self.conn.execute("SELECT COUNT(*) FROM topics WHERE status = 'pending'").fetchone()[0]
+
+    def active_count(self):
+        """Topics currently held under a live lease, across all workers."""
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM topics WHERE status = 'processing' "
+            "AND (lease_expires IS NULL OR lease_expires >= ?)", (time.time(),)
+        ).fetchone()[0]
+
+    def heartbeat(self, topic_ids, worker_id, lease_seconds=300):
+        """Extends the leases worker_id still holds; returns the IDs it no longer owns."""
+        lost = []
+        expires = time.time() + lease_seconds
+        with self._transaction() as cur:
+            for topic_id in topic_ids:
+                cur.execute(
+                    "UPDATE topics SET lease_expires = ? WHERE id = ? AND worker_id = ? AND status = 'processing'",
+                    (expires, topic_id, worker_id)
+                )
+                if cur.rowcount == 0:
+                    lost.append(topic_id)
+        return lost
+
+    def reclaim_expired(self):
+        """Returns topics with expired leases (and legacy lease-less claims) to 'pending'."""
+        with self._transaction() as cur:
+            cur.execute(
+                "UPDATE topics SET status = 'pending', worker_id = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = 'processing' AND (lease_expires IS NULL OR lease_expires < ?)",
+                (time.time(), time.time())
+            )
+            return cur.rowcount
+
+    @staticmethod
+    def _active(cur, now):
+        return cur.execute(
+            "SELECT COUNT(*) FROM topics WHERE status = 'processing' "
+            "AND (lease_expires IS NULL OR lease_expires >= ?)", (now,)
+        ).fetchone()[0]
+
+    def add_topic(self, content, status='pending', worker_id=None, lease_seconds=300, max_active=None):
+        """
+        Appends a topic with the next free ID (leased to worker_id if given). Like
+        claim_next, returns None without adding anything while max_active topics
+        are already held under live leases.
+        """
+        now = time.time()
+        lease_expires = now + lease_seconds if worker_id else None
+        with self._transaction() as cur:
+            if max_active is not None and self._active(cur, now) >= max_active:
+                return None
+            cur.execute("INSERT INTO topics (content, status, created_at, updated_at, worker_id, lease_expires) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", (content, status, now, now, worker_id, lease_expires))
+            topic_id = cur.lastrowid
+        return {"id": topic_id, "content": content, "status": status}
+
+    def set_status(self, topic_id, status, video_path=None, worker_id=None):
+        """
+        Sets a topic's status and releases any lease on it. With worker_id, only
+        while that worker still holds the topic: a worker whose lease ran out must
+        not reset or complete a topic another worker has claimed since.
+        Returns the number of rows changed (0 if the lease was lost).
+        """
+        query = ("UPDATE topics SET status = ?, video_path = COALESCE(?, video_path), updated_at = ?, "
+                 "worker_id = NULL, lease_expires = NULL WHERE id = ?")
+        params = [status, video_path, time.time(), topic_id]
+        if worker_id is not None:
+            query += " AND worker_id = ? AND status = 'processing'"
+            params.append(worker_id)
+        with self._transaction() as cur:
+            cur.execute(query, params)
+            return cur.rowcount
+
+    def delete_unfinished(self):
+        with self._transaction() as cur:
+            cur.execute("DELETE FROM topics WHERE status != 'completed'")
+            return cur.rowcount
+
+    def get_topic(self, topic_id):
+        return self._to_dict(self.conn.execute("SELECT * FROM topics WHERE id = ?", (topic_id,)).fetchone())
+
+    def all_topics(self):
+        return [self._to_dict(r) for r in self.conn.execute("SELECT * FROM topics ORDER BY id")]
+
+    def close(self):
+        self.conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error. Takes the write lock up front."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __enter__(self):
+        self.store._lock.acquire()
+        self.cur = self.store.conn.cursor()
+        self.cur.execute("BEGIN IMMEDIATE")
+        return self.cur
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.cur.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.store._lock.release()
+        return False
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def seconds_until_next_day(now=None):
+    """Seconds from now until the next local midnight (when the daily count resets)."""
+    now = now or datetime.now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+def sleep_until_next_day(settings=None, check_seconds=60):
+    """
+    Sleeps through to just after midnight instead of re-checking a daily limit
+    that can't change. With settings, wakes early if the settings file is edited
+    (e.g. daily_limit raised), checking its mtime every check_seconds.
+    """
+    seconds = seconds_until_next_day()
+    print(f"System: Daily limit reached. Sleeping {seconds / 3600:.1f}h until the next day starts...")
+    refresh = getattr(settings, 'refresh', None)
+    deadline = time.time() + seconds + 1
+    while time.time() < deadline:
+        time.sleep(min(check_seconds, max(0, deadline - time.time())))
+        if refresh and refresh():
+            return
+
+
+class _QueueFileHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', None), getattr(event, 'dest_path', None)]
+        if any(p and os.path.abspath(p) == self.watcher.queue_file for p in paths):
+            self.watcher.notify("queue_file")
+
+
+class QueueWatcher:
+    """
+    Wakes the bot loop as soon as there is new work instead of on a fixed poll:
+
+      - changes to queue.json, through watchdog (inotify / FSEvents / ReadDirectoryChangesW)
+        when it is installed, otherwise by stat()ing the file every file_poll_seconds
+        (the file is only read once it has actually changed)
+      - POST /enqueue on a local HTTP endpoint, with {"content": "..."} or
+        {"topics": ["...", ...]}; topics go straight into the queue through on_enqueue
+      - notify(), e.g. when a pipeline slot frees up
+    """
+
+    def __init__(self, queue_file, on_enqueue=None, file_poll_seconds=1.0,
+                 host="127.0.0.1", port=0, token=None):
+        self.queue_file = os.path.abspath(queue_file)
+        self.on_enqueue = on_enqueue
+        self.file_poll_seconds = file_poll_seconds
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reason = None
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        self._observer = None
+        self._server = None
+
+    @classmethod
+    def from_settings(cls, config, queue_file, on_enqueue=None):
+        config = config or {}
+        if not config.get('event_driven', True):
+            return None
+        return cls(
+            queue_file, on_enqueue,
+            file_poll_seconds=config.get('file_poll_seconds', 1.0),
+            host=config.get('enqueue_host', "127.0.0.1"),
+            port=config.get('enqueue_port', 0),
+            token=config.get('enqueue_token') or None
+        )
+
+    def start(self):
+        if Observer is not None:
+            # Watch the directory: editors often replace the file rather than write into it
+            directory = os.path.dirname(self.queue_file)
+            os.makedirs(directory, exist_ok=True)
+            self._observer = Observer()
+            self._observer.schedule(_QueueFileHandler(self), directory, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            mode = "file events"
+        else:
+            threading.Thread(target=self._poll_file, name="queue-file-poll", daemon=True).start()
+            mode = f"stat every {self.file_poll_seconds}s"
+        if self.port and self.on_enqueue:
+            try:
+                self._start_server()
+                mode += f", enqueue at http://{self.host}:{self.port}/enqueue"
+            except OSError as e:
+                print(f"Warning: Could not start the enqueue endpoint on port {self.port}: {e}")
+        print(f"System: Watching {self.queue_file} for new topics ({mode})")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def notify(self, reason="notify"):
+        self.reason = reason
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """Blocks until something wakes the watcher or timeout passes; returns the reason or None."""
+        woke = self._event.wait(timeout)
+        self._event.clear()
+        reason, self.reason = self.reason, None
+        return reason if woke else None
+
+    def _poll_file(self):
+        last = self._mtime()
+        while not self._stop.wait(self.file_poll_seconds):
+            current = self._mtime()
+            if current != last:
+                last = current
+                self.notify("queue_file")
+
+    def _mtime(self):
+        try:
+            st = os.stat(self.queue_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _start_server(self):
+        watcher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/enqueue":
+                    self.send_error(404)
+                    return
+                if watcher.token and self.headers.get("Authorization") != f"Bearer {watcher.token}":
+                    self._reply(401, {"error": "unauthorized"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    topics = payload.get('topics') or [payload.get('content')]
+                    topics = [str(t).strip() for t in topics if t and str(t).strip()]
+                except (ValueError, AttributeError):
+                    self._reply(400, {"error": "expected JSON with 'content' or 'topics'"})
+                    return
+                if not topics:
+                    self._reply(400, {"error": "no topics given"})
+                    return
+                try:
+                    added = [watcher.on_enqueue(t) for t in topics]
+                except Exception as e:
+                    self._reply(500, {"error": str(e)})
+                    return
+                watcher.notify("enqueue")
+                self._reply(200, {"queued": added})
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="enqueue-http", daemon=True).start()
@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+class RenderError(Exception):
+    """Raised when a render worker crashes, times out or reports a failure."""
+
+
+def build_render_spec(job, output_path):
+    """Serializes everything render_video needs into a plain, picklable dict."""
+    return {
+        "topic": job['topic'],
+        "script": job['full_text'],
+        "audio_path": job['audio_path'],
+        "scene_clips": [[path, duration] for path, duration in job['scene_clips']],
+        "subtitle_segments": [
+            {"text": s['text'], "start": s['start'], "end": s['end']}
+            for s in job['subtitle_segments']
+        ],
+        "output_path": output_path,
+        "profile": job.get('profile')
+    }
+
+
+def _render_worker(spec, conn):
+    """Runs inside the child process: renders one spec and reports back over the pipe."""
+    try:
+        from video_engine import VideoEngine
+        ve = VideoEngine(render_only=True)
+        spec = dict(spec)
+        spec['scene_clips'] = [tuple(c) for c in spec['scene_clips']]
+        conn.send(("ok", ve.render_video(**spec)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class RenderPool:
+    """
+    Renders videos in separate processes so a slow or crashing MoviePy encode
+    never blocks (or takes down) the bot's main loop. Each job gets a fresh
+    process, which is killed if it runs past the timeout.
+    """
+
+    def __init__(self, max_workers=0, timeout=1800):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        # spawn, not fork: the bot process has threads (fetchers, pipeline workers)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = threading.Semaphore(self.max_workers)
+        self._active = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        if not config.get('use_process_pool', False):
+            return None
+        return cls(config.get('workers', 0), config.get('timeout_seconds', 1800))
+
+    def submit(self, spec):
+        """Queues a render spec; returns a Future resolving to the output path."""
+        future = Future()
+        threading.Thread(target=self._run, args=(spec, future), daemon=True).start()
+        return future
+
+    def render(self, spec):
+        """Renders a spec and waits for the result."""
+        return self.submit(spec).result()
+
+    def _run(self, spec, future):
+        with self._slots:
+            if not future.set_running_or_notify_cancel():
+                return
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            process = self._ctx.Process(target=_render_worker, args=(spec, child_conn), daemon=True)
+            start = time.time()
+            process.start()
+            child_conn.close()
+            with self._lock:
+                self._active[process.pid] = process
+
+            try:
+                if parent_conn.poll(self.timeout):
+                    status, payload = parent_conn.recv()
+                    process.join(30)
+                    if status == "ok" and payload:
+                        print(f"System: Render worker {process.pid} finished in {time.time() - start:.1f}s")
+                        future.set_result(payload)
+                    else:
+                        future.set_exception(RenderError(f"Render failed: {payload or 'no output produced'}"))
+                else:
+                    # Either the timeout passed, or the worker died without reporting
+                    if process.is_alive():
+                        process.terminate()
+                        process.join(10)
+                        if process.is_alive():
+                            process.kill()
+                        future.set_exception(RenderError(f"Render timed out after {self.timeout}s"))
+                    else:
+                        future.set_exception(RenderError(f"Render worker crashed (exit code {process.exitcode})"))
+            except EOFError:
+                process.join(10)
+                future.set_exception(RenderError(f"Render worker crashed (exit code {process.exitcode})"))
+            finally:
+                parent_conn.close()
+                with self._lock:
+                    self._active.pop(process.pid, None)
+
+    def shutdown(self):
+        """Kills any renders still running."""
+        with self._lock:
+            processes = list(self._active.values())
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
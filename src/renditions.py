@@ -0,0 +1,48 @@
+def _short_side(f):
+    return min(f.get('width') or 0, f.get('height') or 0)
+
+
+def _is_mp4(f):
+    file_type = f.get('file_type')
+    return bool(f.get('link')) and (file_type is None or file_type == "video/mp4")
+
+
+def select_rendition(video_files, target_height=720, target_fps=30):
+    """
+    Picks the cheapest Pexels rendition that still covers the target resolution:
+    the smallest file whose short side is >= target_height, preferring ones whose
+    frame rate is close to target_fps (no point decoding 60fps for a 30fps render).
+    Falls back to the largest rendition available when none is big enough.
+    """
+    files = [f for f in video_files if _is_mp4(f) and _short_side(f)]
+    if not files:
+        # No size metadata at all; keep the old behaviour
+        return video_files[0] if video_files else None
+
+    def fps_ok(f):
+        fps = f.get('fps')
+        return fps is None or (target_fps - 1 <= fps <= target_fps * 1.5)
+
+    big_enough = [f for f in files if _short_side(f) >= target_height]
+    if big_enough:
+        return min(big_enough, key=lambda f: (not fps_ok(f), _short_side(f), f.get('fps') or 0))
+    return max(files, key=lambda f: (_short_side(f), fps_ok(f)))
+
+
+def decode_cost(f):
+    """Relative decode cost of a rendition (pixels per second of video)."""
+    return (f.get('width') or 0) * (f.get('height') or 0) * (f.get('fps') or 30)
+
+
+def filter_by_duration(videos, scene_duration, max_ratio=4.0):
+    """
+    Drops search results that are far longer than the scene needs (we only ever
+    use a few seconds of each). If everything is too long, keeps the shortest one.
+    """
+    if not scene_duration or not max_ratio:
+        return videos
+    limit = max(scene_duration * max_ratio, 10)
+    kept = [v for v in videos if not v.get('duration') or v['duration'] <= limit]
+    if kept or not videos:
+        return kept
+    return [min(videos, key=lambda v: v.get('duration') or 0)]
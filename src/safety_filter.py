@@ -0,0 +1,127 @@
+import re
+import threading
+import unicodedata
+
+# Writing system each allowed language is expected in (the language check is script-based)
+LANGUAGE_SCRIPTS = {
+    "en": "LATIN", "es": "LATIN", "fr": "LATIN", "de": "LATIN", "it": "LATIN", "pt": "LATIN",
+    "tr": "LATIN", "id": "LATIN", "ur": "ARABIC", "ar": "ARABIC", "fa": "ARABIC",
+    "hi": "DEVANAGARI", "bn": "BENGALI", "ru": "CYRILLIC", "uk": "CYRILLIC", "el": "GREEK",
+    "he": "HEBREW", "zh": "CJK", "ja": "CJK", "ko": "HANGUL", "th": "THAI"
+}
+
+
+def _char_script(ch):
+    name = unicodedata.name(ch, "")
+    if name.startswith(("CJK", "HIRAGANA", "KATAKANA")):
+        return "CJK"
+    return name.split(" ", 1)[0]
+
+
+def _trie_regex(words):
+    """
+    One regex for a whole keyword list, shaped like a trie ('war', 'warfare' ->
+    'war(?:fare)?'), so matching costs about one pass over the text no matter how
+    many keywords there are, instead of trying every alternative at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                    for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    return build(trie)
+
+
+class SafetyFilter:
+    """
+    The safety_filter rules of config/filter_rules.json, compiled once:
+
+      - blocked_keywords become a single trie-shaped, case-insensitive regex
+        matching whole words/phrases ('war' blocks "war" but not "software")
+      - allowed_languages is checked by writing system: most letters of the
+        text must be in a script one of the allowed languages uses
+
+    check() returns None when the text passes, or the reason it was blocked.
+    """
+
+    def __init__(self, blocked_keywords=None, allowed_languages=None, min_script_ratio=0.8):
+        keywords = sorted({" ".join(k.lower().split()) for k in (blocked_keywords or []) if k and k.strip()})
+        self.keyword_count = len(keywords)
+        self.pattern = None
+        if keywords:
+            self.pattern = re.compile(r"(?<!\w)" + _trie_regex(keywords) + r"(?!\w)", re.IGNORECASE)
+        self.allowed_scripts = {LANGUAGE_SCRIPTS[l] for l in (allowed_languages or []) if l in LANGUAGE_SCRIPTS}
+        self.min_script_ratio = min_script_ratio
+
+    @classmethod
+    def from_rules(cls, rules):
+        """Builds the filter from filter_rules.json; None when auto_moderate is off."""
+        config = (rules or {}).get('safety_filter', {})
+        if not config.get('auto_moderate', False):
+            return None
+        return cls(config.get('blocked_keywords', []), config.get('allowed_languages', []),
+                   config.get('min_script_ratio', 0.8))
+
+    def language_ok(self, text):
+        if not self.allowed_scripts or (text.isascii() and "LATIN" in self.allowed_scripts):
+            return True
+        letters = 0
+        allowed = 0
+        for ch in text:
+            if ch.isalpha():
+                letters += 1
+                if (ch.isascii() and "LATIN" in self.allowed_scripts) or _char_script(ch) in self.allowed_scripts:
+                    allowed += 1
+        return letters == 0 or allowed / letters >= self.min_script_ratio
+
+    def check(self, text):
+        """None if text passes, otherwise why it was blocked."""
+        if not text:
+            return None
+        if self.pattern:
+            match = self.pattern.search(text)
+            if match:
+                return f"blocked keyword '{match.group(0)}'"
+        if not self.language_ok(text):
+            return "language not allowed"
+        return None
+
+    def check_script(self, scenes):
+        """Checks every scene's narration and footage keywords; None if the script passes."""
+        for i, scene in enumerate(scenes):
+            keywords = scene.get('keywords', [scene.get('keyword', "")])
+            if isinstance(keywords, str):
+                keywords = [keywords]
+            reason = self.check(" \n ".join([scene.get('text', "")] + [str(k) for k in keywords if k]))
+            if reason:
+                return f"scene {i + 1}: {reason}"
+        return None
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_safety_filter(settings):
+    """The filter for the current filter rules of a Settings object, rebuilt only after they change."""
+    rules = getattr(settings, 'filter_rules', None)
+    if rules is None:
+        return None
+    key = (id(settings), getattr(settings, 'version', 0))
+    with _cache_lock:
+        if key not in _cache:
+            _cache.clear()
+            _cache[key] = SafetyFilter.from_rules(rules)
+        return _cache[key]
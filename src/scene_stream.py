@@ -0,0 +1,172 @@
+import json
+import time
+
+
+class StreamError(Exception):
+    """Raised when the API reports an error in the middle of a streamed response."""
+
+
+def scene_is_valid(scene):
+    return isinstance(scene, dict) and isinstance(scene.get('text'), str) and scene['text'].strip() != ""
+
+
+class SceneStreamParser:
+    """
+    Incremental parser for the scene array the model returns. Text can be fed
+    in arbitrary chunks; every scene object is returned as soon as its closing
+    brace arrives. Prose or ```json fences before the array are skipped, and a
+    {"scenes": [...]} wrapper works too (the first '[' starts the scene list).
+
+    A scene that isn't valid JSON (or has no text) is counted as malformed and
+    skipped, so one bad object doesn't cost the scenes around it.
+    """
+
+    def __init__(self, max_object_chars=8000):
+        self.max_object_chars = max_object_chars
+        self.started = False     # seen the '[' that opens the scene list
+        self.done = False        # seen the matching ']'
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.resync = False
+        self.current = []        # characters of the scene object being read
+        self.scenes = []
+        self.malformed = 0
+
+    def feed(self, text):
+        """Consumes a chunk of model output; returns the scenes it completed."""
+        completed = []
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                if ch == '[':
+                    self.started = True
+                    self.depth = 1
+                continue
+            if self.resync:
+                # Skip to the next object after one that ran away (e.g. an unclosed string)
+                if ch != '{':
+                    continue
+                self.resync = False
+
+            if self.depth >= 2:
+                self.current.append(ch)
+                if len(self.current) > self.max_object_chars:
+                    self.malformed += 1
+                    self._reset_object()
+                    self.resync = True
+                    continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+
+            if ch == '"':
+                self.in_string = True
+            elif ch in '{[':
+                if self.depth == 1:
+                    if ch == '[':
+                        continue  # stray bracket between scenes
+                    self.current = [ch]
+                self.depth += 1
+            elif ch in '}]':
+                if self.depth == 1:
+                    if ch == ']':
+                        self.done = True
+                    continue
+                self.depth -= 1
+                if self.depth == 1:
+                    scene = self._finish_object()
+                    if scene is not None:
+                        completed.append(scene)
+        return completed
+
+    def _reset_object(self):
+        self.current = []
+        self.depth = 1
+        self.in_string = False
+        self.escape = False
+
+    def _finish_object(self):
+        raw = "".join(self.current)
+        self.current = []
+        try:
+            scene = json.loads(raw)
+        except ValueError:
+            scene = None
+        if not scene_is_valid(scene):
+            self.malformed += 1
+            return None
+        self.scenes.append(scene)
+        return scene
+
+    @property
+    def complete(self):
+        """True once the whole scene list has arrived."""
+        return self.done
+
+
+def iter_sse_content(lines):
+    """
+    Yields the text deltas of an OpenAI/OpenRouter style server-sent event
+    stream. lines can be str or bytes; comment lines (": OPENROUTER PROCESSING")
+    and unparseable events are skipped. Stops at "data: [DONE]".
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if event.get('error'):
+            error = event['error']
+            raise StreamError(error.get('message', str(error)) if isinstance(error, dict) else str(error))
+        for choice in event.get('choices', []):
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                yield content
+
+
+def read_scene_stream(lines, on_scene=None):
+    """
+    Parses scenes out of an SSE stream as they complete, calling on_scene(index, scene)
+    for each. A stream that breaks off (dropped connection, API error, truncated
+    output) still returns the scenes that were complete.
+
+    Returns (scenes, stats); stats has complete, malformed, first_scene_seconds,
+    seconds and error.
+    """
+    parser = SceneStreamParser()
+    start = time.time()
+    stats = {"complete": False, "malformed": 0, "first_scene_seconds": None, "seconds": 0.0, "error": None}
+    try:
+        for content in iter_sse_content(lines):
+            # One event can complete several scenes; number them from where this chunk started
+            first_index = len(parser.scenes)
+            for offset, scene in enumerate(parser.feed(content)):
+                index = first_index + offset
+                if stats['first_scene_seconds'] is None:
+                    stats['first_scene_seconds'] = round(time.time() - start, 3)
+                if on_scene:
+                    on_scene(index, scene)
+            if parser.done:
+                break
+    except Exception as e:
+        stats['error'] = f"{type(e).__name__}: {e}"
+    stats['complete'] = parser.complete
+    stats['malformed'] = parser.malformed
+    stats['seconds'] = round(time.time() - start, 3)
+    return parser.scenes, stats
@@ -0,0 +1,163 @@
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def normalize_topic(topic):
+    return " ".join(str(topic).lower().split())
+
+
+def script_key(topic, model, prompt_template):
+    """Cache key: hash of the normalized topic, the model and the prompt template."""
+    raw = "\n".join([normalize_topic(topic), model or "", prompt_template or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ScriptCache:
+    """
+    Persistent cache of generated scene scripts (one JSON file per key).
+    Entries expire after ttl_hours and are served at most max_uses times, after
+    which a fresh script is generated. variation controls how a reused script is
+    changed so repeated topics don't look identical:
+      - "reuse":            served as-is
+      - "shuffle_keywords": each scene's stock footage keywords are reordered
+    """
+
+    def __init__(self, root="Data/cache/scripts", ttl_hours=72, max_uses=3, variation="shuffle_keywords"):
+        self.root = root
+        self.ttl_seconds = ttl_hours * 3600 if ttl_hours else 0
+        self.max_uses = max_uses
+        self.variation = variation
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls, config):
+        config = config or {}
+        if not config.get('enabled', True):
+            return None
+        return cls(
+            root=config.get('path', "Data/cache/scripts"),
+            ttl_hours=config.get('ttl_hours', 72),
+            max_uses=config.get('max_uses', 3),
+            variation=config.get('variation', "shuffle_keywords")
+        )
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".json")
+
+    def _read(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            try:
+                return json.load(f)
+            except:
+                return None
+
+    def _write(self, key, entry):
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key))
+
+    def contains(self, key):
+        """True if a usable (unexpired, not used up) entry exists. Does not count as a use."""
+        entry = self._read(key)
+        return entry is not None and self._usable(entry)
+
+    def _usable(self, entry):
+        if self.ttl_seconds and time.time() - entry.get('created', 0) > self.ttl_seconds:
+            return False
+        if self.max_uses and entry.get('uses', 0) >= self.max_uses:
+            return False
+        return True
+
+    def get(self, key):
+        """Returns a (varied) copy of the cached scenes, or None on a miss."""
+        with self._lock:
+            entry = self._read(key)
+            if entry is None or not self._usable(entry):
+                if entry is not None:
+                    try: os.remove(self._path(key))
+                    except: pass
+                self.misses += 1
+                return None
+            entry['uses'] = entry.get('uses', 0) + 1
+            self._write(key, entry)
+            self.hits += 1
+
+        scenes = copy.deepcopy(entry['scenes'])
+        if self.variation == "shuffle_keywords":
+            for scene in scenes:
+                if isinstance(scene.get('keywords'), list):
+                    random.shuffle(scene['keywords'])
+        return scenes
+
+    def put(self, key, scenes, topic=None, uses=0):
+        """Stores a fresh script; uses=1 when the caller is already using it for a job."""
+        with self._lock:
+            self._write(key, {"created": time.time(), "uses": uses, "topic": topic, "scenes": scenes})
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class ScriptPrefetcher:
+    """
+    Generates scripts for upcoming topics in the background so the script stage
+    of a job usually finds its script already cached.
+    """
+
+    def __init__(self, video_engine, cache, max_workers=2):
+        self.ve = video_engine
+        self.cache = cache
+        self.pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prefetch")
+        self.in_flight = {}    # key -> Future
+        self._lock = threading.Lock()
+
+    def prefetch(self, topics):
+        """Queues script generation for every topic not already cached or in flight."""
+        queued = 0
+        for topic in topics:
+            key = self.ve.script_cache_key(topic)
+            with self._lock:
+                if key in self.in_flight or self.cache.contains(key):
+                    continue
+                future = self.pool.submit(self._fetch, topic, key)
+                self.in_flight[key] = future
+                queued += 1
+        if queued:
+            print(f"System: Prefetching scripts for {queued} upcoming topic(s)...")
+        return queued
+
+    def _fetch(self, topic, key):
+        try:
+            stats = {}
+            scenes = self.ve.request_script(topic, stats=stats)
+            if scenes and stats.get('complete', True):
+                self.cache.put(key, scenes, topic)
+        except Exception as e:
+            print(f"Warning: Script prefetch failed for '{topic}': {e}")
+        finally:
+            with self._lock:
+                self.in_flight.pop(key, None)
+
+    def wait_for(self, key, timeout=None):
+        """Blocks until an in-flight prefetch for key (if any) has finished."""
+        with self._lock:
+            future = self.in_flight.get(key)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
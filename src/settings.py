@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+import yaml
+
+SETTINGS_PATH = os.path.join("config", "settings.yaml")
+FILTER_RULES_PATH = os.path.join("config", "filter_rules.json")
+
+# (section, key) -> (type, default, minimum). Values are coerced to the type on load;
+# anything missing, of the wrong type or below the minimum falls back to the default.
+SCHEMA = {
+    ("automation_settings", "daily_limit"): (int, 5, 0),
+    ("automation_settings", "check_interval_seconds"): (float, 30, 0.1),
+    ("automation_settings", "retry_delay_seconds"): (float, 60, 0),
+    ("automation_settings", "permanent_topic"): (str, "", None),
+    ("automation_settings", "file_poll_seconds"): (float, 1.0, 0.05),
+    ("automation_settings", "enqueue_port"): (int, 0, 0),
+    ("ai_config", "model_name"): (str, "openrouter/auto", None),
+    ("ai_config", "max_tokens"): (int, 1500, 1),
+    ("video_settings", "frame_rate"): (int, 30, 1),
+    ("render_settings", "timeout_seconds"): (float, 1800, 1),
+    ("queue_settings", "lease_seconds"): (float, 300, 1),
+    ("queue_settings", "heartbeat_seconds"): (float, 60, 1),
+}
+
+
+def _coerce(value, kind, default, minimum):
+    if value is None:
+        return default, False
+    try:
+        if kind is bool:
+            coerced = value if isinstance(value, bool) else str(value).lower() in ("1", "true", "yes", "on")
+        elif kind in (int, float) and isinstance(value, bool):
+            raise ValueError("boolean given for a number")
+        else:
+            coerced = kind(value)
+    except (TypeError, ValueError):
+        return default, True
+    if minimum is not None and coerced < minimum:
+        return default, True
+    return coerced, False
+
+
+def validate(data):
+    """Coerces the SCHEMA keys in place; returns the list of problems found (each fell back to its default)."""
+    problems = []
+    for (section, key), (kind, default, minimum) in SCHEMA.items():
+        block = data.setdefault(section, {})
+        if not isinstance(block, dict):
+            problems.append(f"{section} is not a mapping")
+            block = data[section] = {}
+        if key not in block:
+            continue
+        value, invalid = _coerce(block[key], kind, default, minimum)
+        if invalid:
+            problems.append(f"{section}.{key}={block[key]!r} is invalid, using {default!r}")
+        block[key] = value
+    return problems
+
+
+class _WatchedFile:
+    """A file parsed on first use and re-parsed only when its mtime or size changes."""
+
+    def __init__(self, path, parse, default):
+        self.path = path
+        self.parse = parse
+        self.default = default
+        self.signature = None
+        self.data = None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def load(self, force=False):
+        """Returns True if the content was (re)loaded."""
+        signature = self._signature()
+        if not force and self.data is not None and signature == self.signature:
+            return False
+        if signature is None:
+            data = self.default()
+        else:
+            try:
+                with open(self.path, 'r', encoding="utf-8") as f:
+                    data = self.parse(f)
+            except Exception:
+                # Don't retry a broken file on every check; wait for the next edit
+                self.signature = signature
+                raise
+        self.data = data if data is not None else self.default()
+        self.signature = signature
+        return True
+
+
+class Settings(Mapping):
+    """
+    config/settings.yaml (plus config/filter_rules.json) loaded once and shared
+    by every component. Reads work like the plain dict it replaces
+    (settings['ai_config'], settings.get('video_settings', {})).
+
+    refresh() hot-reloads: it stat()s the files at most every check_seconds and
+    only re-parses when one actually changed, so it is cheap to call on every
+    poll. A file that fails to parse keeps the last good configuration. Values
+    read per job or per poll (daily_limit, permanent_topic, check intervals...)
+    take effect right away; clients built at startup keep their settings until
+    the bot restarts.
+    """
+
+    def __init__(self, path=SETTINGS_PATH, filter_rules_path=FILTER_RULES_PATH, check_seconds=2.0):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.version = 0
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._file = _WatchedFile(path, yaml.safe_load, dict)
+        self._rules = _WatchedFile(filter_rules_path, json.load, dict)
+        self._data = {}
+        self.refresh(force=True)
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def as_dict(self):
+        return self._data
+
+    @property
+    def filter_rules(self):
+        """Parsed config/filter_rules.json ({} if missing)."""
+        return self._rules.data or {}
+
+    def refresh(self, force=False):
+        """Re-reads whichever file changed since the last check; returns True if anything was reloaded."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_check < self.check_seconds:
+                return False
+            self._last_check = now
+            changed = False
+            try:
+                if self._file.load(force):
+                    data = self._file.data if isinstance(self._file.data, dict) else {}
+                    for problem in validate(data):
+                        print(f"Warning: {self.path}: {problem}")
+                    changed_sections = sorted(k for k in set(data) | set(self._data)
+                                              if data.get(k) != self._data.get(k))
+                    self._data = data
+                    changed = True
+                    if self.version:
+                        print(f"System: Reloaded {self.path} (changed: {', '.join(changed_sections) or 'nothing'})")
+            except Exception as e:
+                print(f"Warning: Could not reload {self.path}, keeping the previous settings: {e}")
+            try:
+                if self._rules.load(force):
+                    changed = True
+                    if self.version:
+                        print(f"System: Reloaded {self._rules.path}")
+            except Exception as e:
+                print(f"Warning: Could not reload {self._rules.path}, keeping the previous rules: {e}")
+            if changed:
+                self.version += 1
+            return changed
+
+
+_shared_settings = None
+_shared_lock = threading.Lock()
+
+
+def get_settings(path=SETTINGS_PATH):
+    """Returns the Settings shared by every component in this process (loaded on first use)."""
+    global _shared_settings
+    with _shared_lock:
+        if _shared_settings is None or _shared_settings.path != path:
+            _shared_settings = Settings(path)
+        return _shared_settings
@@ -1,90 +1,127 @@
-import json
 import os
+import socket
+import threading
+import time
+import uuid
 from datetime import datetime
-import yaml
+from queue_store import QueueStore
+from settings import get_settings
+from safety_filter import get_safety_filter
+from history_log import HistoryLog
 
 class TopicManager:
-    """Handles reading from queue.json, daily limits, and history logging."""
+    """Handles the topic queue (SQLite, fed from queue.json), daily limits, and history logging."""
     
     def __init__(self):
         self.queue_file = os.path.join("Data", "queue.json")
-        self.completed_file = os.path.join("Data", "completed.json")
-        self.state_file = os.path.join("Data", "bot_state.json")
-        self.settings_file = os.path.join("config", "settings.yaml")
-        self.load_settings()
+        # Shared with VideoEngine and main; daily_limit and permanent_topic follow edits without a restart
+        self.settings = get_settings()
+        
+        queue_settings = self.settings.get('queue_settings', {})
+        self.store = QueueStore(queue_settings.get('db_path', os.path.join("Data", "queue.db")))
+        
+        # Every claim is a lease held by this worker and kept alive by a heartbeat thread
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = queue_settings.get('lease_seconds', 300)
+        self.heartbeat_interval = queue_settings.get('heartbeat_seconds', 60)
+        self.held = set()
+        self._held_lock = threading.Lock()
+        self._heartbeat_thread = None
+        # (day, limit) when the daily limit was hit; completed counts only grow, so it holds until midnight
+        self.limit_reached_day = None
+        # queue.json still works as an inbox: new entries are picked up when it changes
+        self.store.import_json(self.queue_file)
+        
+        # Append-only completion log; daily/total counts are maintained as records are added
+        self.history = HistoryLog.from_settings(self.settings.get('history_settings', {}))
 
     def load_settings(self):
-        with open(self.settings_file, 'r') as f:
-            self.settings = yaml.safe_load(f)
-        self.daily_limit = self.settings.get('automation_settings', {}).get('daily_limit', 3)
+        """Picks up edits to settings.yaml (a stat() unless the file changed)."""
+        self.settings.refresh()
+
+    @property
+    def daily_limit(self):
+        return self.settings.get('automation_settings', {}).get('daily_limit', 3)
 
     def get_daily_count(self):
         """Returns the number of videos created today."""
-        if not os.path.exists(self.state_file):
-            return 0
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        with open(self.state_file, 'r') as f:
-            try:
-                state = json.load(f)
-            except:
-                return 0
-            
-        if state.get("date") == today:
-            return state.get("count", 0)
-        return 0
-
-    def increment_daily_count(self):
-        """Increments the count of videos created today."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        count = self.get_daily_count() + 1
-        
-        with open(self.state_file, 'w') as f:
-            json.dump({"date": today, "count": count}, f)
+        return self.history.daily_count()
 
     def reset_stuck_topics(self):
-        """Resets any topics with 'processing' status back to 'pending'."""
-        if not os.path.exists(self.queue_file):
-            return
-            
-        with open(self.queue_file, 'r') as f:
-            try:
-                topics = json.load(f)
-            except:
-                return
-
-        changed = False
-        for t in topics:
-            if t.get('status') == 'processing':
-                t['status'] = 'pending'
-                changed = True
-        
-        if changed:
+        """
+        Returns topics whose lease has expired to 'pending'. Topics other live
+        workers are still processing keep their lease, so this is safe to call
+        from any number of bot processes.
+        """
+        if self.store.reclaim_expired():
             print("🔄 System: Resetting stuck 'processing' topics to 'pending'...")
-            self.save_topics(topics)
 
-    def get_next_topic(self):
-        """Fetches the first pending topic, respecting daily limits."""
-        if self.get_daily_count() >= self.daily_limit:
+    def _hold(self, topic_id):
+        with self._held_lock:
+            self.held.add(topic_id)
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+
+    def _release(self, topic_id):
+        with self._held_lock:
+            self.held.discard(topic_id)
+
+    def _set_status(self, topic_id, status, video_path=None):
+        """Releases a topic this worker holds; False if its lease was lost to another worker meanwhile."""
+        self._release(topic_id)
+        if self.store.set_status(topic_id, status, video_path, worker_id=self.worker_id):
+            return True
+        print(f"Warning: Topic ID {topic_id} is no longer leased to this worker; leaving it as it is.")
+        return False
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._held_lock:
+                held = list(self.held)
+            if not held:
+                continue
+            try:
+                lost = self.store.heartbeat(held, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Warning: Lease heartbeat failed: {e}")
+                continue
+            for topic_id in lost:
+                print(f"Warning: Lost the lease on Topic ID {topic_id}; another worker may pick it up.")
+                self._release(topic_id)
+
+    def get_next_topic(self, reserved=0):
+        """
+        Claims (leases) the first pending topic, respecting daily limits.
+        Jobs in progress on any worker count towards the limit; reserved is the
+        caller's own count of unfinished jobs, used as a fast pre-check.
+        """
+        self.load_settings()
+        if self.daily_limit_reached():
+            return None
+        remaining = self.daily_limit - self.get_daily_count()
+        if remaining <= 0:
+            self.limit_reached_day = (time.strftime("%Y-%m-%d"), self.daily_limit)
+        if reserved >= remaining:
             print(f"Daily limit of {self.daily_limit} reached. Waiting for tomorrow...")
             return None
 
-        if not os.path.exists(self.queue_file):
-            print("Error: Data/queue.json not found!")
+        self.store.import_json(self.queue_file)
+        while True:
+            topic = self.store.claim_next(self.worker_id, self.lease_seconds, max_active=remaining)
+            if not topic:
+                break
+            self._hold(topic['id'])
+            # Topics from queue.json skip enqueue-time moderation; reject them before any work starts
+            reason = self.check_topic(topic['content'])
+            if reason:
+                self.reject_topic(topic['id'], reason)
+                continue
+            return topic
+        if self.store.active_count() >= remaining:
+            print(f"Daily limit of {self.daily_limit} reached. Waiting for tomorrow...")
             return None
-            
-        with open(self.queue_file, 'r') as f:
-            try:
-                topics = json.load(f)
-            except:
-                print("Error: Could not read queue.json")
-                return None
-        
-        for t in topics:
-            if t['status'] == 'pending':
-                t['status'] = 'processing'
-                self.save_topics(topics)
-                return t
         
         # If no pending, auto-generate from permanent_topic if enabled
         perm_topic = self.settings.get('automation_settings', {}).get('permanent_topic')
@@ -92,90 +129,77 @@ class TopicManager:
             import random
             variations = ["latest news on", "mystery of", "future secrets of", "shocking facts about", "the history of"]
             prefix = random.choice(variations)
+            reason = self.check_topic(f"{prefix} {perm_topic}")
+            if reason:
+                print(f"Warning: Permanent topic '{perm_topic}' is blocked by the safety filter ({reason}).")
+                return None
             
-            new_id = max([t['id'] for t in topics], default=0) + 1
-            new_content = f"{prefix} {perm_topic}"
-            
-            # Check if we should clear old pending topics that don't match the new perm_topic
-            # This is a bit aggressive, but solves the user's "stuck on old topic" issue.
-            new_job = {
-                "id": new_id,
-                "content": new_content,
-                "status": "processing"
-            }
-            topics.append(new_job)
-            self.save_topics(topics)
+            # Counted and inserted in one transaction, so racing workers can't overshoot the limit
+            new_job = self.store.add_topic(f"{prefix} {perm_topic}", status='processing',
+                                           worker_id=self.worker_id, lease_seconds=self.lease_seconds,
+                                           max_active=remaining)
+            if not new_job:
+                print(f"Daily limit of {self.daily_limit} reached. Waiting for tomorrow...")
+                return None
+            self._hold(new_job['id'])
             print(f"System: Auto-generated new job based on Permanent Topic: {new_job['content']}")
             return new_job
             
         return None
 
+    def daily_limit_reached(self):
+        """
+        True once today's completed videos hit daily_limit. Remembered in memory for
+        the rest of the day, unless daily_limit is changed in the settings.
+        """
+        return self.limit_reached_day == (time.strftime("%Y-%m-%d"), self.daily_limit)
+
+    def upcoming_topics(self, limit=3):
+        """Contents of the next pending topics (used to prefetch their scripts)."""
+        return [t['content'] for t in self.store.peek_pending(limit)]
+
+    def queue_depth(self):
+        """Number of pending topics."""
+        return self.store.pending_count()
+
+    def check_topic(self, content):
+        """Runs a topic through the safety filter (filter_rules.json); returns why it is blocked, or None."""
+        safety = get_safety_filter(self.settings)
+        return safety.check(content) if safety else None
+
+    def add_topic(self, content):
+        """Queues a new pending topic; one the safety filter blocks is stored as 'rejected' instead."""
+        reason = self.check_topic(content)
+        if reason:
+            print(f"Warning: Rejected topic '{content}': {reason}")
+            topic = self.store.add_topic(content, status='rejected')
+            topic['reason'] = reason
+            return topic
+        return self.store.add_topic(content)
+
+    def reject_topic(self, topic_id, reason=None):
+        """Marks a topic 'rejected' (blocked by the safety filter); it is never claimed again."""
+        print(f"System: Topic ID {topic_id} rejected by the safety filter" + (f": {reason}" if reason else ""))
+        self._set_status(topic_id, 'rejected')
+
     def clear_pending_queue(self):
         """Clears all pending and processing topics from the queue."""
-        if not os.path.exists(self.queue_file):
-            return
-            
-        with open(self.queue_file, 'r') as f:
-            topics = json.load(f)
-            
-        new_topics = [t for t in topics if t.get('status') == 'completed']
-        self.save_topics(new_topics)
+        self.store.delete_unfinished()
         print("🧹 System: Pending and Processing queue cleared.")
 
-    def save_topics(self, topics):
-        with open(self.queue_file, 'w') as f:
-            json.dump(topics, f, indent=4)
-
     def rollback_topic(self, topic_id):
         """Resets a topic's status from processing back to pending."""
-        if not os.path.exists(self.queue_file):
-            return
-
-        with open(self.queue_file, 'r') as f:
-            topics = json.load(f)
-        
-        for t in topics:
-            if t['id'] == topic_id:
-                t['status'] = 'pending'
-                break
-        
-        self.save_topics(topics)
+        self._set_status(topic_id, 'pending')
 
     def mark_as_done(self, topic_id, video_path):
         """Moves the topic to history and updates daily count."""
         print(f"System: Moving Topic ID {topic_id} to completion history...")
         
-        # Load all topics to update the specific one
-        if not os.path.exists(self.queue_file):
-            return
-
-        with open(self.queue_file, 'r') as f:
-            topics = json.load(f)
-        
-        for t in topics:
-            if t['id'] == topic_id:
-                t['status'] = 'completed'
-                t['video_path'] = video_path
-                break
-        
-        self.save_topics(topics)
-        self.increment_daily_count()
-
-        history_entry = {
+        # The video exists either way, so it still counts towards today's total
+        self._set_status(topic_id, 'completed', video_path)
+        self.history.append({
             "topic_id": topic_id,
             "completion_timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "video_path": video_path,
             "status": "success"
-        }
-
-        completed_data = []
-        if os.path.exists(self.completed_file):
-            with open(self.completed_file, 'r') as f:
-                try:
-                    completed_data = json.load(f)
-                except: 
-                    completed_data = []
-        
-        completed_data.append(history_entry)
-        with open(self.completed_file, 'w') as f:
-            json.dump(completed_data, f, indent=4)
\ No newline at end of file
+        })
@@ -1,37 +1,53 @@
 import os
-import requests
 import asyncio
-import edge_tts
-import whisper
-import yaml
+import threading
 from dotenv import load_dotenv
 import time
+from model_cache import get_model_cache
+from captions import boundary_to_word, attach_punctuation, words_to_segments
+from clip_library import ClipLibrary
+from encoding_profiles import resolve_profile
+from render_pool import RenderPool, build_render_spec
+from script_cache import ScriptCache, ScriptPrefetcher, script_key
+from scene_stream import SceneStreamParser, read_scene_stream
+from voiceover import SceneVoiceover, TTSCache
+from ffmpeg_render import render_with_ffmpeg
+from caption_sprites import CaptionSpriteCache, DEFAULT_STYLE
+from checkpoints import CheckpointStore
+from media_tools import configure_binaries, export_binaries
+from metrics import configure_metrics, get_metrics
+from settings import get_settings
+from safety_filter import get_safety_filter
 
-# Configure MoviePy to use the found binaries BEFORE importing it
-FFMPEG_PATH = r"C:\Users\tahreemifikhar009\MediaGet2\ffmpeg.exe"
-IMAGEMAGICK_PATH = r"C:\Program Files\ImageMagick-7.1.2-Q16-HDRI\magick.exe"
+# MoviePy (and the IPython/numpy stack it pulls in) is only imported by the stages that
+# use it, so queue tools, ffmpeg-backend renders and per-scene TTS jobs never pay for it.
+# Edge-TTS, requests and Whisper are imported on first use the same way.
+VideoFileClip = AudioFileClip = TextClip = ImageClip = CompositeVideoClip = concatenate_videoclips = None
+vfx = None
+_moviepy_lock = threading.Lock()
 
-if os.path.exists(FFMPEG_PATH):
-    ffmpeg_dir = os.path.dirname(FFMPEG_PATH)
-    if ffmpeg_dir not in os.environ["PATH"]:
-        os.environ["PATH"] += os.pathsep + ffmpeg_dir
-    os.environ["IMAGEIO_FFMPEG_EXE"] = FFMPEG_PATH
-    os.environ["FFMPEG_BINARY"] = FFMPEG_PATH
-    print(f"System: FFmpeg found and added to PATH: {ffmpeg_dir}")
 
-if os.path.exists(IMAGEMAGICK_PATH):
-    os.environ["IMAGEMAGICK_BINARY"] = IMAGEMAGICK_PATH
-    print(f"System: ImageMagick linked for subtitles: {IMAGEMAGICK_PATH}")
-
-try:
-    from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_videoclips
-except ImportError:
-    from moviepy import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip, concatenate_videoclips
-
-try:
-    import moviepy.video.fx as vfx
-except ImportError:
-    vfx = None
+def load_moviepy():
+    """Imports MoviePy on first use, after pointing it at the resolved ffmpeg/ImageMagick binaries."""
+    global VideoFileClip, AudioFileClip, TextClip, ImageClip, CompositeVideoClip, concatenate_videoclips, vfx
+    if VideoFileClip is not None:
+        return
+    with _moviepy_lock:
+        if VideoFileClip is not None:
+            return
+        export_binaries()
+        try:
+            from moviepy.editor import AudioFileClip, TextClip, ImageClip, CompositeVideoClip, concatenate_videoclips
+            from moviepy.editor import VideoFileClip as video_clip
+        except ImportError:
+            from moviepy import AudioFileClip, TextClip, ImageClip, CompositeVideoClip, concatenate_videoclips
+            from moviepy import VideoFileClip as video_clip
+        try:
+            import moviepy.video.fx as vfx
+        except ImportError:
+            vfx = None
+        # Bound last: the unlocked check above treats it as 'import finished'
+        VideoFileClip = video_clip
 
 load_dotenv(os.path.join("API.env", "exact.env"))
 
@@ -41,30 +57,138 @@ class VideoEngine:
     Integrates OpenRouter, Edge-TTS, Whisper, Pexels, and MoviePy.
     """
 
-    def __init__(self):
+    # Stage order shared by generate_content and the pipeline scheduler
+    STAGES = ("prepare_script", "prepare_voiceover", "prepare_visuals", "prepare_captions", "render_job")
+    # Job fields each stage produces; saved to the job's checkpoint so a retry can resume after it
+    CHECKPOINT_FIELDS = {
+        "prepare_script": ("scenes", "full_text", "script_stats"),
+        "prepare_voiceover": ("audio_path", "word_boundaries", "durations"),
+        "prepare_visuals": ("scene_clips", "download_stats"),
+        "prepare_captions": ("subtitle_segments",)
+    }
+
+    def __init__(self, render_only=False, settings=None, tts=None):
+        """
+        render_only=True skips the network clients and model preloading (render workers).
+        settings replaces the shared config/settings.yaml; tts replaces Edge-TTS with another async
+        (text, output_path, word_boundaries) callable. Both are for offline harnesses.
+        """
         self.openrouter_key = os.getenv("OPENROUTER_API_KEY")
         self.pexels_key = os.getenv("PEXELS_API_KEY")
         
-        with open("config/settings.yaml", "r") as f:
-            self.settings = yaml.safe_load(f)
+        self.settings = settings if settings is not None else get_settings()
+        self.synthesize = tts or self.generate_voiceover
+        # ffmpeg/ImageMagick are located on first use (media_binaries in settings.yaml, else auto-detected)
+        configure_binaries(self.settings.get('media_binaries', {}))
             
         self.model = self.settings['ai_config']['model_name']
+        self.api_base = self.settings['ai_config'].get('api_base', "https://openrouter.ai/api/v1").rstrip('/')
+        # Streaming: scenes are parsed as the completion arrives instead of after it ends
+        self.stream_scripts = self.settings['ai_config'].get('stream', False)
+        self.min_stream_scenes = self.settings['ai_config'].get('min_stream_scenes', 4)
         
         # Ensure temp directories exist
         os.makedirs("Data/temp", exist_ok=True)
         os.makedirs("Data/library", exist_ok=True)
-
-    def generate_script(self, topic):
-        """Generates a structured script with specific visual keywords for each scene."""
-        print(f"Generating professional scene-based script for: {topic}")
         
-        headers = {
-            "Authorization": f"Bearer {self.openrouter_key}",
-            "HTTP-Referer": "https://github.com/YT_BOT",
-            "Content-Type": "application/json"
-        }
+        self.whisper_config = self.settings.get('whisper_config', {})
+        self.model_cache = get_model_cache()
+        self.library = None
+        self.fetcher = None
+        self.render_pool = None
+        self.script_cache = None
+        self.prefetcher = None
+        self.scene_voiceover = None
+        self.checkpoints = None
+        self.tts_settings = self.settings.get('tts_settings', {})
+        # Encoding profile (draft = fast previews, final = publishing) sets the canvas, fps and x264 options;
+        # stock clips are fetched and normalized for the default profile's canvas
+        self.video_settings = self.settings.get('video_settings', {})
+        render_settings = self.settings.get('render_settings', {})
+        self.parallel_renders = 1
+        if render_settings.get('use_process_pool', False):
+            self.parallel_renders = render_settings.get('workers', 0) or os.cpu_count() or 1
+        self.profile = self.get_profile()
+        self.canvas_size = (self.profile['width'], self.profile['height'])
+        self.render_fps = self.profile['fps']
+        # moviepy = reference compositor, ffmpeg = single filter-graph subprocess
+        self.render_backend = render_settings.get('backend', "moviepy")
+        # Captions are drawn once into cached RGBA sprites and blitted during compositing
+        caption_settings = self.settings.get('caption_settings', {})
+        self.caption_style = dict(DEFAULT_STYLE, **caption_settings.get('style', {}))
+        self.caption_sprites = CaptionSpriteCache.from_settings(caption_settings)
+        self.voice = self.tts_settings.get('voice', "en-US-ChristopherNeural")
+        if render_only:
+            return
         
-        prompt = f"""Write a highly engaging, professional 60-second YouTube script about {topic}. 
+        # Spans, counters and gauges (a no-op unless metrics_settings.enabled)
+        configure_metrics(self.settings.get('metrics_settings', {}))
+        
+        # Per-scene TTS: scenes are synthesized concurrently and cached by text + voice
+        if self.tts_settings.get('per_scene', False):
+            tts_cache = None
+            if self.tts_settings.get('cache_enabled', True):
+                tts_cache = TTSCache(self.tts_settings.get('cache_path', "Data/cache/tts"))
+            self.scene_voiceover = SceneVoiceover(self.synthesize, self.voice, tts_cache,
+                                                  self.tts_settings.get('max_concurrent', 4))
+        
+        # Network clients are only needed by the bot process, not by render workers
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        from asset_fetcher import AssetFetcher
+        
+        # One pooled session for OpenRouter, retrying rate limits and server errors with backoff
+        ai_config = self.settings['ai_config']
+        retry = Retry(total=ai_config.get('max_retries', 3), backoff_factor=ai_config.get('retry_backoff', 2),
+                      status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["POST"])
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(max_retries=retry, pool_maxsize=4))
+        self.http.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=4))
+        
+        # Scripts are cached per topic/model/prompt and can be prefetched for upcoming topics
+        script_settings = self.settings.get('script_cache_settings', {})
+        self.script_cache = ScriptCache.from_settings(script_settings)
+        if self.script_cache and script_settings.get('prefetch_count', 0):
+            self.prefetcher = ScriptPrefetcher(self, self.script_cache, script_settings.get('prefetch_workers', 2))
+        
+        # Whisper models are shared process-wide so each video doesn't reload the weights
+        self.model_cache.configure(self.whisper_config)
+        
+        # Pooled, rate-limited Pexels client shared by all scenes of a job,
+        # backed by the persistent stock footage library
+        self.library = ClipLibrary.from_settings(self.settings.get('library_settings', {}))
+        visuals_config = self.settings.get('visuals_config', {})
+        normalize_to = (self.canvas_size[1], self.render_fps) if visuals_config.get('normalize_clips', False) else None
+        self.fetcher = AssetFetcher(
+            self.pexels_key, visuals_config, self.library,
+            target_height=self.canvas_size[1], target_fps=self.render_fps,
+            normalize_to=normalize_to
+        )
+        
+        # Optional process pool so encodes run outside the bot process
+        self.render_pool = RenderPool.from_settings(self.settings.get('render_settings', {}))
+        
+        # Finished stages of each job are checkpointed under Data/temp/<job_id>/ so retries resume.
+        # Renders run in one pass, so a failed encode is retried whole from the captions checkpoint.
+        self.checkpoints = CheckpointStore.from_settings(self.settings.get('checkpoint_settings', {}))
+        if self.checkpoints:
+            self.checkpoints.collect_garbage(force=True)
+
+    def get_profile(self, name=None):
+        """Encoding profile by name (draft/final/...), or the configured default."""
+        return resolve_profile(self.video_settings, name, self.parallel_renders)
+
+    def caption_layout(self, height):
+        """Caption style and top edge for a canvas height (the look is defined on a 1080p canvas)."""
+        scale = height / 1080
+        style = dict(self.caption_style,
+                     font_size=max(1, int(round(self.caption_style['font_size'] * scale))),
+                     stroke_width=max(1, int(round(self.caption_style['stroke_width'] * scale))))
+        return style, int(850 * scale)
+
+    def build_script_prompt(self, topic):
+        return f"""Write a highly engaging, professional 60-second YouTube script about {topic}. 
         IMPORTANT: The total script MUST be at least 180 words to fill exactly 60 seconds.
         The tone should be cinematic, authoritative, and visually descriptive.
         
@@ -83,145 +207,246 @@ class VideoEngine:
         ]
         Return ONLY the JSON array.
         """
+
+    def script_cache_key(self, topic):
+        # The template (with a placeholder topic) is part of the key, so prompt edits invalidate old scripts
+        return script_key(topic, self.model, self.build_script_prompt("{topic}"))
+
+    def request_script(self, topic, on_scene=None, stats=None):
+        """
+        Asks OpenRouter for a scene script over the pooled session. Raises on failure.
+        In streaming mode scenes are parsed (and passed to on_scene) as they arrive;
+        stats, if given, receives the stream metrics.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.openrouter_key}",
+            "HTTP-Referer": "https://github.com/YT_BOT",
+            "Content-Type": "application/json"
+        }
         
         data = {
             "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": [{"role": "user", "content": self.build_script_prompt(topic)}],
             "max_tokens": self.settings['ai_config'].get('max_tokens', 1500),
             "response_format": { "type": "json_object" } if "gpt-4o" in self.model or "gemini" in self.model else None
         }
+        timeout = self.settings['ai_config'].get('request_timeout_seconds', 120)
+        metrics = get_metrics()
+        metrics.inc("api_calls_total", service="openrouter")
         
-        try:
-            response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data)
+        if self.stream_scripts:
+            data["stream"] = True
+            with metrics.span("script_request", mode="stream"):
+                response = self.http.post(f"{self.api_base}/chat/completions", headers=headers, json=data,
+                                          timeout=timeout, stream=True)
+                self._count_retries(response, "openrouter")
+                response.raise_for_status()
+                try:
+                    # Raw bytes: SSE responses carry no charset, so requests would guess latin-1
+                    scenes, stream_stats = read_scene_stream(response.iter_lines(), on_scene)
+                finally:
+                    response.close()
+            if stats is not None:
+                stats.update(stream_stats)
+            print(f"System: Streamed {len(scenes)} scene(s), first after {stream_stats['first_scene_seconds']}s, "
+                  f"all after {stream_stats['seconds']}s (malformed: {stream_stats['malformed']})")
+            if not stream_stats['complete']:
+                print(f"Warning: Script stream ended early ({stream_stats['error'] or 'truncated output'}).")
+                if len(scenes) < self.min_stream_scenes:
+                    raise Exception(f"Only {len(scenes)} complete scene(s) before the stream ended.")
+            return scenes
+        
+        with metrics.span("script_request", mode="plain"):
+            response = self.http.post(f"{self.api_base}/chat/completions", headers=headers, json=data, timeout=timeout)
+            self._count_retries(response, "openrouter")
             response.raise_for_status()
-            import json
-            import re
             content = response.json()['choices'][0]['message']['content']
+        return self.parse_script_content(content)
+
+    @staticmethod
+    def _count_retries(response, service):
+        """Counts the retries urllib3 made before this response (rate limits, server errors)."""
+        retries = getattr(response.raw, 'retries', None)
+        if retries is not None and retries.history:
+            get_metrics().inc("retries_total", len(retries.history), service=service)
+
+    def parse_script_content(self, content):
+        """Recovers the scene list from the model's reply."""
+        import json
+        import re
+        # Use regex to find the first '[' and last ']' to extract JSON array
+        try:
+            match = re.search(r'\[.*\]', content, re.DOTALL)
+            if match:
+                json_str = match.group(0)
+            else:
+                json_str = content
             
-            # Use regex to find the first '[' and last ']' to extract JSON array
-            try:
-                match = re.search(r'\[.*\]', content, re.DOTALL)
-                if match:
-                    json_str = match.group(0)
-                else:
-                    json_str = content
-                
-                scenes = json.loads(json_str)
-            except (json.JSONDecodeError, AttributeError):
-                print(f"Warning: Direct JSON parse failed, attempting manual cleaning...")
-                try:
-                    # Very simple repair: if it ends with words but missing brackets
-                    if content.strip().startswith('[') and not content.strip().endswith(']'):
-                         content = content.strip() + '"]}]' # Try to close common patterns
-                    
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0].strip()
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0].strip()
-                    scenes = json.loads(content)
-                except:
-                    raise Exception("AI JSON is too corrupted to repair.")
-            
-            # Handle if AI returns a dictionary with a "scenes" key
-            if isinstance(scenes, dict) and "scenes" in scenes:
-                scenes = scenes["scenes"]
-            
+            scenes = json.loads(json_str)
+        except (json.JSONDecodeError, AttributeError):
+            print(f"Warning: Direct JSON parse failed, recovering complete scenes...")
+            # Keeps every scene object that parses, even if the reply is cut off or has a bad entry
+            parser = SceneStreamParser()
+            scenes = parser.feed(content)
+            if not scenes:
+                raise Exception("AI JSON is too corrupted to repair.")
+            print(f"System: Recovered {len(scenes)} scene(s) (malformed: {parser.malformed}, "
+                  f"complete: {parser.complete})")
+        
+        # Handle if AI returns a dictionary with a "scenes" key
+        if isinstance(scenes, dict) and "scenes" in scenes:
+            scenes = scenes["scenes"]
+        
+        return scenes
+
+    def generate_script(self, topic, on_scene=None, stats=None):
+        """
+        Generates a structured script with specific visual keywords for each scene.
+        on_scene(index, scene) is called for each scene as soon as it is available.
+        """
+        key = self.script_cache_key(topic)
+        if self.script_cache:
+            if self.prefetcher:
+                self.prefetcher.wait_for(key)
+            scenes = self.script_cache.get(key)
+            if scenes:
+                print(f"Using cached script for: {topic} {self.script_cache.stats()}")
+                return scenes
+        
+        print(f"Generating professional scene-based script for: {topic}")
+        stats = {} if stats is None else stats
+        try:
+            scenes = self.request_script(topic, on_scene, stats)
+            # A stream that broke off still yields a usable script, but not one worth reusing
+            if self.script_cache and scenes and stats.get('complete', True):
+                self.script_cache.put(key, scenes, topic, uses=1)
             return scenes
         except Exception as e:
             print(f"Error generating structured script: {e}")
-            # Fallback to a better, much longer multi-scene sequence (approx 50-60s)
-            return [
-                {"text": f"In the vast tapestry of our modern world, few things carry as much hidden power as {topic}.", "keywords": ["mysterious global footage", "cinematic atmosphere"]},
-                {"text": f"We often overlook the subtle influence it has on our daily lives, yet its impact is undeniable.", "keywords": ["daily life routine", "subtle connection"]},
-                {"text": f"From its historical origins to the cutting-edge secrets known only to a few, {topic} is evolving.", "keywords": ["historical evolution", "future technology"]},
-                {"text": f"Imagine a future where understanding {topic} is the key to unlocking true potential.", "keywords": ["future vision", "unlocking potential"]},
-                {"text": f"The benefits we see on the surface are just the beginning of a much deeper story.", "keywords": ["ocean depth", "surface layer"]},
-                {"text": f"Experts are now uncovering data that suggests we've only scratched the surface.", "keywords": ["scientific research", "microscope"]},
-                {"text": f"But what does this mean for you, and how can you harness this power today?", "keywords": ["personal empowerment", "harnessing energy"]},
-                {"text": f"As we peel back the layers, a shocking truth begins to emerge about our connection to it.", "keywords": ["peeling layers", "emerging truth"]},
-                {"text": f"It's time to stop ignoring the signs and start embracing the reality of {topic}.", "keywords": ["embracing reality", "awareness"]},
-                {"text": f"Stay curious, keep exploring, and remember—the biggest secrets are often hiding in plain sight.", "keywords": ["curiosity", "hiding in plain sight"]}
-            ]
-
-    async def generate_voiceover(self, text, output_path):
-        """Converts text to speech using Edge-TTS."""
+            get_metrics().inc("fallbacks_total", kind="template_script")
+            stats['fallback'] = True  # not checkpointed, so a retry asks the model again
+            return self.fallback_script(topic)
+
+    def prefetch_scripts(self, topics):
+        """Starts generating scripts for upcoming topics in the background."""
+        if self.prefetcher and topics:
+            self.prefetcher.prefetch(topics)
+
+    def fallback_script(self, topic):
+        # Fallback to a better, much longer multi-scene sequence (approx 50-60s)
+        return [
+            {"text": f"In the vast tapestry of our modern world, few things carry as much hidden power as {topic}.", "keywords": ["mysterious global footage", "cinematic atmosphere"]},
+            {"text": f"We often overlook the subtle influence it has on our daily lives, yet its impact is undeniable.", "keywords": ["daily life routine", "subtle connection"]},
+            {"text": f"From its historical origins to the cutting-edge secrets known only to a few, {topic} is evolving.", "keywords": ["historical evolution", "future technology"]},
+            {"text": f"Imagine a future where understanding {topic} is the key to unlocking true potential.", "keywords": ["future vision", "unlocking potential"]},
+            {"text": f"The benefits we see on the surface are just the beginning of a much deeper story.", "keywords": ["ocean depth", "surface layer"]},
+            {"text": f"Experts are now uncovering data that suggests we've only scratched the surface.", "keywords": ["scientific research", "microscope"]},
+            {"text": f"But what does this mean for you, and how can you harness this power today?", "keywords": ["personal empowerment", "harnessing energy"]},
+            {"text": f"As we peel back the layers, a shocking truth begins to emerge about our connection to it.", "keywords": ["peeling layers", "emerging truth"]},
+            {"text": f"It's time to stop ignoring the signs and start embracing the reality of {topic}.", "keywords": ["embracing reality", "awareness"]},
+            {"text": f"Stay curious, keep exploring, and remember—the biggest secrets are often hiding in plain sight.", "keywords": ["curiosity", "hiding in plain sight"]}
+        ]
+
+    async def generate_voiceover(self, text, output_path, word_boundaries=None):
+        """
+        Converts text to speech using Edge-TTS.
+        If word_boundaries is a list, the word timing events Edge-TTS streams
+        alongside the audio are appended to it as {text, start, end} dicts.
+        """
+        import edge_tts
         print("Generating voiceover...")
-        communicate = edge_tts.Communicate(text, "en-US-ChristopherNeural")
-        await communicate.save(output_path)
+        get_metrics().inc("api_calls_total", service="edge_tts")
+        voice = self.voice
+        try:
+            # edge-tts >= 7 only emits sentence boundaries unless asked for words
+            communicate = edge_tts.Communicate(text, voice, boundary="WordBoundary")
+        except TypeError:
+            communicate = edge_tts.Communicate(text, voice)
+        
+        with open(output_path, 'wb') as f:
+            async for chunk in communicate.stream():
+                if chunk['type'] == 'audio':
+                    f.write(chunk['data'])
+                elif chunk['type'] == 'WordBoundary' and word_boundaries is not None:
+                    word_boundaries.append(boundary_to_word(chunk))
         return output_path
 
+    def captions_from_boundaries(self, word_boundaries, text):
+        """Builds caption segments from TTS word timings (no transcription needed)."""
+        caption_cfg = self.settings.get('caption_settings', {})
+        words = attach_punctuation([dict(w) for w in word_boundaries], text)
+        return words_to_segments(
+            words,
+            max_words=caption_cfg.get('max_words_per_segment', 6),
+            max_duration=caption_cfg.get('max_segment_seconds', 3.0)
+        )
+
     def generate_subtitles(self, audio_path):
         """Generates subtitle segments using local Whisper."""
         print("Transcribing audio with Whisper for captions...")
-        model = whisper.load_model("base")
-        result = model.transcribe(audio_path)
+        export_binaries()  # Whisper decodes the audio by running 'ffmpeg' from PATH
+        fp16 = self.whisper_config.get('fp16', False)
+        model = self.model_cache.get(
+            self.whisper_config.get('model_name', 'base'),
+            self.whisper_config.get('device', 'cpu'),
+            fp16
+        )
+        with get_metrics().span("whisper_transcribe"):
+            result = model.transcribe(audio_path, fp16=fp16)
+        
+        stats = self.model_cache.stats()
+        print(f"System: Whisper cache hits={stats['hits']} misses={stats['misses']} "
+              f"(~{stats['estimated_seconds_saved']:.1f}s of model loading saved)")
         return result.get('segments', [])
 
     def get_visuals(self, keywords, index, main_topic=""):
         """Fetches a single video clip from Pexels with randomized selection for variety."""
-        import random
-        if isinstance(keywords, str):
-            keywords = [keywords]
-            
-        # Add main topic as a final keyword fallback
-        if main_topic and main_topic not in keywords:
-            keywords.append(main_topic)
+        return self.fetcher.fetch_scene(keywords, index, main_topic)
 
-        headers = {"Authorization": self.pexels_key}
-        
-        for query in keywords:
-            print(f"Fetching visual for scene {index} using query: {query}")
-            # Request more results to allow for randomization
-            url = f"https://api.pexels.com/videos/search?query={query}&per_page=10&orientation=landscape&size=medium"
-            
+    def render_video(self, topic, script, audio_path, scene_clips, subtitle_segments, output_path=None, profile=None):
+        """Mashes everything together with matched scenes and captions, encoded with the given profile."""
+        if self.render_backend == "ffmpeg":
             try:
-                response = requests.get(url, headers=headers)
-                response.raise_for_status()
-                videos = response.json().get('videos', [])
-                
-                if videos:
-                    # Pick a random video from the results to ensure variety
-                    selected_video = random.choice(videos)
-                    video_url = selected_video['video_files'][0]['link']
-                    v_path = f"Data/temp/clip_scene_{index}.mp4"
-                    v_data = requests.get(video_url).content
-                    with open(v_path, 'wb') as f:
-                        f.write(v_data)
-                    return v_path
-                else:
-                    print(f"No visuals found for '{query}'. Trying next keyword...")
+                return self.render_video_ffmpeg(audio_path, scene_clips, subtitle_segments, output_path, profile)
             except Exception as e:
-                print(f"Error fetching visual for {query}: {e}")
-                continue
+                print(f"Warning: ffmpeg render failed ({e}). Falling back to MoviePy.")
+                get_metrics().inc("fallbacks_total", kind="moviepy_render")
         
-        print(f"FAILED to find any visuals for scene {index}. Using fallback.")
-        return None
-
-    def render_video(self, topic, script, audio_path, scene_clips, subtitle_segments):
-        """Mashes everything together with matched scenes and captions."""
-        print("Rendering professional video with synced scenes and captions...")
+        profile = self.get_profile(profile)
+        print(f"Rendering professional video with synced scenes and captions ({profile['name']} profile)...")
+        width, height = profile['width'], profile['height']
+        caption_style, caption_top = self.caption_layout(height)
+        timings = {}
+        stage_start = time.time()
+        load_moviepy()
         
         audio = AudioFileClip(audio_path)
         
         # Assemble the visual sequence with cinematic transitions
         final_clips = []
         last_valid_clip = None
+        resized_clips = 0
         
         for i, (path, duration) in enumerate(scene_clips):
             current_clip = None
             
             if path and os.path.exists(path):
                 try:
-                    # Load and resize to a consistent professional 1080p canvas
-                    current_clip = VideoFileClip(path).without_audio().resized(height=1080)
-                    last_valid_clip = path 
+                    # Load and resize to the profile's canvas height
+                    current_clip = VideoFileClip(path).without_audio()
+                    if current_clip.h != height:
+                        # Normalized clips are already at canvas height; only raw downloads pay for this
+                        current_clip = current_clip.resized(height=height)
+                        resized_clips += 1
+                    last_valid_clip = current_clip
                 except Exception as e:
                     print(f"Error loading clip {path}: {e}")
                     current_clip = None
 
             if current_clip is None:
-                if last_valid_clip and os.path.exists(last_valid_clip):
-                    current_clip = VideoFileClip(last_valid_clip).without_audio().resized(height=1080)
+                if last_valid_clip is not None:
+                    # Reuse the already opened clip instead of decoding the file from scratch again
+                    current_clip = last_valid_clip
                 else:
                     continue 
             
@@ -264,16 +489,32 @@ class VideoEngine:
         if not final_clips:
             print("Error: No valid visual clips to render.")
             return None
+        timings['load_clips'] = time.time() - stage_start
 
         # Composite everything
-        base_video = CompositeVideoClip(final_clips, size=(1920, 1080))
+        stage_start = time.time()
+        base_video = CompositeVideoClip(final_clips, size=(width, height))
         
         # Create Caption Clips (Overlay)
         caption_clips = []
+        caption_width = int(base_video.w * 0.9)
+        if self.caption_sprites:
+            # Draw every missing sprite up front, in parallel; the loop below only wraps arrays
+            self.caption_sprites.prerender([s['text'].strip().upper() for s in subtitle_segments
+                                            if s['end'] - s['start'] > 0], caption_style, caption_width)
         for segment in subtitle_segments:
             duration = segment['end'] - segment['start']
             if duration <= 0: continue
             
+            if self.caption_sprites:
+                try:
+                    sprite = self.caption_sprites.get(segment['text'].strip().upper(), caption_style, caption_width)
+                    caption_clips.append(ImageClip(sprite).with_start(segment['start'])
+                                         .with_duration(duration).with_position(('center', caption_top)))
+                except Exception as e:
+                    print(f"Warning: Caption error: {e}")
+                continue
+            
             try:
                 # Use absolute path for font to avoid "cannot open resource" errors
                 font_path = r"C:\Windows\Fonts\arialbd.ttf"
@@ -282,22 +523,35 @@ class VideoEngine:
                 
                 txt_clip = TextClip(
                     text=segment['text'].strip().upper(), # Uppercase for punchy look
-                    font_size=55, # Reduced from 80 for better aesthetics
+                    font_size=caption_style['font_size'], # 55 on a 1080p canvas (reduced from 80 for better aesthetics)
                     color='yellow', # Yellow is common in professional AI videos
                     font=font_path,
                     stroke_color='black',
-                    stroke_width=3,
+                    stroke_width=caption_style['stroke_width'],
                     method='caption',
                     size=(int(base_video.w * 0.9), None)
-                ).with_start(segment['start']).with_duration(duration).with_position(('center', 850))
+                ).with_start(segment['start']).with_duration(duration).with_position(('center', caption_top))
                 caption_clips.append(txt_clip)
             except Exception as e:
                 print(f"Warning: Caption error: {e}")
         
         final_composite = CompositeVideoClip([base_video] + caption_clips).with_audio(audio).with_duration(audio.duration)
+        timings['captions'] = time.time() - stage_start
+        if self.caption_sprites:
+            print(f"System: Caption sprites {self.caption_sprites.stats()}")
         
-        output_path = f"Data/library/final_{int(time.time())}.mp4"
-        final_composite.write_videofile(output_path, fps=24, codec="libx264", audio_codec="aac")
+        output_path = output_path or f"Data/library/final_{int(time.time())}.mp4"
+        # Decoding, per-frame resizing, compositing and encoding all happen in here
+        stage_start = time.time()
+        final_composite.write_videofile(output_path, fps=profile['fps'], codec="libx264", audio_codec="aac",
+                                        preset=profile['preset'], threads=profile['threads'],
+                                        ffmpeg_params=["-crf", str(profile['crf'])])
+        timings['decode_composite_encode'] = time.time() - stage_start
+        metrics = get_metrics()
+        for phase, seconds in timings.items():
+            metrics.observe("render_phase_seconds", seconds, backend="moviepy", phase=phase)
+        print(f"System: Render stage times (s): " + ", ".join(f"{k}={v:.1f}" for k, v in timings.items()) +
+              f"; {resized_clips}/{len(scene_clips)} clips needed a resize to {height}p")
         
         # Cleanup scene clips
         for path, _ in scene_clips:
@@ -306,29 +560,153 @@ class VideoEngine:
             
         return output_path
 
-    def generate_content(self, topic_data):
-        topic = topic_data['content']
-        
-        # 1. Generate Structured Scenes
-        scenes = self.generate_script(topic)
-        if not scenes: return None
+    def render_video_ffmpeg(self, audio_path, scene_clips, subtitle_segments, output_path=None, profile=None):
+        """Same output as render_video, built as one ffmpeg filter graph instead of frame by frame in Python."""
+        render_settings = self.settings.get('render_settings', {})
+        profile = self.get_profile(profile)
+        output_path = output_path or f"Data/library/final_{int(time.time())}.mp4"
+        caption_style, caption_top = self.caption_layout(profile['height'])
+        with get_metrics().span("render", backend="ffmpeg", profile=profile['name']):
+            result = render_with_ffmpeg(
+                audio_path, scene_clips, subtitle_segments, output_path,
+                width=profile['width'], height=profile['height'], fps=profile['fps'],
+                preset=profile['preset'], crf=profile['crf'], threads=profile['threads'],
+                timeout=render_settings.get('timeout_seconds', 1800),
+                caption_style=caption_style, caption_top=caption_top
+            )
+        if result:
+            # Cleanup scene clips
+            for path, _ in scene_clips:
+                try: os.remove(path)
+                except: pass
+        return result
+
+    def new_job(self, topic_data):
+        """Creates the per-job context the pipeline stages below fill in (resuming from its checkpoint, if any)."""
+        job = {
+            "topic_data": topic_data,
+            "topic": topic_data['content'],
+            # Unique per job so concurrent jobs never share temp files
+            "tag": f"{topic_data.get('id', 'job')}_{int(time.time() * 1000)}",
+            # A topic can ask for another encoding profile, e.g. "draft" for a preview
+            "profile": topic_data.get('profile')
+        }
+        if self.checkpoints and topic_data.get('id') is not None:
+            self.checkpoints.collect_garbage()
+            self.resume_job(job)
+        return job
+
+    def resume_job(self, job):
+        """Opens the job's checkpoint and restores every stage it still holds a valid copy of."""
+        # A checkpoint is only reused for the same topic, voice, model and footage format
+        inputs = {"topic": job['topic'], "voice": self.voice, "model": self.model,
+                  "canvas": list(self.canvas_size), "fps": self.render_fps}
+        checkpoint = self.checkpoints.open(job['topic_data']['id'], inputs)
+        job['checkpoint'] = checkpoint
+        restored = checkpoint.load([s for s in self.STAGES if s in self.CHECKPOINT_FIELDS])
+        if not restored:
+            return
+        for stage, data in restored:
+            job.update(data)
+        job['scene_clips'] = [tuple(c) for c in job.get('scene_clips', [])]
+        job['resumed_stages'] = [stage for stage, _ in restored]
+        print(f"System: Resuming Topic ID {job['topic_data']['id']} after '{restored[-1][0]}' from its checkpoint.")
+        get_metrics().inc("jobs_resumed_total", stage=restored[-1][0])
+
+    def save_checkpoint(self, stage, job):
+        """Moves the stage's files into the job's checkpoint directory and records them with their hashes."""
+        checkpoint = job['checkpoint']
+        files = []
+        if stage == "prepare_voiceover":
+            job['audio_path'] = checkpoint.adopt(job['audio_path'], "voiceover")
+            files = [job['audio_path']]
+        elif stage == "prepare_visuals":
+            job['scene_clips'] = [(checkpoint.adopt(path, f"clip_{i}"), duration)
+                                  for i, (path, duration) in enumerate(job['scene_clips'])]
+            files = [path for path, _ in job['scene_clips']]
+        try:
+            checkpoint.save_stage(stage, {k: job.get(k) for k in self.CHECKPOINT_FIELDS[stage]}, files)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not checkpoint '{stage}' for Topic ID {job['topic_data']['id']}: {e}")
+
+    def estimate_scene_seconds(self, scene):
+        # Edge-TTS narrates at roughly 2.5 words per second
+        return len(scene.get('text', '').split()) / 2.5 + 0.5
+
+    def prepare_script(self, job):
+        """Stage 1: Generate Structured Scenes (footage fetches start as scenes stream in)"""
+        job['script_stats'] = {}
+        job['download_stats'] = {}
+        job['early_clips'] = {}
+        job['early_tts'] = {}
+        on_scene = None
+        safety = get_safety_filter(self.settings)
+        early_fetch = self.fetcher and self.settings['ai_config'].get('early_fetch', True)
+        # With per-scene TTS, each streamed scene's voiceover segment starts right away too
+        early_tts = self.scene_voiceover and self.tts_settings.get('early_synthesis', True)
+        if early_fetch or early_tts:
+            def on_scene(index, scene):
+                if safety and safety.check_script([scene]):
+                    return  # the whole script is rejected below; don't spend downloads on it
+                if early_fetch:
+                    keywords = scene.get('keywords', [scene.get('keyword', job['topic'])])
+                    future = self.fetcher.submit_scene(keywords, index, job['topic'], job['download_stats'],
+                                                       self.estimate_scene_seconds(scene), job['tag'])
+                    job['early_clips'][index] = (keywords, future)
+                if early_tts and scene.get('text'):
+                    pending = job['early_tts'].get(index)
+                    if pending and pending[0] == scene['text']:
+                        return  # already being synthesized
+                    if pending:
+                        print(f"Warning: Scene {index + 1} was streamed twice with different text; "
+                              f"replacing its early voiceover.")
+                        SceneVoiceover.discard_segment(pending[1])
+                    job['early_tts'][index] = (scene['text'],
+                                               self.scene_voiceover.submit_scene(index, scene['text'], job['tag']))
+        job['scenes'] = self.generate_script(job['topic'], on_scene, job['script_stats'])
+        if not job['scenes']:
+            return False
+        reason = safety.check_script(job['scenes']) if safety else None
+        if reason:
+            print(f"Warning: Script for '{job['topic']}' rejected by the safety filter ({reason}).")
+            job['topic_data']['rejected'] = reason
+            get_metrics().inc("rejected_total", kind="script")
+            return False
+        job['full_text'] = " ".join([s['text'] for s in job['scenes']])
+        return True
+
+    def prepare_voiceover(self, job):
+        """Stage 2: Voiceover and scene timings (per scene when tts_settings.per_scene is on)"""
+        scenes = job['scenes']
+        job['audio_path'] = f"Data/temp/voiceover_{job['tag']}.mp3"
+        if self.scene_voiceover:
+            try:
+                result = asyncio.run(self.scene_voiceover.synthesize_scenes(
+                    [s['text'] for s in scenes], job['audio_path'], job['tag'], job.get('early_tts')))
+                job['word_boundaries'] = result['word_boundaries']
+                # Exact per-scene durations, plus 0.5s on all but the last clip for the crossfade overlap
+                job['durations'] = [d + 0.5 if i < len(scenes) - 1 else d for i, d in enumerate(result['durations'])]
+                cache = self.scene_voiceover.cache
+                print(f"System: Voiceover built from {len(scenes)} scene segments "
+                      f"({result['early']} started while the script streamed, "
+                      f"{result['cached']} cached{', ' + str(cache.stats()) if cache else ''})")
+                return True
+            except Exception as e:
+                print(f"Warning: Per-scene voiceover failed ({e}). Synthesizing the full script instead.")
+                get_metrics().inc("fallbacks_total", kind="whole_script_tts")
         
-        # 2. Voiceover (Full text)
-        full_text = " ".join([s['text'] for s in scenes])
-        audio_path = f"Data/temp/voiceover_{int(time.time())}.mp3"
-        asyncio.run(self.generate_voiceover(full_text, audio_path))
+        job['word_boundaries'] = []
+        asyncio.run(self.synthesize(job['full_text'], job['audio_path'], job['word_boundaries']))
         
-        audio = AudioFileClip(audio_path)
+        load_moviepy()
+        audio = AudioFileClip(job['audio_path'])
         total_duration = audio.duration
+        audio.close()
         
-        # 3. Calculate Scene Timings (proportional to text length)
+        # Calculate Scene Timings (proportional to text length)
         total_chars = sum(len(s['text']) for s in scenes)
-        scene_clips = []
+        durations = []
         for i, scene in enumerate(scenes):
-            # Fetch one specific clip for this scene's keywords
-            keywords = scene.get('keywords', [scene.get('keyword', topic)])
-            clip_path = self.get_visuals(keywords, i, main_topic=topic)
-            
             # Determine duration based on text weight, but add 0.5s for the crossfade overlap
             weight = len(scene['text']) / total_chars if total_chars > 0 else (1/len(scenes))
             scene_duration = (weight * total_duration)
@@ -336,21 +714,110 @@ class VideoEngine:
             # Add 0.5s to all clips except the last one to allow for the crossfade overlap
             if i < len(scenes) - 1:
                 scene_duration += 0.5
-                
-            scene_clips.append((clip_path, scene_duration))
-        
-        # 4. Captions (Whisper)
-        subtitle_segments = self.generate_subtitles(audio_path)
-        
-        # 5. Render
-        video_path = self.render_video(topic, full_text, audio_path, scene_clips, subtitle_segments)
-        
+            durations.append(scene_duration)
+        job['durations'] = durations
+        return True
+
+    def prepare_visuals(self, job):
+        """Stage 3: Fetch one clip per scene (all scenes in parallel, results in scene order)"""
+        topic = job['topic']
+        scene_keywords = [s.get('keywords', [s.get('keyword', topic)]) for s in job['scenes']]
+        job.setdefault('download_stats', {})
+        clip_paths = self.fetcher.fetch_all(scene_keywords, main_topic=topic, stats=job['download_stats'],
+                                            durations=job['durations'], job_tag=job['tag'],
+                                            early=job.get('early_clips'))
+        job['scene_clips'] = list(zip(clip_paths, job['durations']))
+        return any(clip_paths)
+
+    def prepare_captions(self, job):
+        """Stage 4: Captions (TTS word timings, Whisper as fallback)"""
+        caption_mode = self.settings.get('caption_settings', {}).get('mode', 'tts')
+        subtitle_segments = []
+        if caption_mode == 'tts' and job['word_boundaries']:
+            subtitle_segments = self.captions_from_boundaries(job['word_boundaries'], job['full_text'])
+        if not subtitle_segments:
+            if caption_mode == 'tts':
+                print("Warning: No TTS word timings received. Falling back to Whisper.")
+                get_metrics().inc("fallbacks_total", kind="whisper_captions")
+            subtitle_segments = self.generate_subtitles(job['audio_path'])
+        job['subtitle_segments'] = subtitle_segments
+        return True
+
+    def render_job(self, job):
+        """Stage 5: Render"""
+        output_path = f"Data/library/final_{int(time.time())}_{job['topic_data'].get('id', 0)}.mp4"
+        if self.render_pool:
+            # Render in a worker process; a crash or timeout surfaces as RenderError
+            job['video_path'] = self.render_pool.render(build_render_spec(job, output_path))
+        else:
+            job['video_path'] = self.render_video(job['topic'], job['full_text'], job['audio_path'],
+                                                  job['scene_clips'], job['subtitle_segments'], output_path,
+                                                  job.get('profile'))
+        if job['video_path'] is None:
+            return False  # the voiceover stays for the retry (it may be checkpointed)
+
         # Cleanup temp audio
-        try: os.remove(audio_path)
+        try: os.remove(job['audio_path'])
         except: pass
-        
+        return True
+
+    def cleanup_job(self, job):
+        """Removes whatever temp files a failed job left behind (checkpointed ones are kept for the retry)."""
+        checkpoint = job.get('checkpoint')
+        if checkpoint and job['topic_data'].get('rejected'):
+            checkpoint.discard()  # a rejected topic is never retried
+        paths = [job.get('audio_path')] + [p for p, _ in job.get('scene_clips', [])]
+        # Clips fetched while the script streamed, if the job failed before the visuals stage
+        for _, future in job.get('early_clips', {}).values():
+            try: paths.append(future.result())
+            except Exception: pass
+        # Voiceover segments started while the script streamed (cached ones stay in the TTS cache)
+        for _, future in job.get('early_tts', {}).values():
+            SceneVoiceover.discard_segment(future)
+        for path in paths:
+            if path and not (checkpoint and checkpoint.owns(path)):
+                try: os.remove(path)
+                except: pass
+
+    def job_result(self, job):
         return {
-            "video_path": video_path,
-            "title": f"The Wonders of {topic}",
-            "description": full_text
-        }
\ No newline at end of file
+            "video_path": job['video_path'],
+            "title": f"The Wonders of {job['topic']}",
+            "description": job['full_text'],
+            "download_stats": job.get('download_stats', {}),
+            "script_stats": job.get('script_stats', {})
+        }
+
+    def run_stage(self, stage, job):
+        """Runs one stage method on a job inside a timing span, skipping stages restored from its checkpoint."""
+        if stage in job.get('resumed_stages', ()):
+            return True
+        with get_metrics().span("stage", stage=stage):
+            ok = getattr(self, stage)(job)
+        checkpoint = job.get('checkpoint')
+        if ok and checkpoint:
+            if stage == self.STAGES[-1]:
+                checkpoint.discard()  # the video is done; nothing left to resume
+            elif job.get('script_stats', {}).get('fallback'):
+                pass  # built on the template script; a retry should start over with the model
+            elif stage in self.CHECKPOINT_FIELDS:
+                self.save_checkpoint(stage, job)
+        return ok
+
+    def generate_content(self, topic_data):
+        job = self.new_job(topic_data)
+        metrics = get_metrics()
+        for stage in self.STAGES:
+            try:
+                ok = self.run_stage(stage, job)
+            except Exception as e:
+                # e.g. RenderError from a crashed or timed-out render worker; the caller rolls the topic back
+                print(f"Error: Stage '{stage}' failed for Topic ID {topic_data.get('id')}: {type(e).__name__}: {e}")
+                ok = False
+            if not ok:
+                self.cleanup_job(job)
+                result = "rejected" if topic_data.get('rejected') else "failed"
+                metrics.inc("jobs_total", result=result, stage=stage)
+                return None
+        metrics.inc("jobs_total", result="done")
+        return self.job_result(job)
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from media_tools import concat_audio, media_duration
+
+
+def tts_key(text, voice):
+    """Cache key for one synthesized line: hash of the exact text and the voice."""
+    return hashlib.sha256(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Synthesized scene audio on disk: <key>.mp3 plus a <key>.json sidecar holding
+    the measured duration and the word timings, so a repeated line costs neither
+    a TTS call nor a decode.
+    """
+
+    def __init__(self, root="Data/cache/tts"):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def audio_path(self, key):
+        return os.path.join(self.root, key + ".mp3")
+
+    def _meta_path(self, key):
+        return os.path.join(self.root, key + ".json")
+
+    def get(self, key):
+        """Returns {audio_path, duration, words} or None."""
+        audio_path = self.audio_path(key)
+        try:
+            with open(self._meta_path(key), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        with self._lock:
+            if meta is None or not os.path.exists(audio_path):
+                self.misses += 1
+                return None
+            self.hits += 1
+        meta['audio_path'] = audio_path
+        return meta
+
+    def put(self, key, audio_path, duration, words):
+        """Moves a freshly synthesized segment into the cache; returns its cached path."""
+        cached = self.audio_path(key)
+        tmp_path = f"{cached}.{threading.get_ident()}.tmp"
+        shutil.copyfile(audio_path, tmp_path)
+        os.replace(tmp_path, cached)
+        tmp_meta = f"{self._meta_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, 'w') as f:
+            json.dump({"duration": duration, "words": words}, f)
+        os.replace(tmp_meta, self._meta_path(key))
+        return cached
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class SceneVoiceover:
+    """
+    Synthesizes each scene's text as its own TTS request (at most max_concurrency
+    at a time), then joins the segments in scene order with an audio-only ffmpeg
+    concat. Each scene's duration is measured from its own segment, so scene
+    timings are exact instead of estimated from character counts.
+
+    synthesize is an async callable (text, output_path, word_boundaries) ->
+    output_path, normally VideoEngine.generate_voiceover.
+
+    submit_scene() starts one scene's segment in the background as soon as its
+    text is known (e.g. while the script is still streaming); synthesize_scenes
+    reuses it when the final scene text matches.
+    """
+
+    def __init__(self, synthesize, voice, cache=None, max_concurrency=4, temp_dir="Data/temp"):
+        self.synthesize = synthesize
+        self.voice = voice
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.temp_dir = temp_dir
+        self._early_pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="tts-early")
+
+    async def _scene(self, index, text, tag, semaphore):
+        key = tts_key(text, self.voice)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached:
+                return {"audio_path": cached['audio_path'], "duration": cached['duration'],
+                        "words": cached['words'], "cached": True, "temp": False}
+
+        # Unique per synthesis: two runs for the same scene must never write (and cache) one file
+        segment_path = os.path.join(self.temp_dir, f"tts_{tag}_{index}_{uuid.uuid4().hex[:8]}.mp3")
+        words = []
+        async with semaphore:
+            await self.synthesize(text, segment_path, words)
+        # Decoding is CPU work; keep it off the event loop so other scenes keep streaming
+        duration = await asyncio.get_running_loop().run_in_executor(None, media_duration, segment_path)
+        if self.cache:
+            cached_path = self.cache.put(key, segment_path, duration, words)
+            os.remove(segment_path)
+            return {"audio_path": cached_path, "duration": duration, "words": words, "cached": False, "temp": False}
+        return {"audio_path": segment_path, "duration": duration, "words": words, "cached": False, "temp": True}
+
+    def submit_scene(self, index, text, tag="job"):
+        """Starts synthesizing one scene in the background; returns a Future of its segment."""
+        return self._early_pool.submit(asyncio.run, self._scene(index, text, f"{tag}_early", asyncio.Semaphore(1)))
+
+    @staticmethod
+    def discard_segment(future):
+        """Deletes an early segment nobody will use, once it finishes (cached ones stay in the cache)."""
+        def remove(done):
+            try:
+                segment = done.result()
+            except Exception:
+                return
+            if segment['temp']:
+                try: os.remove(segment['audio_path'])
+                except: pass
+        future.add_done_callback(remove)
+
+    async def _early_or_new(self, index, text, tag, semaphore, early):
+        submitted = early.get(index)
+        if submitted and submitted[0] == text:
+            try:
+                segment = await asyncio.wrap_future(submitted[1])
+                return dict(segment, early=True)
+            except Exception as e:
+                print(f"Warning: Early voiceover for scene {index + 1} failed ({e}); synthesizing it again.")
+        elif submitted:
+            self.discard_segment(submitted[1])
+        return await self._scene(index, text, tag, semaphore)
+
+    async def synthesize_scenes(self, texts, output_path, tag="job", early=None):
+        """
+        Returns {audio_path, durations, word_boundaries, cached, early}. Word timings are
+        shifted onto the joined track's timeline. early maps scene index -> (text, future)
+        from submit_scene; those segments are used instead of synthesizing the scene again.
+        """
+        early = early or {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        segments = await asyncio.gather(*[
+            self._early_or_new(i, text, tag, semaphore, early) for i, text in enumerate(texts)
+        ])
+        for index, (_, future) in early.items():
+            if index >= len(texts):
+                self.discard_segment(future)
+        try:
+            concat_audio([s['audio_path'] for s in segments], output_path)
+        finally:
+            for s in segments:
+                if s['temp']:
+                    try: os.remove(s['audio_path'])
+                    except: pass
+
+        word_boundaries = []
+        offset = 0.0
+        for s in segments:
+            for w in s['words']:
+                word_boundaries.append({"text": w['text'], "start": w['start'] + offset, "end": w['end'] + offset})
+            offset += s['duration']
+        return {
+            "audio_path": output_path,
+            "durations": [s['duration'] for s in segments],
+            "word_boundaries": word_boundaries,
+            "cached": sum(1 for s in segments if s['cached']),
+            "early": sum(1 for s in segments if s.get('early'))
+        }